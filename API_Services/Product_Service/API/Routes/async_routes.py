@@ -0,0 +1,136 @@
+from fastapi import APIRouter, Depends, Query, Form, File, UploadFile, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from Db.AsyncDatabase import AsyncSessionLocal
+
+from API.Routes import user_routes
+from ProductService.ProductService import listing_response, parse_fields
+from Schema.product_schema import ProductListResponse, ProductResponse
+from ProductService.ProductServiceAsync import (
+    add_product,
+    fetch_all_products,
+    fetch_product,
+    update_product_details,
+    soft_delete_product_service,
+    listing_stream_statement,
+    listing_validators,
+    stream_product_listing,
+)
+from Utils.Auth import check_acting_user, optional_current_user
+from Utils.HttpCache import is_not_modified, validator_headers
+from config import LISTING_CACHE_CONTROL
+
+# Same endpoints as user_routes, served by async handlers on an AsyncSession.
+# Selected in main.py when Database.Mode is "async".
+router = APIRouter()
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@router.post("/product/save")
+async def save_product(
+    product_id: int = Form(0),
+    name: str = Form(...),
+    description: str = Form(...),
+    price: float = Form(...),
+    current_user_id: int = Form(...),
+    image: UploadFile = File(None),
+    db: AsyncSession = Depends(get_db),
+    token_payload: dict | None = Depends(optional_current_user),
+):
+    check_acting_user(current_user_id, token_payload)
+    if product_id == 0 or product_id is None:
+        new_product = await add_product(
+            db=db,
+            name=name,
+            description=description,
+            price=price,
+            current_user_id=current_user_id,
+            image=image
+        )
+        return {"message": "Product created successfully", "product_id": new_product.id}
+
+    update_data = {"name": name, "description": description, "price": price}
+    return await update_product_details(db, product_id, update_data, current_user_id, image)
+
+@router.get("/product/all", response_model=ProductListResponse, response_model_exclude_unset=True)
+async def get_all_products(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    search: str | None = Query(None, description="Search by name or description"),
+    sort_by: str = Query("id", description="Field to sort by: id, name, price, rating, created_date, or relevance (with search)"),
+    sort_order: str = Query("asc", description="Sort order: asc or desc"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page numbers) or cursor (keyset)"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; implies cursor pagination"),
+    count_mode: str = Query("exact", pattern="^(exact|estimated|cached|none)$", description="How total is computed: exact, estimated, cached or none (has_more only)"),
+    preview: bool = Query(False, description="Inline a tiny blurred-up preview image"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json (one page) or ndjson (stream every match, one product per line)"),
+    limit: int | None = Query(None, ge=1, description="ndjson only: stop after this many products"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)")
+):
+    selected = parse_fields(fields, preview)
+    validators = await listing_validators(db, request.query_params, preview)
+    cache_headers = validator_headers(*validators, LISTING_CACHE_CONTROL) if validators else {}
+    if validators and is_not_modified(request.headers, *validators):
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    if format == "ndjson":
+        statement = await listing_stream_statement(
+            db, search=search, sort_by=sort_by, sort_order=sort_order, cursor=cursor, limit=limit, fields=selected
+        )
+
+        async def _stream():
+            # The response outlives request dependencies, so it owns its session
+            async with AsyncSessionLocal() as stream_db:
+                async for chunk in stream_product_listing(stream_db, statement, preview, selected):
+                    yield chunk
+
+        return StreamingResponse(_stream(), media_type=user_routes.NDJSON_MEDIA_TYPE, headers=cache_headers)
+
+    result = await fetch_all_products(
+        db,
+        search=search,
+        sort_by=sort_by,
+        sort_order=sort_order,
+        page=page,
+        page_size=page_size,
+        pagination=pagination,
+        cursor=cursor,
+        count_mode=count_mode,
+        fields=selected
+    )
+    return listing_response(result, preview)
+
+# Image and cache endpoints do no database work; the sync handlers already
+# run in the threadpool, which suits their blocking file I/O.
+router.add_api_route("/product/cache/stats", user_routes.get_product_cache_stats, methods=["GET"])
+# Bulk import/export are long-running batch jobs; they use the sync session
+# in the threadpool rather than hold an async connection for their duration.
+router.add_api_route("/product/import", user_routes.import_product_catalog, methods=["POST"])
+router.add_api_route("/product/export", user_routes.export_product_catalog, methods=["GET"])
+
+@router.get("/product/{product_id}", response_model=ProductResponse, response_model_exclude_unset=True)
+async def get_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_db),
+    fields: str | None = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    return await fetch_product(db, product_id, parse_fields(fields))
+
+router.add_api_route("/product/image/{image_key}", user_routes.get_product_image, methods=["GET"])
+router.add_api_route("/product/image/{image_key}/{size}", user_routes.get_product_image_derivative, methods=["GET"])
+
+@router.delete("/product/delete/{product_id}")
+async def delete_product_soft(
+    product_id: int,
+    current_user_id: int,
+    db: AsyncSession = Depends(get_db),
+    token_payload: dict | None = Depends(optional_current_user),
+):
+    check_acting_user(current_user_id, token_payload)
+    return await soft_delete_product_service(db, product_id, current_user_id)
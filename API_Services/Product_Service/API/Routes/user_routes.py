@@ -1,18 +1,36 @@
-from fastapi import APIRouter, Depends, Query, Form, File, UploadFile, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Form, File, UploadFile, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from Db.Database import SessionLocal
-import base64
 
 from ProductService.ProductService import (
     add_product,
     fetch_all_products,
+    fetch_product,
     update_product_details,
-    soft_delete_product_service
+    soft_delete_product_service,
+    listing_response,
+    listing_stream_statement,
+    listing_validators,
+    stream_product_listing,
+    parse_fields,
+    blob_store,
+    queue_image_derivatives,
 )
+from Schema.product_schema import ProductListResponse, ProductResponse
+from ProductService.ProductBulk import detect_format, import_products, iter_export
+from Repository_DataAcess.ProductCache import cache_stats
+from Storage.BlobResponse import blob_response
+from Storage.BlobStore import BlobNotFound
+from Storage.ImageDerivatives import DERIVATIVE_SIZES, ensure_derivative
+from Utils.Auth import check_acting_user, check_admin, optional_current_user
+from Utils.HttpCache import is_not_modified, validator_headers
+from config import LISTING_CACHE_CONTROL
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 def get_db():
     db = SessionLocal()
     try:
@@ -28,8 +46,10 @@ def save_product(
     price: float = Form(...),
     current_user_id: int = Form(...),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    token_payload: dict | None = Depends(optional_current_user),
 ):
+    check_acting_user(current_user_id, token_payload)
     if product_id == 0 or product_id is None:
         new_product = add_product(
             db=db,
@@ -44,46 +64,139 @@ def save_product(
     update_data = {"name": name, "description": description, "price": price}
     return update_product_details(db, product_id, update_data, current_user_id, image)
 
-@router.get("/product/all")
+@router.get("/product/all", response_model=ProductListResponse, response_model_exclude_unset=True)
 def get_all_products(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     search: str | None = Query(None, description="Search by name or description"),
-    sort_by: str = Query("id", description="Field to sort by"),
+    sort_by: str = Query("id", description="Field to sort by: id, name, price, rating, created_date, or relevance (with search)"),
     sort_order: str = Query("asc", description="Sort order: asc or desc"),
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Items per page")
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$", description="offset (page numbers) or cursor (keyset)"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page; implies cursor pagination"),
+    count_mode: str = Query("exact", pattern="^(exact|estimated|cached|none)$", description="How total is computed: exact, estimated, cached or none (has_more only)"),
+    preview: bool = Query(False, description="Inline a tiny blurred-up preview image"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json (one page) or ndjson (stream every match, one product per line)"),
+    limit: int | None = Query(None, ge=1, description="ndjson only: stop after this many products"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,name,price (id is always included)")
 ):
+    selected = parse_fields(fields, preview)
+    validators = listing_validators(db, request.query_params, preview)
+    cache_headers = validator_headers(*validators, LISTING_CACHE_CONTROL) if validators else {}
+    if validators and is_not_modified(request.headers, *validators):
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    if format == "ndjson":
+        statement = listing_stream_statement(
+            db, search=search, sort_by=sort_by, sort_order=sort_order, cursor=cursor, limit=limit, fields=selected
+        )
+
+        def _stream():
+            # The response outlives request dependencies, so it owns its session
+            stream_db = SessionLocal()
+            try:
+                yield from stream_product_listing(stream_db, statement, preview, selected)
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(_stream(), media_type=NDJSON_MEDIA_TYPE, headers=cache_headers)
+
     result = fetch_all_products(
         db=db,
         search=search,
         sort_by=sort_by,
         sort_order=sort_order,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        pagination=pagination,
+        cursor=cursor,
+        count_mode=count_mode,
+        fields=selected
     )
 
-    # Convert image blobs to base64 for API response
-    items = []
-    for p in result["items"]:
-        image_base64 = base64.b64encode(p.image_blob).decode() if p.image_blob else None
-        items.append({
-            "id": p.id,
-            "name": p.name,
-            "description": p.description,
-            "price": p.price,
-            "is_active": p.is_active,
-            "rating": p.rating,
-            "image_filename": p.image_filename,
-            "image_base64": image_base64
-        })
-
-    return {
-        "items": items,
-        "total": result["total"],
-        "page": result["page"],
-        "page_size": result["page_size"],
-        "pages": result["pages"]
-    }
+    return listing_response(result, preview)
+
+@router.get("/product/cache/stats")
+def get_product_cache_stats():
+    return cache_stats()
+
+@router.post("/product/import")
+def import_product_catalog(
+    file: UploadFile = File(..., description="CSV or NDJSON, one product per row"),
+    images: UploadFile = File(None, description="Zip of the images named in the image column"),
+    current_user_id: int = Form(...),
+    format: str | None = Form(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    token_payload: dict | None = Depends(optional_current_user),
+):
+    # Imports bypass the per-product upload path; admins only
+    check_admin(token_payload)
+    check_acting_user(current_user_id, token_payload)
+    try:
+        fmt = detect_format(file.filename, format)
+        return import_products(db, file.file, fmt, current_user_id, images.file if images else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": NDJSON_MEDIA_TYPE}
+
+@router.get("/product/export")
+def export_product_catalog(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    include_inactive: bool = Query(False),
+    token_payload: dict | None = Depends(optional_current_user),
+):
+    # Soft-deleted products are hidden everywhere else; only admins may dump them
+    if include_inactive:
+        check_admin(token_payload)
+
+    def _stream():
+        # The response outlives request dependencies, so it owns its session
+        db = SessionLocal()
+        try:
+            yield from iter_export(db, format, include_inactive)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        _stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+@router.get("/product/{product_id}", response_model=ProductResponse, response_model_exclude_unset=True)
+def get_product(
+    product_id: int,
+    db: Session = Depends(get_db),
+    fields: str | None = Query(None, description="Comma-separated fields to return (id is always included)"),
+):
+    return fetch_product(db, product_id, parse_fields(fields))
+
+@router.get("/product/image/{image_key}")
+def get_product_image(image_key: str, request: Request):
+    # Blobs stored before background precompression (or never queued) get
+    # their job queued here; the durable queue dedupes repeats
+    return blob_response(blob_store, image_key, request.headers, on_missing_encodings=queue_image_derivatives)
+
+@router.get("/product/image/{image_key}/{size}")
+def get_product_image_derivative(image_key: str, size: str, request: Request):
+    if size not in DERIVATIVE_SIZES:
+        raise HTTPException(status_code=404, detail="Unknown image size")
+    try:
+        variant = ensure_derivative(blob_store, image_key, size)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return blob_response(blob_store, image_key, request.headers, variant=variant)
+
 @router.delete("/product/delete/{product_id}")
-def delete_product_soft(product_id: int, current_user_id: int, db: Session = Depends(get_db)):
+def delete_product_soft(
+    product_id: int,
+    current_user_id: int,
+    db: Session = Depends(get_db),
+    token_payload: dict | None = Depends(optional_current_user),
+):
+    check_acting_user(current_user_id, token_payload)
     return soft_delete_product_service(db, product_id, current_user_id)
@@ -0,0 +1,21 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from config import DB_CONNECTION_STRING, DB_SLOW_CHECKOUT_MS
+from Db.Database import pool_settings
+from Shared.AsyncDatabase import to_async_url
+from Shared.Instrumentation import instrument_engine
+from Shared.PoolTelemetry import PoolTelemetry, engine_options, register_engine
+
+# Only imported when Database.Mode is "async", so asyncpg/aiosqlite are
+# not required for the default sync stack.
+
+ASYNC_CONNECTION_STRING = to_async_url(DB_CONNECTION_STRING)
+async_pool_telemetry = PoolTelemetry("async", slow_checkout_ms=DB_SLOW_CHECKOUT_MS)
+async_engine = create_async_engine(
+    ASYNC_CONNECTION_STRING,
+    **engine_options(ASYNC_CONNECTION_STRING, async_pool_telemetry, is_async=True, **pool_settings),
+)
+register_engine(async_pool_telemetry, async_engine)
+instrument_engine(async_engine.sync_engine, async_pool_telemetry.name)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
@@ -0,0 +1,16 @@
+from Db.Database import Base
+from sqlalchemy import Index
+from Shared.Jobs import JobOutboxMixin, idempotency_index
+
+class ProductJob(Base, JobOutboxMixin):
+    """
+    Outbox of durable background jobs (see Shared/Jobs.py).
+    """
+    __tablename__ = "product_jobs"
+    __table_args__ = (
+        # The dispatcher polls for due rows by status and run_at
+        Index("ix_admin_product_jobs_status_run_at", "status", "run_at"),
+        # One pending/running row per idempotency key
+        idempotency_index("ux_admin_product_jobs_idempotency_key_active"),
+        {"schema": "admin"},
+    )
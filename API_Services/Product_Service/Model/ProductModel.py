@@ -1,7 +1,7 @@
 import datetime
 from .BaseEntity import BaseEntity
 from Db.Database import Base
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, LargeBinary
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, Index, literal_column
 from sqlalchemy.sql import func
 
 class Product(Base,BaseEntity):
@@ -13,5 +13,28 @@ class Product(Base,BaseEntity):
     description = Column(Text, nullable=False)
     price = Column(Float, nullable=False)
     rating = Column(Float, default=0.0, nullable=True)
-    image_blob = Column(LargeBinary, nullable=False)
+    # Image bytes live in the blob store; the row keeps only the content hash
+    image_key = Column(String(64), nullable=False, index=True)
     image_filename = Column(String, nullable=False)
+    image_size = Column(Integer, nullable=True)
+    image_content_type = Column(String(100), nullable=True)
+
+
+# Sort keys used by the catalog listing. Keyset pagination seeks on
+# (sort key, id), so each one has a matching composite index; Postgres
+# scans the same index backwards for descending order.
+PRODUCT_SORT_KEYS = {
+    "id": Product.id,
+    "name": Product.name,
+    "price": Product.price,
+    # rating is nullable; NULLs would break row-value comparisons
+    "rating": func.coalesce(Product.rating, literal_column("0.0")),
+    "created_date": Product.created_date,
+}
+
+Index("ix_admin_products_name_id", PRODUCT_SORT_KEYS["name"], Product.id)
+Index("ix_admin_products_price_id", PRODUCT_SORT_KEYS["price"], Product.id)
+Index("ix_admin_products_rating_id", PRODUCT_SORT_KEYS["rating"], Product.id)
+Index("ix_admin_products_created_date_id", PRODUCT_SORT_KEYS["created_date"], Product.id)
+# Catalog Last-Modified is MAX(updated_date) / MAX(created_date)
+Index("ix_admin_products_updated_date", Product.updated_date)
@@ -1,2 +1,3 @@
 from .BaseEntity import BaseEntity
-from .ProductModel import Product
\ No newline at end of file
+from .ProductModel import Product
+from .JobModel import ProductJob
\ No newline at end of file
@@ -0,0 +1,344 @@
+import csv
+import io
+import json
+import mimetypes
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from Model.ProductModel import Product
+from ProductService.ProductService import (
+    blob_store, ensure_image_folder_exists, ImageRejected, queue_image_derivatives, store_image_stream
+)
+from Repository_DataAcess.ProductRepo import bulk_insert_products, image_keys_in_use, iter_products_for_export
+from Schema.product_schema import ProductImportRow
+from Storage.BlobStore import guess_content_type
+
+# -------------------------------------------------------
+# BULK PRODUCT IMPORT / EXPORT
+# -------------------------------------------------------
+# Shared by the /product/import and /product/export endpoints and by
+# bulk_cli.py. Input is read row by row and inserted in chunks, so memory
+# use depends on the chunk size, not on the size of the file.
+
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+EXPORT_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "price",
+    "rating",
+    "image",
+    "image_key",
+    "image_filename",
+    "image_size",
+    "image_content_type",
+    "is_active",
+    "created_date",
+]
+
+
+def detect_format(filename: Optional[str], requested: Optional[str] = None) -> str:
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported format '{requested}'")
+        return requested
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    raise ValueError("Cannot tell the file format from its name; pass format=csv or format=ndjson")
+
+
+def iter_rows(stream: BinaryIO, fmt: str) -> Iterator[tuple[int, dict]]:
+    """
+    Yield ``(line_number, raw_row)`` from a binary CSV or NDJSON stream.
+    Unparseable NDJSON lines are yielded as ``(line, None)``.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Empty CSV cells mean "not given"
+                yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+            return
+
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def _image_extension(content_type: Optional[str]) -> str:
+    return (mimetypes.guess_extension(content_type or "") or "") if content_type else ""
+
+
+def export_image_name(image_key: str, content_type: Optional[str]) -> str:
+    """
+    Name of an image inside an export archive; also what the export's
+    ``image`` column holds, so an export can be imported again as-is.
+    """
+    return f"{image_key}{_image_extension(content_type)}"
+
+
+class ImageArchive:
+    """
+    Images for an import, read lazily from a zip. Each member is stored in
+    the blob store at most once, however many rows use it. Derivatives are
+    queued only once a row using the image has been committed; images no
+    committed row uses are deleted again by discard_unused.
+    """
+
+    def __init__(self, fileobj: Optional[BinaryIO]):
+        try:
+            self._zip = zipfile.ZipFile(fileobj) if fileobj is not None else None
+        except zipfile.BadZipFile:
+            raise ValueError("images must be a zip archive")
+        self._stored: dict[str, dict] = {}
+        # Keys stored from the archive that no committed row uses yet
+        self._uncommitted: set[str] = set()
+
+    @property
+    def available(self) -> bool:
+        return self._zip is not None
+
+    def image_fields(self, name: str) -> dict:
+        if name in self._stored:
+            return self._stored[name]
+        if self._zip is None:
+            raise ValueError(f"Image '{name}' given but no image archive was uploaded")
+        try:
+            member = self._zip.open(name)
+        except KeyError:
+            raise ValueError(f"Image '{name}' not found in the archive")
+        # Decompressed in chunks straight into the blob store, under the
+        # same type and size limits as a single upload
+        try:
+            with member:
+                fields = store_image_stream(member)
+        except ImageRejected as e:
+            raise ValueError(f"Image '{name}': {e}")
+
+        fields["image_filename"] = name.rsplit("/", 1)[-1]
+        self._stored[name] = fields
+        self._uncommitted.add(fields["image_key"])
+        return fields
+
+    def committed(self, rows: list[dict]) -> None:
+        """
+        Queue derivatives for the archive images used by committed rows.
+        """
+        for row in rows:
+            if row["image_key"] in self._uncommitted:
+                self._uncommitted.discard(row["image_key"])
+                queue_image_derivatives(row["image_key"])
+
+    def discard_unused(self, db: Session) -> None:
+        """
+        Delete the archive images whose rows all failed. A blob that some
+        product already references (the same image uploaded before) stays.
+        """
+        for image_key in self._uncommitted - image_keys_in_use(db, self._uncommitted):
+            blob_store.delete(image_key)
+        self._uncommitted.clear()
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _existing_blob_fields(image_key: str) -> dict:
+    if not blob_store.exists(image_key):
+        raise ValueError(f"image_key '{image_key}' is not in the blob store")
+    return {
+        "image_key": image_key,
+        "image_filename": image_key,
+        "image_size": blob_store.size(image_key),
+        "image_content_type": guess_content_type(blob_store.read_header(image_key)),
+    }
+
+
+def _validation_messages(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()]
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, messages: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def _flush(db: Session, chunk: list[tuple[int, dict]], report: ImportReport) -> list[dict]:
+    """
+    Insert the chunk and return the rows that were committed.
+    """
+    if not chunk:
+        return []
+    try:
+        bulk_insert_products(db, [row for _, row in chunk])
+        report.imported += len(chunk)
+        return [row for _, row in chunk]
+    except DBAPIError:
+        db.rollback()
+
+    # Something in the chunk was rejected by the database; retry row by
+    # row so only the offending rows are reported
+    committed = []
+    for line, row in chunk:
+        try:
+            bulk_insert_products(db, [row])
+            report.imported += 1
+            committed.append(row)
+        except DBAPIError as e:
+            db.rollback()
+            report.error(line, [str(e.orig)])
+    return committed
+
+
+def import_products(
+    db: Session,
+    stream: BinaryIO,
+    fmt: str,
+    current_user_id: int,
+    images: Optional[BinaryIO] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> dict:
+    """
+    Validate each row with ProductImportRow, store its image, and insert
+    valid rows in chunks of ``chunk_size``. Returns a report with per-row
+    errors (line numbers refer to the input file).
+    """
+    ensure_image_folder_exists()
+    archive = ImageArchive(images)
+    report = ImportReport()
+    chunk: list[tuple[int, dict]] = []
+    now = datetime.utcnow()
+
+    try:
+        for line, raw in iter_rows(stream, fmt):
+            if raw is None:
+                report.error(line, ["row: not a JSON object"])
+                continue
+            try:
+                item = ProductImportRow.model_validate(raw)
+            except ValidationError as e:
+                report.error(line, _validation_messages(e))
+                continue
+            try:
+                # A re-imported export carries both; the archive wins if one was uploaded
+                if item.image and (archive.available or not item.image_key):
+                    image_fields = archive.image_fields(item.image)
+                else:
+                    image_fields = _existing_blob_fields(item.image_key)
+                if item.image_filename:
+                    image_fields = {**image_fields, "image_filename": item.image_filename}
+            except ValueError as e:
+                report.error(line, [f"image: {e}"])
+                continue
+
+            chunk.append((line, {
+                "name": item.name,
+                "description": item.description,
+                "price": item.price,
+                "rating": item.rating if item.rating is not None else 0.0,
+                **image_fields,
+                "created_by": current_user_id,
+                "created_date": now,
+                "updated_date": now,
+                "is_active": 1,
+            }))
+            if len(chunk) >= chunk_size:
+                archive.committed(_flush(db, chunk, report))
+                chunk = []
+        archive.committed(_flush(db, chunk, report))
+    finally:
+        archive.close()
+        db.rollback()
+        archive.discard_unused(db)
+
+    return report.as_dict()
+
+
+def _export_record(p: Product) -> dict:
+    return {
+        "id": p.id,
+        "name": p.name,
+        "description": p.description,
+        "price": p.price,
+        "rating": p.rating,
+        "image": export_image_name(p.image_key, p.image_content_type),
+        "image_key": p.image_key,
+        "image_filename": p.image_filename,
+        "image_size": p.image_size,
+        "image_content_type": p.image_content_type,
+        "is_active": p.is_active,
+        "created_date": p.created_date.isoformat() if p.created_date else None,
+    }
+
+
+def iter_export(db: Session, fmt: str, include_inactive: bool = False) -> Iterator[str]:
+    """
+    Yield the catalog as CSV or NDJSON text, one row at a time.
+    """
+    products = iter_products_for_export(db, include_inactive)
+    if fmt == "ndjson":
+        for p in products:
+            yield json.dumps(_export_record(p), default=str) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for p in products:
+        writer.writerow(_export_record(p))
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_image_archive(db: Session, target: BinaryIO, include_inactive: bool = False) -> int:
+    """
+    Write every distinct product image into a zip (names match the export's
+    ``image`` column). Returns the number of images written.
+    """
+    written = set()
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as archive:
+        for p in iter_products_for_export(db, include_inactive):
+            if p.image_key in written or not blob_store.exists(p.image_key):
+                continue
+            with archive.open(export_image_name(p.image_key, p.image_content_type), "w") as member:
+                for chunk in blob_store.iter_range(p.image_key, 0, blob_store.size(p.image_key) - 1):
+                    member.write(chunk)
+            written.add(p.image_key)
+    return len(written)
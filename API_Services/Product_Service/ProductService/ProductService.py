@@ -1,60 +1,201 @@
+import itertools
+import json
 import os
 from datetime import datetime
+from typing import BinaryIO, Iterator
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, UploadFile
 
 from Model.ProductModel import Product
 from Repository_DataAcess.ProductRepo import (
     create_product,
-    get_all_products,
+    get_product_page,
+    count_products,
+    estimate_product_count,
+    get_products_after_cursor,
+    product_stream_statement,
     get_product_by_id,
+    get_product_row,
+    get_catalog_last_modified,
+    PRODUCT_FIELDS,
     update_product,
     soft_delete_product,
 )
+import base64
+
+from Storage.BlobStore import CHUNK_SIZE, LocalBlobStore, BlobNotFound, BlobTooLarge, guess_content_type
+from Storage.ImageDerivatives import DERIVATIVE_SIZES, process_original, variant_name
+from ProductService.ProductJobs import job_queue
+from Repository_DataAcess.ProductCache import (
+    get_product_cached,
+    get_listing_cached,
+    get_count_cached,
+    get_last_modified_cached,
+)
+from Utils.HttpCache import weak_etag
+from config import UPLOAD_ALLOWED_CONTENT_TYPES, UPLOAD_MAX_IMAGE_BYTES
+
+COUNT_MODES = ("exact", "estimated", "cached", "none")
 
 PRODUCT_IMAGE_DIR = "Product_Catalog"
+IMAGE_URL_PREFIX = "/user/product/image"
+
+blob_store = LocalBlobStore(PRODUCT_IMAGE_DIR)
+
+IMAGE_DERIVATIVES_JOB = "image.derivatives"
+
+@job_queue.handler(IMAGE_DERIVATIVES_JOB)
+def _image_derivatives_job(payload: dict) -> None:
+    process_original(blob_store, payload["image_key"])
 
 def ensure_image_folder_exists():
     if not os.path.exists(PRODUCT_IMAGE_DIR):
         os.makedirs(PRODUCT_IMAGE_DIR)
 
-def save_product_image(image: UploadFile, product_id: int) -> tuple[str, bytes]:
-    ensure_image_folder_exists()
-    file_extension = image.filename.split(".")[-1]
-    filename = f"{product_id}_{datetime.utcnow().timestamp()}.{file_extension}"
-    filepath = os.path.join(PRODUCT_IMAGE_DIR, filename)
+def image_url(image_key: str | None, size: str | None = None) -> str | None:
+    if not image_key:
+        return None
+    return f"{IMAGE_URL_PREFIX}/{image_key}/{size}" if size else f"{IMAGE_URL_PREFIX}/{image_key}"
 
-    image_data = image.file.read()
-    with open(filepath, "wb") as buffer:
-        buffer.write(image_data)
+def thumbnail_urls(image_key: str | None) -> dict:
+    if not image_key:
+        return {}
+    return {size: image_url(image_key, size) for size in DERIVATIVE_SIZES if size != "preview"}
+
+def image_preview(image_key: str | None) -> str | None:
+    """
+    Tiny inline preview as a data URI, or None if it has not been rendered yet.
+    """
+    if not image_key:
+        return None
+    variant = variant_name("preview")
+    try:
+        data = blob_store.read(image_key, variant)
+    except BlobNotFound:
+        return None
+    return f"data:image/{variant.split('.')[-1]};base64,{base64.b64encode(data).decode()}"
+
+class ImageRejected(ValueError):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+
+def store_image_stream(stream: BinaryIO) -> dict:
+    """
+    Copy an image from a file object into the blob store CHUNK_SIZE bytes at
+    a time and return its key, size and content type. The type is checked
+    on the first chunk and the size limit while copying, so a rejected
+    upload is never written out in full. Raises ImageRejected.
+    """
+    first = stream.read(CHUNK_SIZE)
+    if not first:
+        raise ImageRejected(400, "Image file is empty")
+    content_type = guess_content_type(first[:16])
+    if content_type not in UPLOAD_ALLOWED_CONTENT_TYPES:
+        raise ImageRejected(415, f"Unsupported image type ({content_type})")
+
+    chunks = itertools.chain([first], iter(lambda: stream.read(CHUNK_SIZE), b""))
+    try:
+        image_key, size = blob_store.put_stream(chunks, max_size=UPLOAD_MAX_IMAGE_BYTES)
+    except BlobTooLarge:
+        raise ImageRejected(413, f"Image is larger than {UPLOAD_MAX_IMAGE_BYTES} bytes")
+    return {"image_key": image_key, "image_size": size, "image_content_type": content_type}
+
+def queue_image_derivatives(image_key: str) -> None:
+    # Durable: a restart before the derivatives exist does not lose the work,
+    # and storing the same image again (same key) queues nothing new
+    job_queue.enqueue_durable(
+        IMAGE_DERIVATIVES_JOB, {"image_key": image_key}, idempotency_key=f"{IMAGE_DERIVATIVES_JOB}:{image_key}"
+    )
 
-    return filename, image_data
+def save_product_image(image: UploadFile) -> dict:
+    """
+    Store the upload in the blob store and return the image columns
+    to set on the product row. Blocking file I/O: async routes call it
+    through run_in_threadpool.
+    """
+    # Starlette knows the size when the client sent it; reject before reading
+    if image.size is not None and image.size > UPLOAD_MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image is larger than {UPLOAD_MAX_IMAGE_BYTES} bytes")
+
+    ensure_image_folder_exists()
+    try:
+        fields = store_image_stream(image.file)
+    except ImageRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    queue_image_derivatives(fields["image_key"])
+    return {**fields, "image_filename": image.filename}
 
 def add_product(db: Session, name: str, description: str, price: float, current_user_id: int, image: UploadFile):
     if not image:
         raise HTTPException(status_code=400, detail="Image is required for new product")
 
-    image_data = image.file.read()
-    filename = image.filename
+    image_fields = save_product_image(image)
 
-    # Save image file
-    ensure_image_folder_exists()
-    path = os.path.join(PRODUCT_IMAGE_DIR, filename)
-    with open(path, "wb") as f:
-        f.write(image_data)
+    return create_product(db, build_product(name, description, price, current_user_id, image_fields))
 
-    product = Product(
+def build_product(name: str, description: str, price: float, current_user_id: int, image_fields: dict) -> Product:
+    return Product(
         name=name,
         description=description,
         price=price,
-        image_filename=filename,
-        image_blob=image_data,
+        **image_fields,
         created_by=current_user_id,
         created_date=datetime.utcnow(),
         is_active=1
     )
 
-    return create_product(db, product)
+# Builds each API field from a Product or a projected Row
+_FIELD_VALUES = {
+    "id": lambda p: p.id,
+    "name": lambda p: p.name,
+    "description": lambda p: p.description,
+    "price": lambda p: p.price,
+    "is_active": lambda p: p.is_active,
+    "rating": lambda p: p.rating,
+    "image_filename": lambda p: p.image_filename,
+    "image_key": lambda p: p.image_key,
+    "image_url": lambda p: image_url(p.image_key),
+    "thumbnails": lambda p: thumbnail_urls(p.image_key),
+}
+
+def parse_fields(fields: str | None, preview: bool = False) -> tuple | None:
+    """
+    Validate a comma-separated ``fields=`` value. Returns the fields in
+    canonical order (id always included), or None for every field.
+    """
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested.difference(PRODUCT_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(PRODUCT_FIELDS)}"
+        )
+    requested.add("id")
+    if preview:
+        # Previews are looked up by image key
+        requested.add("image_key")
+    return tuple(f for f in PRODUCT_FIELDS if f in requested)
+
+def product_to_dict(p, fields=None) -> dict:
+    return {field: _FIELD_VALUES[field](p) for field in fields or PRODUCT_FIELDS}
+
+def fetch_product(db: Session, product_id: int, fields=None) -> dict:
+    # The cache holds the full product; fields only trims the response
+    product = get_product_cached(
+        product_id,
+        lambda: _product_or_none(get_product_row(db, product_id))
+    )
+    # An entry cached before a soft delete in another process is still dead
+    if not product or not product.get("is_active"):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return {field: product[field] for field in fields} if fields else product
+
+def _product_or_none(product) -> dict | None:
+    return product_to_dict(product) if product else None
 
 def fetch_all_products(
     db,
@@ -62,25 +203,178 @@ def fetch_all_products(
     sort_by: str = "id",
     sort_order: str = "asc",
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    pagination: str = "offset",
+    cursor: str | None = None,
+    count_mode: str = "exact",
+    fields=None
 ):
-    products, total = get_all_products(
-        db=db,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        page=page,
-        page_size=page_size
-    )
+    """
+    Listing page with serialized items, served through the read-through cache.
+    ``fields`` (from parse_fields) limits both the selected columns and the
+    serialized keys.
+    """
+    params = {
+        "search": search,
+        "sort_by": sort_by,
+        "sort_order": sort_order.lower(),
+        "page": page,
+        "page_size": page_size,
+        "pagination": pagination,
+        "cursor": cursor,
+        "count_mode": count_mode,
+        "fields": fields,
+    }
+    return get_listing_cached(params, lambda: _load_product_listing(db, **params))
+
+def _load_product_listing(
+    db,
+    search: str | None,
+    sort_by: str,
+    sort_order: str,
+    page: int,
+    page_size: int,
+    pagination: str,
+    cursor: str | None,
+    count_mode: str,
+    fields
+):
+    if pagination == "cursor" or cursor:
+        try:
+            products, next_cursor = get_products_after_cursor(
+                db=db,
+                search=search,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                cursor=cursor,
+                page_size=page_size,
+                fields=fields
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "items": [product_to_dict(p, fields) for p in products],
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None
+        }
+
+    if count_mode == "none":
+        # Over-fetch one row to answer has_more without counting
+        products = get_product_page(db, search, sort_by, sort_order, page, page_size, extra=1, fields=fields)
+        has_more = len(products) > page_size
+        return {
+            "items": [product_to_dict(p, fields) for p in products[:page_size]],
+            "total": None,
+            "total_mode": "none",
+            "has_more": has_more,
+            "page": page,
+            "page_size": page_size,
+            "pages": None
+        }
+
+    products = get_product_page(db, search, sort_by, sort_order, page, page_size, fields=fields)
+    total, total_mode = _count_for_listing(db, search, count_mode)
 
     return {
-        "items": products,
+        "items": [product_to_dict(p, fields) for p in products],
         "total": total,
+        "total_mode": total_mode,
+        "has_more": page * page_size < total,
         "page": page,
         "page_size": page_size,
         "pages": (total + page_size - 1) // page_size  # ceil division
     }
 
+def listing_validators(db: Session, query_params, preview: bool = False) -> tuple[str, datetime | None] | None:
+    """
+    ``(etag, last_modified)`` for a listing request, derived from the
+    catalog's latest write and the query string, so a conditional GET is
+    answered before any page is loaded or serialized. Previews are rendered
+    in the background and can appear without a database write, so preview
+    requests get no validators.
+    """
+    if preview:
+        return None
+    last_modified = get_last_modified_cached(lambda: get_catalog_last_modified(db))
+    return weak_etag(last_modified, sorted(query_params.multi_items())), last_modified
+
+def listing_response(result: dict, preview: bool = False) -> dict:
+    """
+    Shape a fetch_all_products result for the API, optionally inlining previews.
+    """
+    # Items may come from the cache, so build new dicts rather than mutating them
+    items = [
+        {**item, "image_preview": image_preview(item["image_key"]) if preview else None}
+        for item in result["items"]
+    ]
+
+    if "next_cursor" in result:
+        return {
+            "items": items,
+            "page_size": result["page_size"],
+            "next_cursor": result["next_cursor"],
+            "has_more": result["has_more"]
+        }
+
+    return {
+        "items": items,
+        "total": result["total"],
+        "total_mode": result["total_mode"],
+        "has_more": result["has_more"],
+        "page": result["page"],
+        "page_size": result["page_size"],
+        "pages": result["pages"]
+    }
+
+# -------------------------------------------------------
+# NDJSON STREAMING
+# -------------------------------------------------------
+# One product per line, written as rows come off a server-side cursor.
+# Output is flushed every STREAM_FLUSH_BYTES so each write to the socket
+# carries many rows, while memory stays bounded by one cursor batch.
+
+STREAM_FLUSH_BYTES = 16 * 1024
+
+def listing_stream_statement(db: Session, **kwargs):
+    try:
+        return product_stream_statement(db, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def ndjson_line(p, fields=None, preview: str | None = None) -> str:
+    return json.dumps({**product_to_dict(p, fields), "image_preview": preview}) + "\n"
+
+def stream_product_listing(db: Session, statement, preview: bool = False, fields=None) -> Iterator[str]:
+    buffer = []
+    size = 0
+    for p in db.execute(statement):
+        line = ndjson_line(p, fields, image_preview(p.image_key) if preview else None)
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_FLUSH_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+def _count_for_listing(db: Session, search: str | None, count_mode: str) -> tuple[int, str]:
+    """
+    Resolve the listing total for ``count_mode`` and report which mode
+    actually produced it (estimates fall back to exact where unsupported).
+    """
+    if count_mode == "estimated":
+        estimate = estimate_product_count(db, search)
+        if estimate is not None:
+            return estimate, "estimated"
+
+    if count_mode == "cached":
+        total, from_cache = get_count_cached(search, lambda: count_products(db, search))
+        return total, "cached" if from_cache else "exact"
+
+    return count_products(db, search), "exact"
+
 def update_product_details(db: Session, product_id: int, update_data: dict, current_user_id: int, image: UploadFile | None):
     product = get_product_by_id(db, product_id)
     if not product:
@@ -89,11 +383,13 @@ def update_product_details(db: Session, product_id: int, update_data: dict, curr
     update_data["updated_by"] = current_user_id
     update_data["updated_date"] = datetime.utcnow()
 
-    updated = update_product(db, product_id, update_data)
-
+    # One UPDATE (and one cache invalidation) covering the image columns too
     if image:
-        filename, image_data = save_product_image(image, product_id)
-        update_product(db, product_id, {"image_filename": filename, "image_blob": image_data})
+        update_data.update(save_product_image(image))
+
+    # None when the row vanished between the check above and the update
+    if update_product(db, product_id, update_data) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
 
     return {
         "message": "Product updated successfully",
@@ -0,0 +1,101 @@
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from ProductService import ProductService
+from ProductService.ProductService import (
+    STREAM_FLUSH_BYTES,
+    build_product,
+    image_preview,
+    ndjson_line,
+    save_product_image,
+)
+from Repository_DataAcess.ProductRepoAsync import (
+    create_product,
+    get_product_by_id,
+    update_product,
+    soft_delete_product,
+)
+
+# -------------------------------------------------------
+# ASYNC PRODUCT SERVICE
+# -------------------------------------------------------
+# Mirrors ProductService for the async stack. Blob-store writes are file
+# I/O, so they run in the threadpool; database work stays on the loop.
+# The shared service code called through run_sync also reads the product
+# cache; a Redis backend hands those calls to the threadpool itself
+# (Utils/Cache.py).
+
+async def add_product(db: AsyncSession, name: str, description: str, price: float, current_user_id: int, image: UploadFile):
+    if not image:
+        raise HTTPException(status_code=400, detail="Image is required for new product")
+
+    image_fields = await run_in_threadpool(save_product_image, image)
+
+    return await create_product(db, build_product(name, description, price, current_user_id, image_fields))
+
+async def fetch_product(db: AsyncSession, product_id: int, fields=None) -> dict:
+    return await db.run_sync(ProductService.fetch_product, product_id, fields)
+
+async def fetch_all_products(db: AsyncSession, **kwargs) -> dict:
+    return await db.run_sync(lambda session: ProductService.fetch_all_products(session, **kwargs))
+
+async def listing_validators(db: AsyncSession, query_params, preview: bool = False):
+    return await db.run_sync(ProductService.listing_validators, query_params, preview)
+
+async def listing_stream_statement(db: AsyncSession, **kwargs):
+    # Built in run_sync: the in-memory search backend loads through a sync Session
+    return await db.run_sync(lambda session: ProductService.listing_stream_statement(session, **kwargs))
+
+async def stream_product_listing(db: AsyncSession, statement, preview: bool = False, fields=None) -> AsyncIterator[str]:
+    buffer = []
+    size = 0
+    async for p in await db.stream(statement):
+        preview_uri = await run_in_threadpool(image_preview, p.image_key) if preview else None
+        line = ndjson_line(p, fields, preview_uri)
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_FLUSH_BYTES:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+async def update_product_details(db: AsyncSession, product_id: int, update_data: dict, current_user_id: int, image: UploadFile | None):
+    product = await get_product_by_id(db, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    update_data["updated_by"] = current_user_id
+    update_data["updated_date"] = datetime.utcnow()
+
+    if image:
+        update_data.update(await run_in_threadpool(save_product_image, image))
+
+    if await update_product(db, product_id, update_data) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    return {
+        "message": "Product updated successfully",
+        "product_id": product_id
+    }
+
+async def soft_delete_product_service(db: AsyncSession, product_id: int, current_user_id: int):
+    product = await get_product_by_id(db, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    update_data = {
+        "is_active": 0,
+        "updated_by": current_user_id,
+        "updated_date": datetime.utcnow()
+    }
+
+    await soft_delete_product(db, product_id, update_data)
+
+    return {
+        "message": "Product deleted successfully (soft delete)",
+        "product_id": product_id
+    }
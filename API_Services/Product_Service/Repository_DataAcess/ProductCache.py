@@ -0,0 +1,116 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from config import PRODUCT_CACHE_MAX_COUNTERS, PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_URL, SERVER_WORKERS
+from Utils.Cache import create_cache_backend
+
+# -------------------------------------------------------
+# READ-THROUGH PRODUCT CACHE
+# -------------------------------------------------------
+# Keys:
+#   product:{id}:v{version}      one serialized product
+#   listing:g{generation}:{hash}  one listing page (items + paging info)
+#   count:g{generation}:{hash}    exact COUNT for a search term
+#   lastmod:g{generation}         catalog Last-Modified (ETag source)
+# A product write bumps that product's version and the listing generation.
+# Readers fetch the version/generation *before* loading from the database,
+# so a value loaded concurrently with a write is stored under a key that
+# is already dead and can never be served.
+
+PRODUCT_TTL_SECONDS = 300
+LISTING_TTL_SECONDS = 60
+COUNT_TTL_SECONDS = 30
+
+LISTING_GENERATION_KEY = "listing:generation"
+
+if SERVER_WORKERS > 1 and PRODUCT_CACHE_URL.startswith("memory://"):
+    raise RuntimeError(
+        "ProductCache.StoreUrl must be a redis:// URL when WEB_CONCURRENCY > 1: "
+        "the memory cache is per worker, so writes would not invalidate the others"
+    )
+
+cache = create_cache_backend(
+    PRODUCT_CACHE_URL, max_entries=PRODUCT_CACHE_MAX_ENTRIES, max_counters=PRODUCT_CACHE_MAX_COUNTERS
+)
+
+
+def _version_key(product_id: int) -> str:
+    return f"product:{product_id}:version"
+
+
+def _hash_params(params: dict) -> str:
+    raw = json.dumps(params, sort_keys=True, default=str).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def get_product_cached(product_id: int, loader: Callable[[], Optional[dict]]) -> Optional[dict]:
+    version = cache.get_counter(_version_key(product_id))
+    key = f"product:{product_id}:v{version}"
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        if value is not None:
+            cache.set(key, value, PRODUCT_TTL_SECONDS)
+    return value
+
+
+def get_listing_cached(params: dict, loader: Callable[[], dict]) -> dict:
+    generation = cache.get_counter(LISTING_GENERATION_KEY)
+    key = f"listing:g{generation}:{_hash_params(params)}"
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        cache.set(key, value, LISTING_TTL_SECONDS)
+    return value
+
+
+def get_count_cached(search: Optional[str], loader: Callable[[], int]) -> tuple[int, bool]:
+    """
+    Return ``(total, from_cache)``.
+    """
+    generation = cache.get_counter(LISTING_GENERATION_KEY)
+    key = f"count:g{generation}:{_hash_params({'search': search or ''})}"
+    value = cache.get(key)
+    if value is not None:
+        return value, True
+    value = loader()
+    cache.set(key, value, COUNT_TTL_SECONDS)
+    return value, False
+
+
+def get_last_modified_cached(loader: Callable[[], Optional[datetime]]) -> Optional[datetime]:
+    """
+    Catalog Last-Modified; reloaded at most once per listing generation
+    (and LISTING_TTL_SECONDS, to pick up writes from other processes).
+    """
+    generation = cache.get_counter(LISTING_GENERATION_KEY)
+    key = f"lastmod:g{generation}"
+    value = cache.get(key)
+    if value is not None:
+        return datetime.fromisoformat(value) if value else None
+    result = loader()
+    cache.set(key, result.isoformat() if result else "", LISTING_TTL_SECONDS)
+    return result
+
+
+def invalidate_product(product_id: int) -> None:
+    """
+    Called after any write to a product: drops its cached copy and every
+    cached listing page and count.
+    """
+    cache.incr(_version_key(product_id))
+    cache.incr(LISTING_GENERATION_KEY)
+
+
+def invalidate_listings() -> None:
+    """
+    Called after inserting new products: existing products are unchanged,
+    only listing pages and counts go stale.
+    """
+    cache.incr(LISTING_GENERATION_KEY)
+
+
+def cache_stats() -> dict[str, Any]:
+    return cache.stats()
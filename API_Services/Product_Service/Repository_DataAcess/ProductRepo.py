@@ -1,22 +1,97 @@
+import base64
+import json
+from datetime import datetime
 from sqlalchemy.orm import Session
-# from sqlalchemy import asc, desc
-from Model.ProductModel import Product
+from sqlalchemy import asc, desc, tuple_, func, text, insert, select
+from Model.ProductModel import Product, PRODUCT_SORT_KEYS
+from Search.ProductSearch import get_search_backend, notify_product_changed
+from Repository_DataAcess.ProductCache import invalidate_product, invalidate_listings
 
-def get_all_products(db: Session):
-    return db.query(Product).all()
+# -------------------------------------------------------
+# COLUMN PROJECTION
+# -------------------------------------------------------
+# API field -> the columns it is built from. Read queries select only the
+# columns behind the requested fields and return Row tuples (attribute
+# access by column name), so no Product objects are hydrated.
+PRODUCT_FIELD_COLUMNS = {
+    "id": (Product.id,),
+    "name": (Product.name,),
+    "description": (Product.description,),
+    "price": (Product.price,),
+    "is_active": (Product.is_active,),
+    "rating": (Product.rating,),
+    "image_filename": (Product.image_filename,),
+    "image_key": (Product.image_key,),
+    "image_url": (Product.image_key,),
+    "thumbnails": (Product.image_key,),
+}
+PRODUCT_FIELDS = tuple(PRODUCT_FIELD_COLUMNS)
+
+def product_columns(fields=None) -> list:
+    # id is always selected: it keys the cache, pagination and the response
+    columns = {"id": Product.id}
+    for field in fields or PRODUCT_FIELDS:
+        for column in PRODUCT_FIELD_COLUMNS[field]:
+            columns.setdefault(column.key, column)
+    return list(columns.values())
 
 def get_product_by_id(db: Session, product_id: int) -> Product | None:
     return db.query(Product).filter(Product.id == product_id).first()
 
+def get_product_row(db: Session, product_id: int, fields=None):
+    """
+    An active product's columns; soft-deleted products are not found.
+    """
+    return (
+        db.query(*product_columns(fields))
+        .filter(Product.id == product_id, Product.is_active == 1)
+        .first()
+    )
+
 def get_product_by_name(db: Session, name: str) -> Product | None:
     return db.query(Product).filter(Product.name == name).first()
 
 def create_product(db: Session, product: Product) -> Product:
     db.add(product)
     db.commit()
+    invalidate_product(product.id)
     db.refresh(product)
+    notify_product_changed(db, product)
     return product
 
+def bulk_insert_products(db: Session, rows: list[dict]) -> list[int]:
+    """
+    Insert many products as one executemany (batched multi-row INSERT ...
+    RETURNING on Postgres/SQLite) and commit once. Returns the new ids in
+    row order.
+    """
+    if not rows:
+        return []
+    ids = list(db.scalars(insert(Product).returning(Product.id, sort_by_parameter_order=True), rows))
+    db.commit()
+    invalidate_listings()
+    backend = get_search_backend(db)
+    for product_id, row in zip(ids, rows):
+        backend.index_values(product_id, row["name"], row["description"])
+    return ids
+
+def image_keys_in_use(db: Session, image_keys) -> set[str]:
+    """
+    The subset of ``image_keys`` referenced by any product row, active or not.
+    """
+    if not image_keys:
+        return set()
+    return set(db.scalars(select(Product.image_key).where(Product.image_key.in_(list(image_keys))).distinct()))
+
+def iter_products_for_export(db: Session, include_inactive: bool = False, batch_size: int = 1000):
+    """
+    Stream the catalog in id order without loading it into memory.
+    """
+    query = select(Product).order_by(Product.id)
+    if not include_inactive:
+        query = query.where(Product.is_active == 1)
+    return db.scalars(query.execution_options(yield_per=batch_size))
+
 def update_product(db: Session, product_id: int, update_data: dict) -> Product | None:
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
@@ -26,7 +101,9 @@ def update_product(db: Session, product_id: int, update_data: dict) -> Product |
         setattr(product, key, value)
 
     db.commit()
+    invalidate_product(product.id)
     db.refresh(product)
+    notify_product_changed(db, product)
     return product
 
 def soft_delete_product(db: Session, product_id: int, update_data: dict) -> Product | None:
@@ -38,9 +115,29 @@ def soft_delete_product(db: Session, product_id: int, update_data: dict) -> Prod
         setattr(product, key, value)
 
     db.commit()
+    invalidate_product(product.id)
     db.refresh(product)
+    notify_product_changed(db, product)
     return product
 
+def _apply_search(db: Session, query, search: str | None):
+    # Soft-deleted products are never listed (nor counted)
+    query = query.filter(Product.is_active == 1)
+    if search:
+        query = get_search_backend(db).filter(db, query, search)
+    return query
+
+def _sort_key(sort_by: str):
+    # Unknown fields fall back to id, as before
+    return PRODUCT_SORT_KEYS.get(sort_by, Product.id)
+
+def _order_by(query, sort_key, sort_order: str):
+    # id breaks ties so the order is total and page boundaries are stable
+    direction = desc if sort_order.lower() == "desc" else asc
+    if sort_key is Product.id:
+        return query.order_by(direction(Product.id))
+    return query.order_by(direction(sort_key), direction(Product.id))
+
 def get_all_products(
     db: Session,
     search: str | None = None,
@@ -49,25 +146,200 @@ def get_all_products(
     page: int = 1,
     page_size: int = 10
 ):
-    query = db.query(Product)
+    items = get_product_page(db, search, sort_by, sort_order, page, page_size)
+    total = count_products(db, search)
 
-    # --- Search filter ---
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Product.name.ilike(search_term)) |
-            (Product.description.ilike(search_term))
-        )
-
-    # --- Sorting ---
-    sort_column = getattr(Product, sort_by, Product.id)
-    if sort_order.lower() == "desc":
-        query = query.order_by(desc(sort_column))
+    return items, total
+
+def get_product_page(
+    db: Session,
+    search: str | None = None,
+    sort_by: str = "id",
+    sort_order: str = "asc",
+    page: int = 1,
+    page_size: int = 10,
+    extra: int = 0,
+    fields=None
+):
+    """
+    Fetch one OFFSET page as rows of the columns behind ``fields``.
+    ``extra`` over-fetches rows so callers can tell whether another page
+    exists without counting.
+    """
+    query = _apply_search(db, db.query(*product_columns(fields)), search)
+    if sort_by == "relevance" and search:
+        # Best match first; id keeps equal scores in a stable order
+        query = query.order_by(desc(get_search_backend(db).relevance(db, search)), asc(Product.id))
     else:
-        query = query.order_by(asc(sort_column))
+        query = _order_by(query, _sort_key(sort_by), sort_order)
+    return query.offset((page - 1) * page_size).limit(page_size + extra).all()
 
-    # --- Pagination ---
-    total = query.count()
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
+# -------------------------------------------------------
+# COUNTING
+# -------------------------------------------------------
+def count_products(db: Session, search: str | None = None) -> int:
+    query = _apply_search(db, db.query(func.count(Product.id)), search)
+    return query.scalar()
 
-    return items, total
+def estimate_product_count(db: Session, search: str | None = None) -> int | None:
+    """
+    Planner estimate of the filtered row count, without scanning the table.
+    Returns None on databases that do not expose planner statistics.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return None
+
+    if not search:
+        reltuples = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'admin.products'::regclass")
+        ).scalar()
+        # -1 means the table has never been analyzed
+        return max(int(reltuples), 0) if reltuples is not None and reltuples >= 0 else None
+
+    statement = _apply_search(db, db.query(Product.id), search).statement
+    sql = statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+    # exec_driver_sql: the inlined search term must not be parsed for :binds
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def get_catalog_last_modified(db: Session) -> datetime | None:
+    """
+    Latest created/updated timestamp over all products. Soft deletes set
+    updated_date, so they move it too.
+    """
+    updated, created = db.query(func.max(Product.updated_date), func.max(Product.created_date)).one()
+    stamps = [d for d in (updated, created) if d is not None]
+    return max(stamps) if stamps else None
+
+# -------------------------------------------------------
+# KEYSET (CURSOR) PAGINATION
+# -------------------------------------------------------
+def encode_cursor(sort_by: str, sort_order: str, value, last_id: int) -> str:
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    payload = {"s": sort_by, "o": sort_order.lower(), "v": value, "id": last_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+# JSON type of the cursor value for each sort key (created_date is {"dt": iso})
+_CURSOR_VALUE_TYPES = {
+    "id": (int,),
+    "name": (str,),
+    "price": (int, float),
+    "rating": (int, float),
+}
+
+def _cursor_value(sort_by: str, value):
+    if sort_by == "created_date":
+        if not isinstance(value, dict) or not isinstance(value.get("dt"), str):
+            raise ValueError
+        return datetime.fromisoformat(value["dt"])
+    # bool is an int subclass but never a valid sort value
+    if isinstance(value, bool) or not isinstance(value, _CURSOR_VALUE_TYPES.get(sort_by, (int,))):
+        raise ValueError
+    return value
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str):
+    """
+    Return ``(value, last_id)`` from an opaque cursor. Raises ValueError if
+    the cursor is malformed or was issued for a different sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value, last_id = payload["v"], payload["id"]
+        if isinstance(last_id, bool) or not isinstance(last_id, int):
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if payload.get("s") != sort_by or payload.get("o") != sort_order.lower():
+        raise ValueError("Cursor does not match sort_by/sort_order")
+    try:
+        value = _cursor_value(sort_by, value)
+    except (ValueError, TypeError):
+        # Never echo the parser's message back to the client
+        raise ValueError("Invalid cursor")
+    return value, last_id
+
+def _seek_past(cursor: str, sort_by: str, sort_order: str):
+    """
+    Filter selecting the rows after ``cursor`` in (sort key, id) order.
+    """
+    sort_key = _sort_key(sort_by)
+    descending = sort_order.lower() == "desc"
+    value, last_id = decode_cursor(cursor, sort_by, sort_order)
+    if sort_key is Product.id:
+        return Product.id < last_id if descending else Product.id > last_id
+    row, bound = tuple_(sort_key, Product.id), tuple_(value, last_id)
+    return row < bound if descending else row > bound
+
+def get_products_after_cursor(
+    db: Session,
+    search: str | None = None,
+    sort_by: str = "id",
+    sort_order: str = "asc",
+    cursor: str | None = None,
+    page_size: int = 10,
+    fields=None
+):
+    """
+    Seek past the last row of the previous page instead of using OFFSET,
+    so every page costs the same regardless of depth.
+    Returns ``(items, next_cursor)``; next_cursor is None on the last page.
+    """
+    if sort_by == "relevance" and search:
+        raise ValueError("Relevance sort is only available with page pagination")
+    if sort_by not in PRODUCT_SORT_KEYS:
+        sort_by = "id"
+    sort_key = _sort_key(sort_by)
+
+    query = _apply_search(db, db.query(*product_columns(fields), sort_key.label("sort_value")), search)
+    if cursor:
+        query = query.filter(_seek_past(cursor, sort_by, sort_order))
+
+    rows = _order_by(query, sort_key, sort_order).limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort_by, sort_order, last.sort_value, last.id)
+
+    return rows, next_cursor
+
+# -------------------------------------------------------
+# STREAMING
+# -------------------------------------------------------
+def product_stream_statement(
+    db: Session,
+    search: str | None = None,
+    sort_by: str = "id",
+    sort_order: str = "asc",
+    cursor: str | None = None,
+    limit: int | None = None,
+    batch_size: int = 500,
+    fields=None
+):
+    """
+    SELECT for the whole listing (same filters and order as the paged
+    endpoints), fetched ``batch_size`` rows at a time from a server-side
+    cursor. Execute it with ``db.execute`` / ``AsyncSession.stream``.
+    Raises ValueError for an invalid cursor.
+    """
+    query = _apply_search(db, select(*product_columns(fields)), search)
+    if sort_by == "relevance" and search:
+        if cursor:
+            raise ValueError("Relevance sort cannot resume from a cursor")
+        query = query.order_by(desc(get_search_backend(db).relevance(db, search)), asc(Product.id))
+    else:
+        if sort_by not in PRODUCT_SORT_KEYS:
+            sort_by = "id"
+        if cursor:
+            query = query.where(_seek_past(cursor, sort_by, sort_order))
+        query = _order_by(query, _sort_key(sort_by), sort_order)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.execution_options(yield_per=batch_size)
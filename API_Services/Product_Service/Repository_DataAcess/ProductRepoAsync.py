@@ -0,0 +1,37 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from Model.ProductModel import Product
+from Repository_DataAcess import ProductRepo
+
+# -------------------------------------------------------
+# ASYNC REPOSITORY
+# -------------------------------------------------------
+# Each function runs the matching ProductRepo query through
+# AsyncSession.run_sync: the ORM code is shared, but the I/O goes through
+# the asyncio driver on the event loop instead of a threadpool worker.
+
+async def get_product_by_id(db: AsyncSession, product_id: int) -> Product | None:
+    return await db.run_sync(ProductRepo.get_product_by_id, product_id)
+
+async def get_product_by_name(db: AsyncSession, name: str) -> Product | None:
+    return await db.run_sync(ProductRepo.get_product_by_name, name)
+
+async def create_product(db: AsyncSession, product: Product) -> Product:
+    return await db.run_sync(ProductRepo.create_product, product)
+
+async def update_product(db: AsyncSession, product_id: int, update_data: dict) -> Product | None:
+    return await db.run_sync(ProductRepo.update_product, product_id, update_data)
+
+async def soft_delete_product(db: AsyncSession, product_id: int, update_data: dict) -> Product | None:
+    return await db.run_sync(ProductRepo.soft_delete_product, product_id, update_data)
+
+async def get_product_page(db: AsyncSession, *args, **kwargs) -> list[Product]:
+    return await db.run_sync(ProductRepo.get_product_page, *args, **kwargs)
+
+async def count_products(db: AsyncSession, search: str | None = None) -> int:
+    return await db.run_sync(ProductRepo.count_products, search)
+
+async def estimate_product_count(db: AsyncSession, search: str | None = None) -> int | None:
+    return await db.run_sync(ProductRepo.estimate_product_count, search)
+
+async def get_products_after_cursor(db: AsyncSession, **kwargs):
+    return await db.run_sync(lambda session: ProductRepo.get_products_after_cursor(session, **kwargs))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import Optional
 from base64 import b64encode
 
@@ -12,6 +12,26 @@ class ProductCreate(BaseModel):
     description: str
     price: float
 
+class ProductImportRow(ProductCreate):
+    """
+    One row of a bulk import. The image is either a file name inside the
+    uploaded zip (``image``) or the key of a blob already in the store
+    (``image_key``), e.g. from a previous export.
+    """
+    name: str = Field(..., min_length=1, max_length=255)
+    description: str = ""
+    price: float = Field(..., ge=0)
+    rating: Optional[float] = Field(None, ge=0, le=5)
+    image: Optional[str] = None
+    image_key: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
+    image_filename: Optional[str] = Field(None, max_length=255)
+
+    @model_validator(mode="after")
+    def image_required(self):
+        if not self.image and not self.image_key:
+            raise ValueError("Either image or image_key is required")
+        return self
+
 class ProductUpdate(BaseModel):
     name: Optional[str]
     description: Optional[str]
@@ -19,13 +39,35 @@ class ProductUpdate(BaseModel):
     rating: Optional[float]
 
 class ProductResponse(BaseModel):
+    """
+    One product as returned by the API. Everything but id is optional
+    because ``fields=`` can trim the response; routes serialize with
+    ``response_model_exclude_unset`` so omitted fields stay omitted.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
-    name: str
-    description: str
-    price: float
-    rating: Optional[float]
-    image_filename: str
-    image_base64: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    is_active: Optional[int] = None
+    rating: Optional[float] = None
+    image_filename: Optional[str] = None
+    image_key: Optional[str] = None
+    image_url: Optional[str] = None
+    thumbnails: Optional[dict[str, str]] = None
+    image_preview: Optional[str] = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+class ProductListResponse(BaseModel):
+    """
+    A listing page: offset pages carry total/page/pages, cursor pages
+    carry next_cursor.
+    """
+    items: list[ProductResponse]
+    total: Optional[int] = None
+    total_mode: Optional[str] = None
+    has_more: bool
+    page: Optional[int] = None
+    page_size: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -0,0 +1,256 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+
+from sqlalchemy import case, func, literal, literal_column, or_
+from sqlalchemy.orm import Session
+
+from Model.ProductModel import Product
+
+# -------------------------------------------------------
+# PRODUCT SEARCH BACKENDS
+# -------------------------------------------------------
+# Both backends expose the same two hooks used by ProductRepo:
+#   filter(db, query, term)       -> query restricted to matching products
+#   relevance(db, term)           -> SQL expression, higher = better match
+# plus index_product/remove_product for incremental maintenance.
+
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# The in-memory backend hands its matches to SQL as an inline id list, so
+# filtering, counting and every sort see all of them; ids are rendered as
+# literals, so nothing counts against SQLite's bind limit. Relevance order
+# is a CASE over the scores, which only ranks the best MAX_CANDIDATES:
+# weaker matches follow them in id order.
+MAX_CANDIDATES = 1000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class PostgresSearchBackend:
+    """
+    Uses the ``search_vector`` tsvector column (kept current by a trigger)
+    and pg_trgm indexes on name/description, so substring matches keep
+    working and are index-assisted too.
+    """
+
+    name = "postgres"
+    TS_CONFIG = "english"
+
+    _search_vector = literal_column("admin.products.search_vector")
+
+    def _tsquery(self, term: str):
+        return func.websearch_to_tsquery(self.TS_CONFIG, term)
+
+    def filter(self, db: Session, query, term: str):
+        pattern = f"%{term}%"
+        return query.filter(
+            Product.is_active == 1,
+            or_(
+                self._search_vector.op("@@")(self._tsquery(term)),
+                Product.name.ilike(pattern),
+                Product.description.ilike(pattern),
+            ),
+        )
+
+    def relevance(self, db: Session, term: str):
+        return func.ts_rank(self._search_vector, self._tsquery(term)) + func.similarity(Product.name, term)
+
+    def index_product(self, product: Product) -> None:
+        # Maintained by the products_search_vector_update trigger
+        pass
+
+    def remove_product(self, product_id: int) -> None:
+        pass
+
+    def index_values(self, product_id: int, name: str, description: str) -> None:
+        pass
+
+
+class InMemorySearchBackend:
+    """
+    In-process inverted index for SQLite deployments and tests. Built lazily
+    from the table on first search, then updated incrementally by the
+    repository on create/update/soft-delete. Query tokens are matched as
+    prefixes and all of them must match.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        # token -> {product_id: weighted term frequency}
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        # product_id -> tokens it was indexed under, for removal
+        self._doc_tokens: dict[int, set[str]] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+
+    # --- maintenance ---
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = (
+                db.query(Product.id, Product.name, Product.description)
+                .filter(Product.is_active == 1)
+                .yield_per(1000)
+            )
+            for product_id, name, description in rows:
+                self._add(product_id, name, description)
+            self._loaded = True
+
+    def _add(self, product_id: int, name: str, description: str) -> None:
+        weights: dict[str, float] = defaultdict(float)
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += DESCRIPTION_WEIGHT
+
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._vocabulary_dirty = True
+            self._postings[token][product_id] = weight
+        self._doc_tokens[product_id] = set(weights)
+
+    def _remove(self, product_id: int) -> None:
+        for token in self._doc_tokens.pop(product_id, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+
+    def index_product(self, product: Product) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(product.id)
+            if product.is_active:
+                self._add(product.id, product.name, product.description)
+
+    def remove_product(self, product_id: int) -> None:
+        with self._lock:
+            if self._loaded:
+                self._remove(product_id)
+
+    def index_values(self, product_id: int, name: str, description: str) -> None:
+        """
+        Index an active product from plain column values (bulk imports).
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(product_id)
+            self._add(product_id, name, description)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._doc_tokens.clear()
+            self._vocabulary = []
+            self._loaded = False
+
+    # --- querying ---
+    def _expand(self, prefix: str) -> list[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def scores(self, db: Session, term: str) -> dict[int, float]:
+        """
+        Return ``{product_id: score}`` for products matching every token.
+        """
+        self.ensure_loaded(db)
+        tokens = tokenize(term)
+        if not tokens:
+            return {}
+
+        with self._lock:
+            total_docs = max(len(self._doc_tokens), 1)
+            result: dict[int, float] | None = None
+            for token in tokens:
+                token_scores: dict[int, float] = defaultdict(float)
+                for match in self._expand(token):
+                    postings = self._postings[match]
+                    idf = math.log(1 + total_docs / len(postings))
+                    for product_id, weight in postings.items():
+                        token_scores[product_id] += weight * idf
+                if result is None:
+                    result = dict(token_scores)
+                else:
+                    result = {pid: s + token_scores[pid] for pid, s in result.items() if pid in token_scores}
+                if not result:
+                    return {}
+            return result or {}
+
+    def ranked(self, db: Session, term: str) -> dict[int, float]:
+        """
+        The best MAX_CANDIDATES of ``scores``, for relevance ordering only.
+        """
+        scores = self.scores(db, term)
+        if len(scores) <= MAX_CANDIDATES:
+            return scores
+        # Ties go to the lower id, matching the listing's tie-break
+        return dict(heapq.nlargest(MAX_CANDIDATES, scores.items(), key=lambda item: (item[1], -item[0])))
+
+    def filter(self, db: Session, query, term: str):
+        ids = [literal_column(str(int(product_id))) for product_id in self.scores(db, term)]
+        return query.filter(Product.id.in_(ids))
+
+    def relevance(self, db: Session, term: str):
+        scores = self.ranked(db, term)
+        if not scores:
+            # Bound, not literal_column("0"): ORDER BY 0 is a column position
+            return literal(0.0)
+        whens = [
+            (literal_column(str(int(product_id))), literal_column(repr(float(score))))
+            for product_id, score in scores.items()
+        ]
+        return case(*whens, value=Product.id, else_=literal_column("0.0"))
+
+
+postgres_backend = PostgresSearchBackend()
+memory_backend = InMemorySearchBackend()
+
+_backend_override = None
+
+
+def set_search_backend(backend) -> None:
+    """
+    Force a backend regardless of the database dialect (None restores auto).
+    """
+    global _backend_override
+    _backend_override = backend
+
+
+def get_search_backend(db: Session):
+    if _backend_override is not None:
+        return _backend_override
+    if db.bind.dialect.name == "postgresql":
+        return postgres_backend
+    return memory_backend
+
+
+def notify_product_changed(db: Session, product: Product) -> None:
+    get_search_backend(db).index_product(product)
@@ -0,0 +1,154 @@
+from typing import Callable
+
+from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from config import IMAGE_CACHE_CONTROL
+from Storage.BlobStore import LocalBlobStore, BlobNotFound, guess_content_type
+from Storage.Precompress import ENCODING_VARIANTS, PRECOMPRESSIBLE_TYPES, stored_encodings
+from Shared.Compression import negotiate_encoding
+from Utils.HttpCache import etag_matches
+
+
+def _parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single ``bytes=`` range. Returns None when the header should be
+    ignored (malformed or multi-range), raises 416 when it is unsatisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if start_s == "":
+            # Suffix range: last N bytes
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+# Blobs are user uploads served from the API origin: browsers must never
+# sniff them into another type, and SVG (which can carry script) is only
+# ever downloaded, never rendered in the API's origin.
+ACTIVE_CONTENT_TYPES = {"image/svg+xml"}
+
+
+def _safety_headers(content_type: str) -> dict:
+    headers = {"X-Content-Type-Options": "nosniff"}
+    if content_type in ACTIVE_CONTENT_TYPES:
+        headers["Content-Disposition"] = "attachment"
+        headers["Content-Security-Policy"] = "sandbox"
+    return headers
+
+
+def _precompressed_response(
+    store: LocalBlobStore, key: str, headers, content_type: str, on_missing: Callable[[str], None] | None
+) -> Response | None:
+    encodings = stored_encodings(store, key)
+    if not encodings:
+        # Never compressed inline (max-level brotli on a large blob would
+        # stall the request): serve the original and let the background
+        # job write the variants
+        if on_missing is not None:
+            on_missing(key)
+        return None
+    encoding = negotiate_encoding(headers.get("accept-encoding"), encodings)
+    if encoding is None:
+        return None
+
+    encoded_variant = ENCODING_VARIANTS[encoding]
+    base_headers = {
+        "ETag": f'"{key}.{encoded_variant}"',
+        "Content-Encoding": encoding,
+        "Vary": "Accept-Encoding",
+        **_safety_headers(content_type),
+    }
+    if IMAGE_CACHE_CONTROL:
+        base_headers["Cache-Control"] = IMAGE_CACHE_CONTROL
+    if etag_matches(headers.get("if-none-match"), base_headers["ETag"]):
+        return Response(status_code=304, headers=base_headers)
+
+    return StreamingResponse(
+        store.iter_range(key, variant=encoded_variant),
+        media_type=content_type,
+        headers={**base_headers, "Content-Length": str(store.size(key, encoded_variant))},
+    )
+
+
+def blob_response(
+    store: LocalBlobStore,
+    key: str,
+    headers,
+    variant: str | None = None,
+    on_missing_encodings: Callable[[str], None] | None = None,
+) -> Response:
+    """
+    Stream a blob honouring ``If-None-Match``, ``Range`` and ``If-Range``.
+    The key is the content hash, so it doubles as a strong ETag and the
+    bytes behind a URL never change (cached as immutable). Compressible
+    originals are served from their precompressed variants when the client
+    accepts one; until those exist the original is served and
+    ``on_missing_encodings(key)`` is called to get them written.
+    """
+    try:
+        size = store.size(key, variant)
+        content_type = guess_content_type(store.read_header(key, variant=variant))
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    precompressible = variant is None and content_type in PRECOMPRESSIBLE_TYPES
+    if precompressible and not headers.get("range"):
+        encoded = _precompressed_response(store, key, headers, content_type, on_missing_encodings)
+        if encoded is not None:
+            return encoded
+
+    etag = f'"{key}.{variant}"' if variant else f'"{key}"'
+    base_headers = {"ETag": etag, "Accept-Ranges": "bytes", **_safety_headers(content_type)}
+    if precompressible:
+        base_headers["Vary"] = "Accept-Encoding"
+    if IMAGE_CACHE_CONTROL:
+        base_headers["Cache-Control"] = IMAGE_CACHE_CONTROL
+
+    if etag_matches(headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=base_headers)
+
+    byte_range = None
+    range_header = headers.get("range")
+    if range_header and size > 0:
+        if_range = headers.get("if-range")
+        if if_range is None or if_range.strip() == etag:
+            byte_range = _parse_range(range_header, size)
+
+    if byte_range is None:
+        return StreamingResponse(
+            store.iter_range(key, variant=variant),
+            media_type=content_type,
+            headers={**base_headers, "Content-Length": str(size)},
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        store.iter_range(key, start, end, variant=variant),
+        status_code=206,
+        media_type=content_type,
+        headers={
+            **base_headers,
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+        },
+    )
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+# -------------------------------------------------------
+# CONTENT-ADDRESSED BLOB STORE
+# -------------------------------------------------------
+# Blobs are keyed by the SHA-256 of their bytes, so uploading the same
+# image twice stores it once. Product rows only keep the key.
+# Derived files (thumbnails etc.) are stored next to the original as
+# named variants of the same key.
+
+CHUNK_SIZE = 64 * 1024
+
+_MAGIC_NUMBERS = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def guess_content_type(header: bytes) -> str:
+    """
+    Sniff the image type from the first bytes of a blob.
+    """
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, content_type in _MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return content_type
+    if header.lstrip()[:5] in (b"<?xml", b"<svg "):
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class LocalBlobStore:
+    """
+    Filesystem backend. Blobs live under ``root/ab/cd/<sha256>`` so no
+    single directory grows too large.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str, variant: Optional[str] = None) -> str:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise BlobNotFound(key)
+        filename = key
+        if variant:
+            if not variant.replace(".", "").isalnum():
+                raise BlobNotFound(f"{key}.{variant}")
+            filename = f"{key}.{variant}"
+        return os.path.join(self.root, key[:2], key[2:4], filename)
+
+    def put(self, data: bytes) -> str:
+        """
+        Store ``data`` and return its key. Existing blobs are not rewritten.
+        """
+        key = hashlib.sha256(data).hexdigest()
+        self._write(self._path(key), data)
+        return key
+
+    def put_stream(self, chunks: Iterable[bytes], max_size: Optional[int] = None) -> tuple[str, int]:
+        """
+        Store a blob given as a stream of chunks and return ``(key, size)``.
+        The chunks go straight to a temp file while the hash is computed, so
+        memory stays bounded by the chunk size. Raises BlobTooLarge as soon
+        as more than ``max_size`` bytes have arrived.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # Same filesystem as the final path, so the rename below is atomic
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLarge(f"more than {max_size} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            key = digest.hexdigest()
+            path = self._path(key)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return key, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_variant(self, key: str, variant: str, data: bytes) -> None:
+        """
+        Store a derived file (e.g. ``thumb.webp``) for an existing blob.
+        """
+        self._write(self._path(key, variant), data)
+
+    def _write(self, path: str, data: bytes) -> None:
+        if os.path.exists(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file in the same directory, then rename, so readers
+        # never observe a partially written blob.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def exists(self, key: str, variant: Optional[str] = None) -> bool:
+        try:
+            return os.path.exists(self._path(key, variant))
+        except BlobNotFound:
+            return False
+
+    def size(self, key: str, variant: Optional[str] = None) -> int:
+        try:
+            return os.path.getsize(self._path(key, variant))
+        except OSError:
+            raise BlobNotFound(key)
+
+    def read_header(self, key: str, length: int = 16, variant: Optional[str] = None) -> bytes:
+        try:
+            with open(self._path(key, variant), "rb") as f:
+                return f.read(length)
+        except OSError:
+            raise BlobNotFound(key)
+
+    def read(self, key: str, variant: Optional[str] = None) -> bytes:
+        try:
+            with open(self._path(key, variant), "rb") as f:
+                return f.read()
+        except OSError:
+            raise BlobNotFound(key)
+
+    def iter_range(
+        self, key: str, start: int = 0, end: Optional[int] = None, variant: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the bytes ``start..end`` (inclusive) in CHUNK_SIZE pieces.
+        """
+        path = self._path(key, variant)
+        if not os.path.exists(path):
+            raise BlobNotFound(key)
+        if end is None:
+            end = os.path.getsize(path) - 1
+
+        def _iterator():
+            remaining = end - start + 1
+            with open(path, "rb") as f:
+                f.seek(start)
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+
+        return _iterator()
+
+    def delete(self, key: str, variant: Optional[str] = None) -> None:
+        try:
+            os.remove(self._path(key, variant))
+        except (OSError, BlobNotFound):
+            pass
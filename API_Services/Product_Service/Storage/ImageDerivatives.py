@@ -0,0 +1,92 @@
+import io
+import logging
+from typing import Optional
+
+from PIL import Image, UnidentifiedImageError
+
+from Storage.BlobStore import LocalBlobStore, BlobNotFound
+from Storage.Precompress import precompress
+from Shared.Jobs import PermanentJobError
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------------
+# DERIVATIVE SIZES
+# -------------------------------------------------------
+# Longest edge in pixels. "preview" is tiny enough to inline in listings.
+DERIVATIVE_SIZES = {
+    "preview": 24,
+    "thumb": 160,
+    "small": 320,
+    "medium": 640,
+}
+DERIVATIVE_FORMAT = "webp"
+DERIVATIVE_QUALITY = 80
+
+
+def variant_name(size: str) -> str:
+    return f"{size}.{DERIVATIVE_FORMAT}"
+
+
+def render_derivative(original: Image.Image, size: str) -> bytes:
+    edge = DERIVATIVE_SIZES[size]
+    image = original.copy()
+    image.thumbnail((edge, edge))
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    out = io.BytesIO()
+    image.save(out, format=DERIVATIVE_FORMAT.upper(), quality=DERIVATIVE_QUALITY, method=4)
+    return out.getvalue()
+
+
+def generate_derivatives(store: LocalBlobStore, image_key: str, sizes=None) -> list[str]:
+    """
+    Render every missing derivative of ``image_key``. Safe to call repeatedly;
+    returns the sizes that were written.
+    """
+    sizes = [s for s in (sizes or DERIVATIVE_SIZES) if not store.exists(image_key, variant_name(s))]
+    if not sizes:
+        return []
+
+    with Image.open(io.BytesIO(store.read(image_key))) as original:
+        original.load()
+        for size in sizes:
+            store.put_variant(image_key, variant_name(size), render_derivative(original, size))
+    return sizes
+
+
+def process_original(store: LocalBlobStore, image_key: str) -> None:
+    """
+    The "image.derivatives" job: precompress a compressible original and
+    render its derivatives. Safe to repeat after a partial run.
+    """
+    try:
+        precompress(store, image_key)
+        generate_derivatives(store, image_key)
+    except BlobNotFound:
+        raise PermanentJobError(f"original {image_key} is missing")
+    except UnidentifiedImageError:
+        # e.g. SVG: served as stored, nothing to render
+        logger.info("Derivatives skipped, %s is not a decodable image", image_key)
+    except Image.DecompressionBombError as e:
+        raise PermanentJobError(f"original {image_key} is too large to decode: {e}")
+
+
+def ensure_derivative(store: LocalBlobStore, image_key: str, size: str) -> Optional[str]:
+    """
+    Return the variant name for ``size``, rendering it inline if the
+    background job has not produced it yet. None means the derivative
+    cannot be rendered (corrupt/truncated file, decompression bomb, failed
+    write) and the original should be served instead.
+    """
+    variant = variant_name(size)
+    if not store.exists(image_key, variant):
+        try:
+            generate_derivatives(store, image_key, [size])
+        except UnidentifiedImageError:
+            raise BlobNotFound(f"{image_key}.{variant}")
+        except (OSError, Image.DecompressionBombError) as e:
+            logger.warning("Derivative %s of %s not rendered, serving the original: %s", size, image_key, e)
+            return None
+    return variant
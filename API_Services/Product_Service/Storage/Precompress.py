@@ -0,0 +1,49 @@
+import gzip
+
+from config import PRECOMPRESS_BROTLI_QUALITY, PRECOMPRESS_GZIP_LEVEL
+from Storage.BlobStore import LocalBlobStore, guess_content_type
+from Shared.Compression import brotli
+
+# -------------------------------------------------------
+# PRECOMPRESSED BLOBS
+# -------------------------------------------------------
+# Raster formats (PNG/JPEG/WebP/GIF) are already compressed; for the
+# formats that are not, the gzip/brotli encodings are written once as
+# variants of the blob (``<key>.gz`` / ``<key>.br``) at maximum
+# compression and served as-is, so nothing is compressed per request.
+
+PRECOMPRESSIBLE_TYPES = {"image/svg+xml", "image/bmp"}
+
+# Content-Encoding -> blob variant
+ENCODING_VARIANTS = {"br": "br", "gzip": "gz"}
+
+
+def _encode(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=PRECOMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=PRECOMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def supported_encodings() -> list[str]:
+    return [e for e in ENCODING_VARIANTS if e != "br" or brotli is not None]
+
+
+def precompress(store: LocalBlobStore, key: str) -> list[str]:
+    """
+    Write the missing precompressed variants of a compressible blob.
+    Returns the encodings that were written.
+    """
+    if guess_content_type(store.read_header(key)) not in PRECOMPRESSIBLE_TYPES:
+        return []
+    missing = [e for e in supported_encodings() if not store.exists(key, ENCODING_VARIANTS[e])]
+    if not missing:
+        return []
+
+    data = store.read(key)
+    for encoding in missing:
+        store.put_variant(key, ENCODING_VARIANTS[encoding], _encode(encoding, data))
+    return missing
+
+
+def stored_encodings(store: LocalBlobStore, key: str) -> list[str]:
+    return [e for e in supported_encodings() if store.exists(key, ENCODING_VARIANTS[e])]
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException  # type: ignore
+
+from config import JWT_ACTIVE_KID, JWT_ALGORITHM, JWT_KEYS, JWT_TOKEN_CACHE_SIZE
+from Shared.TokenVerifier import TokenVerifier, bearer_dependency
+
+# -------------------------------------
+# LOCAL VERIFICATION OF USER-SERVICE TOKENS
+# -------------------------------------
+token_verifier = TokenVerifier(
+    JWT_KEYS, JWT_ALGORITHM, active_kid=JWT_ACTIVE_KID, cache_size=JWT_TOKEN_CACHE_SIZE
+)
+
+# Requests without a bearer token are still accepted (current_user_id comes
+# from the form/query as before); a token that is sent must be valid.
+optional_current_user = bearer_dependency(token_verifier, required=False)
+get_current_user = bearer_dependency(token_verifier)
+
+ADMIN_ROLE = "admin"
+
+
+def check_admin(token_payload: Optional[Dict[str, Any]]) -> None:
+    """
+    401 without a token, 403 unless the caller is an admin.
+    """
+    if token_payload is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    if token_payload.get("role") != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+def require_admin(token_payload: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+    """
+    FastAPI dependency: the caller's token payload, 403 unless they are an admin.
+    """
+    check_admin(token_payload)
+    return token_payload
+
+
+def check_acting_user(current_user_id: int, token_payload: Optional[Dict[str, Any]]) -> None:
+    """
+    When the caller is authenticated, the user id they act as must be their own.
+    """
+    if token_payload is not None and token_payload.get("uid") != current_user_id:
+        raise HTTPException(status_code=403, detail="current_user_id does not match the authenticated user")
+
+
+def token_user_id(token: str) -> Optional[int]:
+    """
+    uid of a valid access token, or None (used to key rate limits).
+    """
+    payload = token_verifier.verify(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+    return payload.get("uid")
@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+from starlette.concurrency import run_in_threadpool
+
+# -------------------------------------------------------
+# CACHE BACKENDS
+# -------------------------------------------------------
+# Both backends share one small interface:
+#   get(key) / set(key, value, ttl) / delete(*keys) / incr(key) / ping() / stats()
+# Values must be JSON-serializable so they can live in either backend, and
+# callers must not mutate what get() returns (the memory backend hands out
+# the cached object itself).
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL.
+
+    Counters (version numbers) are kept apart from the entries and have
+    their own LRU bound. An evicted counter must never go back to a value
+    already used, or an entry stored under it before a later write would
+    come back to life. So evicted values raise a floor, and a counter that
+    is not present reads as that floor: every counter only moves forward.
+    """
+
+    def __init__(self, max_entries: int = 10_000, default_ttl: int = 60, max_counters: int = 100_000):
+        self.max_entries = max_entries
+        self.max_counters = max_counters
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._counters: OrderedDict[str, int] = OrderedDict()
+        self._counter_floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, self._counter_floor) + 1
+            self._counters[key] = value
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_counters:
+                _, evicted = self._counters.popitem(last=False)
+                self._counter_floor = max(self._counter_floor, evicted)
+            return value
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key)
+            if value is None:
+                return self._counter_floor
+            self._counters.move_to_end(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            # The floor stays: values handed out before clear() stay dead
+            for value in self._counters.values():
+                self._counter_floor = max(self._counter_floor, value)
+            self._counters.clear()
+
+    def ping(self) -> bool:
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "counters": len(self._counters),
+            "max_counters": self.max_counters,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheBackend:
+    """
+    Backend for any Redis-compatible server (or a fake such as fakeredis
+    in tests). Eviction is left to the server's maxmemory-policy, so the
+    eviction counter here stays at 0.
+
+    The async routes reach the cache from inside AsyncSession.run_sync, i.e.
+    on the event loop (in SQLAlchemy's greenlet). A blocking round trip
+    there would stall every request, so in that case each call is handed to
+    the threadpool and awaited through the same greenlet bridge the async
+    driver uses. Called from a threadpool worker (sync routes) it runs inline.
+    """
+
+    def __init__(self, client, prefix: str = "product-service:", default_ttl: int = 60):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _call(fn: Callable, *args, **kwargs):
+        if in_greenlet():
+            return await_only(run_in_threadpool(fn, *args, **kwargs))
+        return fn(*args, **kwargs)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._call(self.client.get, self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self._call(self.client.set, self.prefix + key, json.dumps(value, default=str), ex=ttl or None)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._call(self.client.delete, *[self.prefix + k for k in keys])
+
+    def incr(self, key: str) -> int:
+        return int(self._call(self.client.incr, self.prefix + key))
+
+    def get_counter(self, key: str) -> int:
+        return int(self._call(self.client.get, self.prefix + key) or 0)
+
+    def clear(self) -> None:
+        keys = self._call(lambda: list(self.client.scan_iter(match=self.prefix + "*")))
+        if keys:
+            self._call(self.client.delete, *keys)
+
+    def ping(self) -> bool:
+        try:
+            return bool(self._call(self.client.ping))
+        except Exception:
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": 0,
+        }
+
+
+def create_cache_backend(
+    url: str = "memory://", max_entries: int = 10_000, default_ttl: int = 60, max_counters: int = 100_000
+):
+    """
+    Build a backend from a URL: ``memory://`` or ``redis://host:port/db``.
+    """
+    if url.startswith("memory://"):
+        return MemoryCacheBackend(max_entries=max_entries, default_ttl=default_ttl, max_counters=max_counters)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The 'redis' package is required for a redis:// cache URL")
+        return RedisCacheBackend(redis.Redis.from_url(url), default_ttl=default_ttl)
+    raise ValueError(f"Unsupported cache URL: {url}")
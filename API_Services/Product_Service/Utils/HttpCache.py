@@ -0,0 +1,76 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+# -------------------------------------------------------
+# HTTP VALIDATORS & CONDITIONAL REQUESTS
+# -------------------------------------------------------
+# ETag / Last-Modified helpers shared by the catalog listing and the image
+# endpoints. Database timestamps are naive UTC.
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def weak_etag(*parts) -> str:
+    """
+    Weak ETag over ``parts``: the representation may be re-encoded (e.g.
+    compressed) without changing its meaning.
+    """
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return f'W/"{hashlib.sha1(raw).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison, as If-None-Match requires.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def is_not_modified(headers, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    True if the client's copy is current. If-None-Match takes precedence
+    over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        if since is None:
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime], cache_control: Optional[str]) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
@@ -1,13 +1,14 @@
 from logging.config import fileConfig
-import re
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
 
+import config as app_config
 from Db.Database import Base
 from Model.ProductModel import Product
+from Model.JobModel import ProductJob
 import sys
 import os
 
@@ -33,6 +34,10 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# The User service migrates the same database with its own chain; each
+# chain needs its own version table or they overwrite each other's revision
+VERSION_TABLE = "alembic_version_product"
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,12 +56,15 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
-    ASYNC_DB_URL = settings.DATABASE_URL
-    SYNC_DB_URL = re.sub(r"\+asyncpg", "", ASYNC_DB_URL)
+    url = app_config.DB_CONNECTION_STRING
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        version_table=VERSION_TABLE,
+    )
 
-    config.set_main_option("sqlalchemy.url", SYNC_DB_URL)
-    
     with context.begin_transaction():
         context.run_migrations()
 
@@ -76,7 +84,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, version_table=VERSION_TABLE
         )
 
         with context.begin_transaction():
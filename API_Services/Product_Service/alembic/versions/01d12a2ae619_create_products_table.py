@@ -0,0 +1,50 @@
+"""create products table
+
+Revision ID: 01d12a2ae619
+Revises: 
+Create Date: 2025-11-20 10:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '01d12a2ae619'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE SCHEMA IF NOT EXISTS admin")
+    # Deployments that predate migrations already have this table (created
+    # by the application); adopt it as-is instead of failing
+    if sa.inspect(op.get_bind()).has_table('products', schema='admin'):
+        return
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('image_blob', sa.LargeBinary(), nullable=False),
+    sa.Column('image_filename', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_date', sa.DateTime(), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.Column('updated_date', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='admin'
+    )
+    op.create_index(op.f('ix_admin_products_id'), 'products', ['id'], unique=False, schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_admin_products_id'), table_name='products', schema='admin')
+    op.drop_table('products', schema='admin')
@@ -0,0 +1,135 @@
+"""move product images to blob store
+
+Revision ID: 056efedcd9b7
+Revises: 01d12a2ae619
+Create Date: 2025-11-21 09:14:37.902114
+
+"""
+import hashlib
+import os
+import tempfile
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '056efedcd9b7'
+down_revision: Union[str, Sequence[str], None] = '01d12a2ae619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The blob store layout and content sniffing as they were when this revision
+# was written, inlined like the table definition below so later changes to
+# the application cannot change what this migration does.
+PRODUCT_IMAGE_DIR = "Product_Catalog"
+
+_MAGIC_NUMBERS = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def _content_type(header: bytes) -> str:
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, content_type in _MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return content_type
+    if header.lstrip()[:5] in (b"<?xml", b"<svg "):
+        return "image/svg+xml"
+    return "application/octet-stream"
+
+
+def _blob_path(key: str) -> str:
+    return os.path.join(PRODUCT_IMAGE_DIR, key[:2], key[2:4], key)
+
+
+def _put_blob(data: bytes) -> str:
+    """
+    Write ``data`` under its SHA-256 (temp file + rename) and return the key.
+    """
+    key = hashlib.sha256(data).hexdigest()
+    path = _blob_path(key)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return key
+
+
+def _read_blob(key: str) -> bytes:
+    with open(_blob_path(key), "rb") as f:
+        return f.read()
+
+products = sa.table(
+    'products',
+    sa.column('id', sa.Integer),
+    sa.column('image_blob', sa.LargeBinary),
+    sa.column('image_key', sa.String),
+    sa.column('image_size', sa.Integer),
+    sa.column('image_content_type', sa.String),
+    schema='admin',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('image_key', sa.String(length=64), nullable=True), schema='admin')
+    op.add_column('products', sa.Column('image_size', sa.Integer(), nullable=True), schema='admin')
+    op.add_column('products', sa.Column('image_content_type', sa.String(length=100), nullable=True), schema='admin')
+
+    # Copy every stored image into the blob store, one row at a time so the
+    # migration never holds more than a single image in memory.
+    bind = op.get_bind()
+    ids = [row.id for row in bind.execute(sa.select(products.c.id))]
+    for product_id in ids:
+        data = bind.execute(
+            sa.select(products.c.image_blob).where(products.c.id == product_id)
+        ).scalar()
+        if data is None:
+            continue
+        bind.execute(
+            products.update()
+            .where(products.c.id == product_id)
+            .values(
+                image_key=_put_blob(data),
+                image_size=len(data),
+                image_content_type=_content_type(data[:16]),
+            )
+        )
+
+    op.alter_column('products', 'image_key', nullable=False, schema='admin')
+    op.create_index(op.f('ix_admin_products_image_key'), 'products', ['image_key'], unique=False, schema='admin')
+    op.drop_column('products', 'image_blob', schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('products', sa.Column('image_blob', sa.LargeBinary(), nullable=True), schema='admin')
+
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(products.c.id, products.c.image_key)).all()
+    for product_id, image_key in rows:
+        bind.execute(
+            products.update()
+            .where(products.c.id == product_id)
+            .values(image_blob=_read_blob(image_key))
+        )
+
+    op.alter_column('products', 'image_blob', nullable=False, schema='admin')
+    op.drop_index(op.f('ix_admin_products_image_key'), table_name='products', schema='admin')
+    op.drop_column('products', 'image_content_type', schema='admin')
+    op.drop_column('products', 'image_size', schema='admin')
+    op.drop_column('products', 'image_key', schema='admin')
@@ -0,0 +1,42 @@
+"""add keyset pagination indexes
+
+Revision ID: 3f9c2b7d41e8
+Revises: 056efedcd9b7
+Create Date: 2025-11-24 11:32:05.118642
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2b7d41e8'
+down_revision: Union[str, Sequence[str], None] = '056efedcd9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # created_date is a keyset sort column, so it can no longer be NULL
+    op.execute("UPDATE admin.products SET created_date = COALESCE(updated_date, now()) WHERE created_date IS NULL")
+    op.alter_column('products', 'created_date', existing_type=sa.DateTime(), nullable=False, schema='admin')
+
+    op.create_index('ix_admin_products_name_id', 'products', ['name', 'id'], unique=False, schema='admin')
+    op.create_index('ix_admin_products_price_id', 'products', ['price', 'id'], unique=False, schema='admin')
+    op.create_index(
+        'ix_admin_products_rating_id', 'products',
+        [sa.text('coalesce(rating, 0.0)'), 'id'], unique=False, schema='admin'
+    )
+    op.create_index('ix_admin_products_created_date_id', 'products', ['created_date', 'id'], unique=False, schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_products_created_date_id', table_name='products', schema='admin')
+    op.drop_index('ix_admin_products_rating_id', table_name='products', schema='admin')
+    op.drop_index('ix_admin_products_price_id', table_name='products', schema='admin')
+    op.drop_index('ix_admin_products_name_id', table_name='products', schema='admin')
+    op.alter_column('products', 'created_date', existing_type=sa.DateTime(), nullable=True, schema='admin')
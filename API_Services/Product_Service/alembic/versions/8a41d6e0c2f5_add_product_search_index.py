@@ -0,0 +1,70 @@
+"""add product search index
+
+Revision ID: 8a41d6e0c2f5
+Revises: 3f9c2b7d41e8
+Create Date: 2025-11-26 16:48:52.330417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41d6e0c2f5'
+down_revision: Union[str, Sequence[str], None] = '3f9c2b7d41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # search_vector is kept out of the ORM model on purpose (it is
+    # Postgres-only); the trigger below keeps it current.
+    op.execute("ALTER TABLE admin.products ADD COLUMN search_vector tsvector")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION admin.products_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER products_search_vector_update
+        BEFORE INSERT OR UPDATE OF name, description ON admin.products
+        FOR EACH ROW EXECUTE FUNCTION admin.products_search_vector_update()
+    """)
+    op.execute("""
+        UPDATE admin.products SET search_vector =
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """)
+
+    op.create_index(
+        'ix_admin_products_search_vector', 'products', [sa.text('search_vector')],
+        schema='admin', postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_admin_products_name_trgm', 'products', [sa.text('name gin_trgm_ops')],
+        schema='admin', postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_admin_products_description_trgm', 'products', [sa.text('description gin_trgm_ops')],
+        schema='admin', postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_products_description_trgm', table_name='products', schema='admin')
+    op.drop_index('ix_admin_products_name_trgm', table_name='products', schema='admin')
+    op.drop_index('ix_admin_products_search_vector', table_name='products', schema='admin')
+    op.execute("DROP TRIGGER IF EXISTS products_search_vector_update ON admin.products")
+    op.execute("DROP FUNCTION IF EXISTS admin.products_search_vector_update()")
+    op.execute("ALTER TABLE admin.products DROP COLUMN search_vector")
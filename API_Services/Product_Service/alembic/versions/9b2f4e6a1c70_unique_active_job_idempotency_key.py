@@ -0,0 +1,42 @@
+"""unique idempotency key for active product_jobs rows
+
+Revision ID: 9b2f4e6a1c70
+Revises: e7b3d9f41a26
+Create Date: 2026-10-18 21:06:40.112093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f4e6a1c70'
+down_revision: Union[str, Sequence[str], None] = 'e7b3d9f41a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE = "status IN ('pending', 'running')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rows duplicated by the old check-then-insert race: keep the oldest
+    # active row per key and close the rest, or the index cannot be built
+    op.execute(
+        "UPDATE admin.product_jobs SET status = 'done', "
+        "last_error = 'Duplicate of an earlier job with the same idempotency key' "
+        f"WHERE {ACTIVE} AND idempotency_key IS NOT NULL AND id > ("
+        "SELECT MIN(j.id) FROM admin.product_jobs j "
+        f"WHERE j.idempotency_key = product_jobs.idempotency_key AND j.{ACTIVE})"
+    )
+    op.create_index(
+        'ux_admin_product_jobs_idempotency_key_active', 'product_jobs', ['idempotency_key'], unique=True, schema='admin',
+        postgresql_where=sa.text(ACTIVE), sqlite_where=sa.text(ACTIVE),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_admin_product_jobs_idempotency_key_active', table_name='product_jobs', schema='admin')
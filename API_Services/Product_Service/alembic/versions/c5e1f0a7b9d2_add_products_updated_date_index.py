@@ -0,0 +1,30 @@
+"""add products updated_date index
+
+Revision ID: c5e1f0a7b9d2
+Revises: 8a41d6e0c2f5
+Create Date: 2026-10-18 15:20:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1f0a7b9d2'
+down_revision: Union[str, Sequence[str], None] = '8a41d6e0c2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # MAX(updated_date) feeds the catalog Last-Modified/ETag; with this index
+    # (and ix_admin_products_created_date_id) both MAXes are index probes
+    op.create_index('ix_admin_products_updated_date', 'products', ['updated_date'], unique=False, schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_products_updated_date', table_name='products', schema='admin')
@@ -0,0 +1,48 @@
+"""add product_jobs outbox
+
+Revision ID: e7b3d9f41a26
+Revises: c5e1f0a7b9d2
+Create Date: 2026-10-18 17:42:09.518334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d9f41a26'
+down_revision: Union[str, Sequence[str], None] = 'c5e1f0a7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=200), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_date', sa.DateTime(), nullable=False),
+        sa.Column('updated_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        schema='admin'
+    )
+    op.create_index(op.f('ix_admin_product_jobs_idempotency_key'), 'product_jobs', ['idempotency_key'], unique=False, schema='admin')
+    op.create_index('ix_admin_product_jobs_status_run_at', 'product_jobs', ['status', 'run_at'], unique=False, schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_product_jobs_status_run_at', table_name='product_jobs', schema='admin')
+    op.drop_index(op.f('ix_admin_product_jobs_idempotency_key'), table_name='product_jobs', schema='admin')
+    op.drop_table('product_jobs', schema='admin')
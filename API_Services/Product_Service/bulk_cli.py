@@ -0,0 +1,81 @@
+"""
+Bulk catalog import/export from the command line (run from Product_Service):
+
+    python bulk_cli.py import products.csv --images images.zip --user-id 1
+    python bulk_cli.py export products.ndjson --images images.zip
+"""
+import argparse
+import json
+import sys
+
+from Db.Database import SessionLocal
+from ProductService.ProductBulk import (
+    DEFAULT_CHUNK_SIZE,
+    detect_format,
+    import_products,
+    iter_export,
+    write_image_archive,
+)
+
+
+def run_import(args) -> int:
+    fmt = detect_format(args.file, args.format)
+    db = SessionLocal()
+    images = open(args.images, "rb") if args.images else None
+    try:
+        with open(args.file, "rb") as stream:
+            report = import_products(db, stream, fmt, args.user_id, images, chunk_size=args.chunk_size)
+    finally:
+        if images:
+            images.close()
+        db.close()
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 1 if report["failed"] else 0
+
+
+def run_export(args) -> int:
+    fmt = detect_format(args.file, args.format)
+    db = SessionLocal()
+    try:
+        with open(args.file, "w", encoding="utf-8", newline="") as out:
+            for chunk in iter_export(db, fmt, args.include_inactive):
+                out.write(chunk)
+        if args.images:
+            with open(args.images, "wb") as archive:
+                count = write_image_archive(db, archive, args.include_inactive)
+            print(f"Wrote {count} images to {args.images}")
+    finally:
+        db.close()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk product import/export")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import products from CSV/NDJSON")
+    importer.add_argument("file")
+    importer.add_argument("--images", help="Zip of the images named in the image column")
+    importer.add_argument("--user-id", type=int, required=True, help="Recorded as created_by")
+    importer.add_argument("--format", choices=["csv", "ndjson"])
+    importer.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    importer.set_defaults(handler=run_import)
+
+    exporter = commands.add_parser("export", help="Export the catalog to CSV/NDJSON")
+    exporter.add_argument("file")
+    exporter.add_argument("--images", help="Also write the images to this zip")
+    exporter.add_argument("--format", choices=["csv", "ndjson"])
+    exporter.add_argument("--include-inactive", action="store_true")
+    exporter.set_defaults(handler=run_export)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import json
+import os
+from pathlib import Path
+
+# Locate appsettings.json with multiple fallbacks:
+env_path = os.getenv("APP_SETTINGS_PATH") or os.getenv("CONFIG_PATH")
+if env_path:
+    config_path = Path(env_path)
+else:
+    BASE_DIR = Path(__file__).resolve().parent
+    config_path = None
+    # check this dir and parents (limit to a reasonable depth)
+    for p in [BASE_DIR] + list(BASE_DIR.parents)[:6]:
+        candidate = p / "Db" / "appsettings.json"
+        if candidate.exists():
+            config_path = candidate
+            break
+    # fallback to cwd/Db/appsettings.json
+    if config_path is None:
+        candidate = Path.cwd() / "Db" / "appsettings.json"
+        if candidate.exists():
+            config_path = candidate
+
+if config_path is None or not config_path.exists():
+    raise FileNotFoundError(
+        "Could not find 'Db/appsettings.json'.\n"
+        "Set environment variable APP_SETTINGS_PATH to the file path, or create 'Db/appsettings.json' in your project root.\n"
+        f"Searched for config relative to: {Path(__file__).resolve().parent} and CWD={Path.cwd()}"
+    )
+
+with open(config_path, "r", encoding="utf-8") as f:
+    config = json.load(f)
+
+# --------------------------
+# CONFIG VALUES
+# --------------------------
+DB_CONNECTION_STRING = config.get("Database", {}).get("ConnectionString")
+
+# "sync" (SessionLocal + def routes) or "async" (AsyncSession + async def routes)
+DB_MODE = config.get("Database", {}).get("Mode", "sync")
+
+# Connection pool (per process; applies to both the sync and async engines)
+_pool = config.get("Database", {}).get("Pool", {})
+DB_POOL_SIZE = _pool.get("Size", 5)
+DB_MAX_OVERFLOW = _pool.get("MaxOverflow", 10)
+DB_POOL_TIMEOUT_SECONDS = _pool.get("TimeoutSeconds", 30)
+DB_POOL_RECYCLE_SECONDS = _pool.get("RecycleSeconds", 1800)
+DB_POOL_PRE_PING = _pool.get("PrePing", True)
+DB_STATEMENT_TIMEOUT_MS = _pool.get("StatementTimeoutMs", 30000)
+DB_SLOW_CHECKOUT_MS = _pool.get("SlowCheckoutMs", 100)
+
+# JWT verification (tokens are issued by the User service; keys must match its JWT section)
+JWT_SECRET = config.get("JWT", {}).get("SecretKey")
+JWT_ALGORITHM = config.get("JWT", {}).get("Algorithm")
+JWT_KEYS = {"default": JWT_SECRET} if JWT_SECRET else {}
+JWT_KEYS.update({k["Kid"]: k["SecretKey"] for k in config.get("JWT", {}).get("Keys", [])})
+JWT_ACTIVE_KID = config.get("JWT", {}).get("ActiveKid", "default")
+JWT_TOKEN_CACHE_SIZE = config.get("JWT", {}).get("TokenCacheSize", 10000)
+
+# Rate limiting (rules are parsed in Shared/RateLimit.py)
+_rate_limit = config.get("RateLimit", {})
+RATE_LIMIT_ENABLED = _rate_limit.get("Enabled", False)
+RATE_LIMIT_STORE_URL = _rate_limit.get("StoreUrl", "memory://")
+RATE_LIMIT_SHARDS = _rate_limit.get("Shards", 16)
+RATE_LIMIT_TRUST_FORWARDED_FOR = _rate_limit.get("TrustForwardedFor", False)
+RATE_LIMIT_RULES = _rate_limit.get("Rules", [])
+
+# HTTP caching (Cache-Control values; empty string sends none)
+_http_cache = config.get("HttpCache", {})
+LISTING_CACHE_CONTROL = _http_cache.get("ListingCacheControl", "public, max-age=0, must-revalidate")
+IMAGE_CACHE_CONTROL = _http_cache.get("ImageCacheControl", "public, max-age=31536000, immutable")
+
+# Number of server processes. uvicorn (--workers) and gunicorn both read
+# WEB_CONCURRENCY; set it whenever more than one worker is started
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Read-through product cache ("memory://" per process, or "redis://..." shared).
+# A write only invalidates the cache of the worker that handled it, so with
+# SERVER_WORKERS > 1 the store must be redis (the listing ETags come from it too)
+_product_cache = config.get("ProductCache", {})
+PRODUCT_CACHE_URL = _product_cache.get("StoreUrl", "memory://")
+PRODUCT_CACHE_MAX_ENTRIES = _product_cache.get("MaxEntries", 10000)
+# Per-product version counters kept by the memory backend
+PRODUCT_CACHE_MAX_COUNTERS = _product_cache.get("MaxCounters", 100000)
+
+# Response compression (gzip, plus br when the brotli package is installed).
+# Per-request levels are kept low: the CPU cost grows much faster than the saving
+_compression = config.get("Compression", {})
+COMPRESSION_ENABLED = _compression.get("Enabled", True)
+COMPRESSION_MINIMUM_SIZE = _compression.get("MinimumSize", 1024)
+COMPRESSION_GZIP_LEVEL = _compression.get("GzipLevel", 5)
+COMPRESSION_BROTLI_QUALITY = _compression.get("BrotliQuality", 4)
+
+# Stored SVG/BMP images are compressed once, so use the maximum levels
+PRECOMPRESS_GZIP_LEVEL = _compression.get("PrecompressGzipLevel", 9)
+PRECOMPRESS_BROTLI_QUALITY = _compression.get("PrecompressBrotliQuality", 11)
+
+# Request instrumentation: /metrics, Server-Timing and the slow-request log
+_metrics = config.get("Metrics", {})
+METRICS_ENABLED = _metrics.get("Enabled", True)
+SLOW_REQUEST_MS = _metrics.get("SlowRequestMs", 1000)
+SERVER_TIMING_ENABLED = _metrics.get("ServerTiming", True)
+
+# Readiness probes (cached; refreshed in the background once older than the TTL)
+_health = config.get("Health", {})
+HEALTH_CACHE_TTL_SECONDS = _health.get("CacheTtlSeconds", 5)
+HEALTH_MAX_STALE_SECONDS = _health.get("MaxStaleSeconds", 30)
+HEALTH_DB_TIMEOUT_SECONDS = _health.get("DbTimeoutSeconds", 2)
+HEALTH_POOL_SATURATION_THRESHOLD = _health.get("PoolSaturationThreshold", 1.0)
+
+# Image uploads: streamed to the blob store in chunks; both limits are
+# checked before the whole upload has been written. SVG is left out of the
+# defaults: it can carry script, and stored images are served from the API origin
+_uploads = config.get("Uploads", {})
+UPLOAD_MAX_IMAGE_BYTES = _uploads.get("MaxImageBytes", 10 * 1024 * 1024)
+UPLOAD_ALLOWED_CONTENT_TYPES = _uploads.get(
+    "AllowedContentTypes",
+    ["image/png", "image/jpeg", "image/gif", "image/webp", "image/bmp"],
+)
+
+# Background jobs (Shared/Jobs.py): worker threads, retry backoff and the outbox dispatcher
+_jobs = config.get("Jobs", {})
+JOBS_WORKERS = _jobs.get("Workers", 2)
+JOBS_MAX_QUEUE = _jobs.get("MaxQueue", 10000)
+JOBS_MAX_ATTEMPTS = _jobs.get("MaxAttempts", 5)
+JOBS_BACKOFF_SECONDS = _jobs.get("BackoffSeconds", 2)
+JOBS_BACKOFF_MAX_SECONDS = _jobs.get("BackoffMaxSeconds", 300)
+JOBS_DEDUPE_WINDOW_SECONDS = _jobs.get("DedupeWindowSeconds", 3600)
+JOBS_POLL_INTERVAL_SECONDS = _jobs.get("PollIntervalSeconds", 1)
+JOBS_LEASE_SECONDS = _jobs.get("LeaseSeconds", 300)
+JOBS_RETENTION_HOURS = _jobs.get("RetentionHours", 24)
+
+# Service metadata
+SERVICE_NAME = config.get("Service", {}).get("Name")
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import the service's top-level packages (config, Utils, ...) as
+# main.py does when the service runs from its own directory. Appended, not
+# prepended: the service's alembic/ folder must not shadow the alembic package.
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVICE_DIR not in sys.path:
+    sys.path.append(SERVICE_DIR)
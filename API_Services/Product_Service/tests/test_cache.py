@@ -0,0 +1,62 @@
+import asyncio
+import json
+import threading
+
+from sqlalchemy.util.concurrency import greenlet_spawn
+
+from Utils.Cache import MemoryCacheBackend, RedisCacheBackend
+
+
+class RecordingClient:
+    """
+    Stands in for redis.Redis and records which thread each call ran on.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.threads.append(threading.get_ident())
+        self.values[key] = value
+
+
+def test_calls_from_run_sync_leave_the_event_loop():
+    client = RecordingClient()
+    cache = RedisCacheBackend(client)
+
+    async def main():
+        # greenlet_spawn is what AsyncSession.run_sync runs its function in
+        await greenlet_spawn(cache.set, "k", {"a": 1})
+        return threading.get_ident(), await greenlet_spawn(cache.get, "k")
+
+    loop_thread, value = asyncio.run(main())
+    assert value == {"a": 1}
+    assert len(client.threads) == 2
+    assert loop_thread not in client.threads
+
+
+def test_calls_from_a_thread_run_inline():
+    client = RecordingClient()
+    cache = RedisCacheBackend(client)
+    cache.set("k", [1])
+    assert cache.get("k") == [1]
+    assert json.loads(client.values["product-service:k"]) == [1]
+    assert client.threads == [threading.get_ident()] * 2
+
+
+def test_evicted_counters_never_go_back():
+    cache = MemoryCacheBackend(max_counters=2)
+    for _ in range(3):
+        cache.incr("product:1:version")
+    cache.incr("product:2:version")
+    cache.incr("product:3:version")
+
+    # product:1 was evicted at 3; reading it again must not return 0..2
+    assert cache.stats()["counters"] == 2
+    assert cache.get_counter("product:1:version") == 3
+    assert cache.incr("product:1:version") == 4
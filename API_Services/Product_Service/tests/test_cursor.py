@@ -0,0 +1,63 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from Repository_DataAcess.ProductRepo import decode_cursor, encode_cursor
+
+
+def _raw_cursor(payload) -> str:
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("sort_by, value", [
+    ("id", 42),
+    ("name", "Blue shoe"),
+    ("price", 9.5),
+    ("price", 10),
+    ("rating", 4),
+    ("created_date", datetime(2025, 11, 21, 9, 14, 37, 902114)),
+])
+def test_round_trip(sort_by, value):
+    cursor = encode_cursor(sort_by, "desc", value, 7)
+    assert decode_cursor(cursor, sort_by, "desc") == (value, 7)
+
+
+def test_sort_order_is_case_insensitive():
+    cursor = encode_cursor("price", "DESC", 3.0, 1)
+    assert decode_cursor(cursor, "price", "desc") == (3.0, 1)
+
+
+@pytest.mark.parametrize("sort_by, sort_order", [("name", "asc"), ("price", "desc")])
+def test_cursor_for_another_sort_is_rejected(sort_by, sort_order):
+    cursor = encode_cursor("price", "asc", 3.0, 1)
+    with pytest.raises(ValueError, match="does not match"):
+        decode_cursor(cursor, sort_by, sort_order)
+
+
+def _cursor(sort_by, value, last_id=1) -> tuple:
+    return sort_by, _raw_cursor({"s": sort_by, "o": "asc", "v": value, "id": last_id})
+
+
+@pytest.mark.parametrize("sort_by, cursor", [
+    ("id", "not base64!"),
+    ("id", base64.urlsafe_b64encode(b"not json").decode()),
+    ("id", _raw_cursor([1, 2])),
+    ("id", _raw_cursor({"s": "id", "o": "asc", "v": 1})),
+    _cursor("id", 1, last_id="1"),
+    _cursor("id", 1, last_id=True),
+    _cursor("id", "1"),
+    _cursor("name", 5),
+    _cursor("price", "cheap"),
+    _cursor("price", False),
+    _cursor("created_date", "2025-01-01"),
+    _cursor("created_date", {"dt": "yesterday"}),
+    _cursor("created_date", {"dt": 5}),
+])
+def test_malformed_cursor_is_rejected_without_details(sort_by, cursor):
+    with pytest.raises(ValueError) as excinfo:
+        decode_cursor(cursor, sort_by, "asc")
+    # The message reaches the client in a 400; parser errors must not leak
+    assert str(excinfo.value) == "Invalid cursor"
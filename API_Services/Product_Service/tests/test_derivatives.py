@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from PIL import Image
+
+from Storage.BlobStore import BlobNotFound, LocalBlobStore
+from Storage.ImageDerivatives import ensure_derivative, variant_name
+
+
+def _png(size=(300, 200)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, "red").save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(str(tmp_path))
+
+
+def test_renders_missing_derivative(store):
+    key = store.put(_png())
+    assert ensure_derivative(store, key, "thumb") == variant_name("thumb")
+    assert store.exists(key, variant_name("thumb"))
+
+
+def test_truncated_image_falls_back_to_original(store):
+    data = _png()
+    key = store.put(data[: len(data) // 2])
+    assert ensure_derivative(store, key, "thumb") is None
+
+
+def test_decompression_bomb_falls_back_to_original(store, monkeypatch):
+    key = store.put(_png())
+    # Errors (rather than warns) above twice the limit
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    assert ensure_derivative(store, key, "thumb") is None
+
+
+def test_undecodable_blob_has_no_derivative(store):
+    key = store.put(b"<svg xmlns='http://www.w3.org/2000/svg'/>")
+    with pytest.raises(BlobNotFound):
+        ensure_derivative(store, key, "thumb")
@@ -0,0 +1,27 @@
+import pytest
+
+from Utils.HttpCache import etag_matches
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ("*", True),
+    (' * ', True),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", "abc123"', True),
+    ('"other",W/"abc123"', True),
+    ('"other"', False),
+    ('"abc12"', False),
+    ("abc123", False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ETAG) is expected
+
+
+def test_weak_etag_matches_strong_header():
+    # If-None-Match uses the weak comparison in both directions
+    assert etag_matches('"abc123"', 'W/"abc123"')
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import Search.ProductSearch as product_search
+from Model.ProductModel import Product
+from Repository_DataAcess.ProductRepo import count_products, get_product_page
+from Search.ProductSearch import InMemorySearchBackend, set_search_backend
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("ATTACH DATABASE ':memory:' AS admin"))
+    Product.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    # "red" twice in the name scores highest, then once in the name, then
+    # only in the description
+    names = ["red red", "red", "red", "blue", "red red", "plain"]
+    for n, name in enumerate(names, start=1):
+        description = "red" if name == "plain" else ""
+        session.add(Product(
+            id=n, name=name, description=description, price=10 - n, is_active=1,
+            image_key="0" * 64, image_filename="x.png",
+        ))
+    session.commit()
+
+    set_search_backend(InMemorySearchBackend())
+    monkeypatch.setattr(product_search, "MAX_CANDIDATES", 2)
+    yield session
+    set_search_backend(None)
+    session.close()
+    engine.dispose()
+
+
+def _ids(rows) -> list[int]:
+    return [row.id for row in rows]
+
+
+def test_filter_and_count_keep_every_match(db):
+    # More matches than MAX_CANDIDATES: none of them may be dropped
+    assert count_products(db, "red") == 5
+    assert _ids(get_product_page(db, "red", "price", "asc", page_size=10)) == [6, 5, 3, 2, 1]
+
+
+def test_matches_past_the_first_page_are_reachable(db):
+    pages = [_ids(get_product_page(db, "red", "id", "asc", page=p, page_size=2)) for p in (1, 2, 3)]
+    assert pages == [[1, 2], [3, 5], [6]]
+
+
+def test_relevance_ranks_best_candidates_first(db):
+    ids = _ids(get_product_page(db, "red", "relevance", page_size=10))
+    # The two best are ranked; the remaining matches follow in id order
+    assert ids[:2] == [1, 5]
+    assert ids[2:] == [2, 3, 6]
+
+
+def test_relevance_without_matches(db):
+    assert _ids(get_product_page(db, "zzz", "relevance", page_size=10)) == []
@@ -0,0 +1,21 @@
+from sqlalchemy.engine import make_url
+
+# Each service's Db/AsyncDatabase.py builds its engine from its own settings
+# with to_async_url(); that module is only imported when Database.Mode is
+# "async", so asyncpg/aiosqlite are not required for the default sync stack.
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the sync driver in a connection string for its asyncio counterpart.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
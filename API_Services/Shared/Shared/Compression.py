@@ -0,0 +1,187 @@
+import zlib
+from typing import Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# -------------------------------------------------------
+# RESPONSE COMPRESSION (pure ASGI middleware)
+# -------------------------------------------------------
+# Negotiates br / gzip from Accept-Encoding and compresses text-like
+# responses at or above `minimum_size` bytes. Streaming responses (NDJSON,
+# CSV export) are compressed chunk by chunk with a flush after each one, so
+# clients still receive rows as they are produced. Responses that already
+# carry a Content-Encoding (e.g. precompressed blobs) or a Content-Range are
+# passed through untouched.
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    Pick the encoding with the highest q-value the client accepts, preferring
+    the order of ``available`` on ties. None means identity.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality, mode=brotli.MODE_TEXT)
+        else:
+            # wbits=31: gzip container
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush so each streamed chunk is decodable on arrival
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        compressible_types: Iterable[str] = DEFAULT_COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = tuple(compressible_types)
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        accept = headers.get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate_encoding(accept, self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        await self.app(scope, receive, _CompressingSend(self, send, encoding))
+
+    def compressible(self, content_type: str) -> bool:
+        return content_type.split(";")[0].strip().lower().startswith(self.compressible_types)
+
+
+class _CompressingSend:
+    """
+    Holds back http.response.start until the first body chunk shows
+    whether compressing is worthwhile.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start = None
+        self.encoder: Optional[_Encoder] = None
+        self.passthrough = False
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        status = self.start["status"]
+        headers = {k.lower(): v for k, v in self.start.get("headers", [])}
+        if status < 200 or status in (204, 206, 304):
+            return False
+        if b"content-encoding" in headers or b"content-range" in headers:
+            return False
+        if not self.middleware.compressible(headers.get(b"content-type", b"").decode("latin-1")):
+            return False
+        # A streamed response has no known size; compress it regardless
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    def _compressed_start(self, length: Optional[int]) -> dict:
+        headers = []
+        vary = None
+        for name, value in self.start.get("headers", []):
+            lname = name.lower()
+            if lname == b"content-length":
+                continue
+            if lname == b"etag" and not value.startswith(b"W/"):
+                # The compressed bytes differ, so a strong validator must not be reused
+                value = b"W/" + value
+            if lname == b"vary":
+                vary = value
+                continue
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**self.start, "headers": headers}
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            return await self.send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            return await self.send(message)
+
+        if self.encoder is None:
+            if not self._should_compress(body, more_body):
+                self.passthrough = True
+                await self.send(self.start)
+                return await self.send(message)
+            encoder = _Encoder(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            if not more_body:
+                compressed = encoder.finish(body)
+                await self.send(self._compressed_start(len(compressed)))
+                return await self.send({"type": "http.response.body", "body": compressed})
+            self.encoder = encoder
+            await self.send(self._compressed_start(None))
+
+        data = self.encoder.chunk(body) if more_body else self.encoder.finish(body)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
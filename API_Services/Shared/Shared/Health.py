@@ -0,0 +1,172 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from Shared.PoolTelemetry import pool_report
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------------
+# READINESS PROBES
+# -------------------------------------------------------
+# Dependency checks run off the request path and their results are cached:
+# a readiness poll returns the last report and, once it is older than
+# `ttl`, starts one background refresh (stale-while-revalidate). An idle
+# service is never probed, and polling as often as the orchestrator likes
+# costs a dict lookup. A report older than `max_stale` (e.g. a probe that
+# hangs on a dead database) counts as not ready.
+
+
+class HealthMonitor:
+    def __init__(self, ttl: float = 5.0, max_stale: float = 30.0):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._checks: dict[str, tuple[Callable[[], dict], bool]] = {}
+        self._report = None
+        self._checked_at = 0.0
+        self._checked_at_wall = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._first_run = threading.Lock()
+
+    def register(self, name: str, check: Callable[[], dict], critical: bool = True) -> None:
+        """
+        ``check`` returns a dict with at least ``ok``; an exception counts as
+        a failure. Non-critical checks are reported but do not fail readiness.
+        """
+        self._checks[name] = (check, critical)
+
+    def _run_checks(self) -> dict:
+        results = {}
+        for name, (check, critical) in self._checks.items():
+            start = time.perf_counter()
+            try:
+                result = dict(check())
+            except Exception as e:
+                logger.warning("Readiness check '%s' failed: %s", name, e)
+                result = {"ok": False, "error": str(e)}
+            result["critical"] = critical
+            result["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            results[name] = result
+        return results
+
+    def refresh(self) -> None:
+        try:
+            results = self._run_checks()
+            with self._lock:
+                self._report = results
+                self._checked_at = time.monotonic()
+                self._checked_at_wall = datetime.now(timezone.utc)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="readiness-probe", daemon=True).start()
+
+    def readiness(self) -> tuple[bool, dict]:
+        if self._report is None:
+            # Nothing cached yet: the first caller runs the probes, the rest wait for it
+            with self._first_run:
+                if self._report is None:
+                    with self._lock:
+                        self._refreshing = True
+                    self.refresh()
+
+        with self._lock:
+            results, checked_at, checked_at_wall = self._report, self._checked_at, self._checked_at_wall
+        age = time.monotonic() - checked_at
+        if age >= self.ttl:
+            self._refresh_in_background()
+
+        stale = age > self.max_stale
+        ready = not stale and all(r["ok"] for r in results.values() if r["critical"])
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "checked_at": checked_at_wall.isoformat(timespec="milliseconds"),
+            "age_seconds": round(age, 3),
+            "stale": stale,
+            "checks": results,
+        }
+
+
+# -------------------------------------------------------
+# CHECKS
+# -------------------------------------------------------
+
+def database_check(engine, timeout_seconds: float = 2.0) -> Callable[[], dict]:
+    """
+    SELECT 1 over a dedicated unpooled connection, so the probe still
+    answers (and adds nothing) when the application pool is exhausted.
+    """
+    backend = engine.url.get_backend_name()
+    connect_args = {}
+    if backend == "postgresql":
+        connect_args = {
+            "connect_timeout": max(1, int(timeout_seconds)),
+            "options": f"-c statement_timeout={int(timeout_seconds * 1000)}",
+        }
+    elif backend == "sqlite":
+        connect_args = {"timeout": timeout_seconds}
+    probe_engine = create_engine(engine.url, poolclass=NullPool, connect_args=connect_args)
+
+    def check() -> dict:
+        start = time.perf_counter()
+        with probe_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {"ok": True, "backend": backend, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    return check
+
+
+def pool_check(saturation_threshold: float = 1.0) -> Callable[[], dict]:
+    """
+    Not ready while any pool's in-use connections reach ``saturation_threshold``
+    of pool_size + max_overflow (new requests would queue for a connection).
+    """
+    def check() -> dict:
+        pools = {}
+        for name, report in pool_report().items():
+            utilization = report.get("utilization")
+            pools[name] = {
+                "in_use": report.get("in_use"),
+                "capacity": report["size"] + max(report["max_overflow"], 0) if "size" in report else None,
+                "utilization": utilization,
+                "timeouts": report["timeouts"],
+                "saturated": utilization is not None and utilization >= saturation_threshold,
+            }
+        return {"ok": not any(p["saturated"] for p in pools.values()), "pools": pools}
+
+    return check
+
+
+def writable_dir_check(path: str) -> Callable[[], dict]:
+    def check() -> dict:
+        os.makedirs(path, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path, prefix=".readiness-") as probe:
+            probe.write(b"ok")
+            probe.flush()
+        return {"ok": True, "path": os.path.abspath(path)}
+
+    return check
+
+
+def ping_check(backend) -> Callable[[], dict]:
+    """
+    For the cache/TTL store backends (memory or Redis), which all have ping().
+    """
+    def check() -> dict:
+        return {"ok": bool(backend.ping()), "backend": type(backend).__name__}
+
+    return check
@@ -0,0 +1,201 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from Shared.PoolTelemetry import pool_prometheus_lines
+from Shared.Metrics import Family, render_family
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------------
+# REQUEST INSTRUMENTATION
+# -------------------------------------------------------
+# InstrumentationMiddleware opens a RequestStats for every HTTP request and
+# publishes it through a ContextVar. The cursor hooks installed on each
+# engine by instrument_engine() add every statement's time to it, so a
+# request's SQL cost is known even when the queries run on a threadpool
+# worker (sync routes copy the context) or inside a streamed body.
+# Route labels use the route template (/user/product/{product_id}), never
+# the raw path, to keep the label set bounded.
+
+# Statements kept per request for the slow-request log (by SQL text)
+MAX_STATEMENTS_PER_REQUEST = 100
+STATEMENT_PREVIEW_CHARS = 200
+SLOW_LOG_TOP_STATEMENTS = 5
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUESTS = Family(
+    "http_requests_total", "HTTP requests by route and status.", "counter", ("method", "route", "status")
+)
+HTTP_DURATION = Family(
+    "http_request_duration_seconds", "Time to the last response byte.", "histogram", ("method", "route")
+)
+HTTP_RESPONSE_BYTES = Family(
+    "http_response_size_bytes", "Response body bytes sent (after compression).", "histogram",
+    ("method", "route"), buckets=RESPONSE_SIZE_BUCKETS,
+)
+HTTP_DB_QUERIES = Family(
+    "http_request_db_queries", "SQL statements executed per request.", "histogram",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_DB_SECONDS = Family(
+    "http_request_db_seconds", "Time spent in SQL per request.", "histogram", ("method", "route")
+)
+DB_QUERY_DURATION = Family(
+    "db_query_duration_seconds", "Duration of individual SQL statements.", "histogram", ("engine",)
+)
+
+REQUEST_FAMILIES = (HTTP_REQUESTS, HTTP_DURATION, HTTP_RESPONSE_BYTES, HTTP_DB_QUERIES, HTTP_DB_SECONDS)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        # SQL text -> [count, seconds]; parameterised SQL groups N+1 loops together
+        self.statements: dict[str, list] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        text = " ".join(statement.split())[:STATEMENT_PREVIEW_CHARS]
+        entry = self.statements.get(text)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += seconds
+        elif len(self.statements) < MAX_STATEMENTS_PER_REQUEST:
+            self.statements[text] = [1, seconds]
+
+    def top_statements(self, limit: int = SLOW_LOG_TOP_STATEMENTS) -> list[tuple[str, int, float]]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(text, count, seconds) for text, (count, seconds) in ranked[:limit]]
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+# -------------------------------------------------------
+# SQLALCHEMY CURSOR HOOKS
+# -------------------------------------------------------
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Time every statement on ``engine`` (an AsyncEngine's sync_engine for
+    the async stack).
+    """
+    duration = DB_QUERY_DURATION.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        duration.observe(elapsed)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(exception_context):
+        # after_cursor_execute does not fire for a failed statement
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+# -------------------------------------------------------
+# MIDDLEWARE
+# -------------------------------------------------------
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(total_seconds: float, stats: RequestStats) -> str:
+    return (
+        f'app;dur={total_seconds * 1000:.1f}, '
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+    )
+
+
+class InstrumentationMiddleware:
+    """
+    Records latency, response size and SQL cost per route, adds a
+    Server-Timing header (time up to the response headers) and logs requests
+    slower than ``slow_request_ms`` with their heaviest statements.
+    """
+
+    def __init__(self, app, slow_request_ms: float = 1000, server_timing_header: bool = True):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def instrumented_send(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(time.perf_counter() - start, stats).encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, instrumented_send)
+        finally:
+            _current_stats.reset(token)
+            self._record(scope, status, sent, time.perf_counter() - start, stats)
+
+    def _record(self, scope, status: int, sent: int, elapsed: float, stats: RequestStats) -> None:
+        method, route = scope["method"], _route_label(scope)
+        HTTP_REQUESTS.labels(method, route, status).inc()
+        HTTP_DURATION.labels(method, route).observe(elapsed)
+        HTTP_RESPONSE_BYTES.labels(method, route).observe(sent)
+        HTTP_DB_QUERIES.labels(method, route).observe(stats.queries)
+        HTTP_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            breakdown = "; ".join(
+                f"{count}x {seconds * 1000:.1f} ms {text}" for text, count, seconds in stats.top_statements()
+            )
+            logger.warning(
+                "Slow request %s %s -> %s: %.1f ms, %d queries, %.1f ms in SQL, %d bytes. Top statements: %s",
+                method, scope.get("path"), status, elapsed * 1000,
+                stats.queries, stats.db_seconds * 1000, sent, breakdown or "none",
+            )
+
+
+def render_metrics(*extra: list[str]) -> str:
+    """
+    All request, statement and connection pool metrics in Prometheus text
+    format, followed by any ``extra`` exposition lines (e.g. job queues).
+    """
+    lines = []
+    for family in (*REQUEST_FAMILIES, DB_QUERY_DURATION):
+        lines.extend(render_family(family))
+    lines.extend(pool_prometheus_lines())
+    for more in extra:
+        lines.extend(more)
+    return "\n".join(lines) + "\n"
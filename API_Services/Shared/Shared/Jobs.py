@@ -0,0 +1,684 @@
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException  # type: ignore
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, String, Text, and_, delete, event, func, insert, or_, select, text, update
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from Shared.Metrics import Family, render_family, render_metric
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------------
+# BACKGROUND JOB QUEUE
+# -------------------------------------------------------
+# Handlers enqueue slow side effects and return immediately; a small pool of
+# worker threads runs them with retries (exponential backoff with jitter).
+#
+#   enqueue()          in-memory: lost on restart, fine for work that can be
+#                      redone or must not be persisted (e.g. OTP codes)
+#   enqueue_durable()  a row in the service's outbox table, optionally inside
+#                      the caller's transaction; a dispatcher thread claims
+#                      due rows with a lease, so a crashed worker's jobs are
+#                      picked up again and several processes can share a table;
+#                      the lease is renewed while the job waits and runs, so a
+#                      slow handler is never claimed twice
+#
+# Idempotency keys make enqueueing the same work twice a no-op: in memory
+# for `dedupe_window` seconds, in the outbox while a non-failed row with the
+# key exists. A partial unique index (idempotency_index) allows one pending
+# or running row per key, so two concurrent enqueues cannot both insert.
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+ACTIVE_WHERE = text(f"status IN ('{PENDING}', '{RUNNING}')")
+
+JOBS_ENQUEUED = Family("jobs_enqueued_total", "Jobs enqueued.", "counter", ("queue", "type", "durable"))
+JOBS_DUPLICATES = Family("jobs_duplicates_total", "Enqueues skipped by idempotency key.", "counter", ("queue", "type"))
+JOBS_SUCCEEDED = Family("jobs_succeeded_total", "Jobs completed.", "counter", ("queue", "type"))
+JOBS_RETRIED = Family("jobs_retried_total", "Failed attempts that were rescheduled.", "counter", ("queue", "type"))
+JOBS_FAILED = Family("jobs_failed_total", "Jobs that exhausted their attempts.", "counter", ("queue", "type"))
+JOBS_DURATION = Family("jobs_duration_seconds", "Handler run time per attempt.", "histogram", ("queue", "type"))
+
+JOB_FAMILIES = (JOBS_ENQUEUED, JOBS_DUPLICATES, JOBS_SUCCEEDED, JOBS_RETRIED, JOBS_FAILED, JOBS_DURATION)
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help; the job fails at once.
+    """
+
+
+class JobOutboxMixin:
+    """
+    Columns of a service's outbox table (each service declares its own
+    table on its own Base).
+    """
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)
+    idempotency_key = Column(String(200), nullable=True, index=True)
+    status = Column(String(16), nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # Naive UTC, like every other timestamp in the schema
+    run_at = Column(DateTime, nullable=False)
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_date = Column(DateTime, nullable=True, onupdate=datetime.utcnow)
+
+
+def idempotency_index(name: str) -> Index:
+    """
+    Partial unique index on idempotency_key over pending/running rows; every
+    outbox table lists it in its __table_args__.
+    """
+    return Index(name, "idempotency_key", unique=True, postgresql_where=ACTIVE_WHERE, sqlite_where=ACTIVE_WHERE)
+
+
+@dataclass
+class Job:
+    id: str
+    job_type: str
+    payload: dict
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    attempts: int = 0
+    outbox_id: Optional[int] = None
+    enqueued_at: float = field(default_factory=time.time)
+
+
+@dataclass(order=True)
+class _Scheduled:
+    run_at: float
+    seq: int
+    job: Job = field(compare=False)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        name: str,
+        workers: int = 2,
+        max_queue: int = 10_000,
+        max_attempts: int = 5,
+        backoff_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+        dedupe_window: float = 3600.0,
+        session_factory=None,
+        outbox_model=None,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 300.0,
+        retention_seconds: float = 86_400.0,
+    ):
+        self.name = name
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.dedupe_window = dedupe_window
+        self.session_factory = session_factory
+        self.outbox_model = outbox_model
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+
+        self._handlers: dict[str, tuple[Callable[[dict], Any], Optional[int]]] = {}
+        self._heap: list[_Scheduled] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._keys: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._in_flight = 0
+        self._durable_waiting = 0
+        self._threads: list[threading.Thread] = []
+        self._started = False
+        self._stopping = False
+        self._dispatch_wakeup = threading.Event()
+        self._last_maintenance = 0.0
+        # Outbox rows this process has claimed and not yet finished
+        self._leased: set[int] = set()
+        self._last_renewal = 0.0
+        self.recent_failures_memory: deque = deque(maxlen=50)
+
+    @property
+    def durable(self) -> bool:
+        return self.outbox_model is not None and self.session_factory is not None
+
+    # ---------------------------------------------------
+    # Registration
+    # ---------------------------------------------------
+
+    def register(self, job_type: str, handler: Callable[[dict], Any], max_attempts: Optional[int] = None) -> None:
+        self._handlers[job_type] = (handler, max_attempts)
+
+    def handler(self, job_type: str, max_attempts: Optional[int] = None):
+        def decorator(fn):
+            self.register(job_type, fn, max_attempts)
+            return fn
+        return decorator
+
+    def _attempts_for(self, job_type: str, max_attempts: Optional[int]) -> int:
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type '{job_type}'")
+        return max_attempts or self._handlers[job_type][1] or self.max_attempts
+
+    # ---------------------------------------------------
+    # Enqueue
+    # ---------------------------------------------------
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> str:
+        """
+        Queue a job in memory. Returns its id (or the id of the job already
+        queued under ``idempotency_key``). 503 when the queue is full.
+        """
+        attempts = self._attempts_for(job_type, max_attempts)
+        with self._cond:
+            if idempotency_key:
+                existing = self._remembered(idempotency_key)
+                if existing is not None:
+                    JOBS_DUPLICATES.labels(self.name, job_type).inc()
+                    return existing
+            if len(self._heap) >= self.max_queue:
+                raise HTTPException(status_code=503, detail="Background queue is full, try again shortly")
+
+            job = Job(f"{self.name}-{uuid.uuid4().hex[:16]}", job_type, payload or {}, attempts, idempotency_key)
+            self._push(job, delay)
+            if idempotency_key:
+                self._keys[idempotency_key] = (job.id, time.monotonic() + self.dedupe_window)
+        JOBS_ENQUEUED.labels(self.name, job_type, "false").inc()
+        self.start()
+        return job.id
+
+    def _remembered(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        # Keys expire in insertion order
+        while self._keys:
+            oldest, (_, expires_at) = next(iter(self._keys.items()))
+            if expires_at > now:
+                break
+            self._keys.pop(oldest)
+        entry = self._keys.get(key)
+        return entry[0] if entry else None
+
+    def enqueue_durable(
+        self,
+        job_type: str,
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+        db=None,
+    ) -> int:
+        """
+        Write the job to the outbox. With ``db`` the row joins the caller's
+        transaction (committed or rolled back with it; the caller commits);
+        otherwise it is committed on a session of its own. Returns the row id.
+        """
+        if not self.durable:
+            raise RuntimeError(f"Job queue '{self.name}' has no outbox table configured")
+        attempts = self._attempts_for(job_type, max_attempts)
+        model = self.outbox_model
+        own_session = db is None
+        session = self.session_factory() if own_session else db
+        try:
+            if idempotency_key:
+                existing = self._existing_row(session, idempotency_key)
+                if existing is not None:
+                    JOBS_DUPLICATES.labels(self.name, job_type).inc()
+                    return existing
+
+            row_id = self._insert_row(session, {
+                "job_type": job_type,
+                "payload": json.dumps(payload or {}),
+                "idempotency_key": idempotency_key,
+                "status": PENDING,
+                "attempts": 0,
+                "max_attempts": attempts,
+                "run_at": datetime.utcnow() + timedelta(seconds=delay),
+            })
+            if row_id is None:
+                # A concurrent enqueue inserted the key between our check and
+                # our insert; the unique index kept it to one row
+                JOBS_DUPLICATES.labels(self.name, job_type).inc()
+                return self._existing_row(session, idempotency_key)
+            if own_session:
+                session.commit()
+                self._wake_dispatcher()
+            else:
+                self._wake_after_commit(session)
+        finally:
+            if own_session:
+                session.close()
+        JOBS_ENQUEUED.labels(self.name, job_type, "true").inc()
+        self.start()
+        return row_id
+
+    def _existing_row(self, session, idempotency_key: str) -> Optional[int]:
+        model = self.outbox_model
+        return session.scalar(
+            select(model.id).where(model.idempotency_key == idempotency_key, model.status != FAILED).limit(1)
+        )
+
+    def _insert_row(self, session, values: dict) -> Optional[int]:
+        """
+        Insert an outbox row and return its id, or None when a pending/running
+        row already holds its idempotency key. Postgres and SQLite skip the
+        conflicting row (ON CONFLICT DO NOTHING); elsewhere the IntegrityError
+        is caught in a savepoint, so the caller's transaction stays usable.
+        """
+        table = self.outbox_model.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = (
+                dialect_insert(table)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["idempotency_key"], index_where=ACTIVE_WHERE)
+                .returning(table.c.id)
+            )
+            return session.scalar(statement)
+        try:
+            with session.begin_nested():
+                return session.scalar(insert(table).values(**values).returning(table.c.id))
+        except IntegrityError:
+            return None
+
+    def _wake_after_commit(self, session) -> None:
+        """
+        Wake the dispatcher when the caller's transaction commits. The two
+        listeners are added once per session, however many jobs it enqueues;
+        a rollback drops the pending wake-up, so a rolled-back enqueue has no
+        effect on a later commit.
+        """
+        key = f"jobs:{self.name}:wake"
+        if key not in session.info:
+            def on_commit(committed):
+                if committed.info.get(key):
+                    committed.info[key] = False
+                    self._wake_dispatcher()
+
+            def on_rollback(rolled_back):
+                rolled_back.info[key] = False
+
+            event.listen(session, "after_commit", on_commit)
+            event.listen(session, "after_rollback", on_rollback)
+        session.info[key] = True
+
+    def _push(self, job: Job, delay: float = 0.0) -> None:
+        # Caller holds self._cond
+        heapq.heappush(self._heap, _Scheduled(time.monotonic() + delay, next(self._seq), job))
+        if job.outbox_id is not None:
+            self._durable_waiting += 1
+        self._cond.notify()
+
+    # ---------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------
+
+    def start(self) -> None:
+        if self._started:
+            return
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+            self._stopping = False
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-job-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.durable:
+            thread = threading.Thread(target=self._dispatch_loop, name=f"{self.name}-job-dispatcher", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """
+        Let running jobs finish (up to ``timeout``). Queued in-memory jobs are
+        dropped; claimed outbox jobs that have not started are released.
+        """
+        with self._cond:
+            self._stopping = True
+            pending = [item.job for item in self._heap]
+            self._heap.clear()
+            self._durable_waiting = 0
+            self._leased.difference_update(job.outbox_id for job in pending)
+            self._cond.notify_all()
+        self._dispatch_wakeup.set()
+
+        durable_ids = [job.outbox_id for job in pending if job.outbox_id is not None]
+        if durable_ids:
+            self._update_outbox(durable_ids, status=PENDING, locked_until=None, attempts=self.outbox_model.attempts - 1)
+        dropped = len(pending) - len(durable_ids)
+        if dropped:
+            logger.warning("Job queue '%s' shut down with %d in-memory jobs still queued", self.name, dropped)
+
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._threads.clear()
+        self._started = False
+
+    # ---------------------------------------------------
+    # Workers
+    # ---------------------------------------------------
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0].run_at <= now:
+                        break
+                    self._cond.wait(self._heap[0].run_at - now if self._heap else None)
+                if self._stopping:
+                    return
+                job = heapq.heappop(self._heap).job
+                if job.outbox_id is not None:
+                    self._durable_waiting -= 1
+                self._in_flight += 1
+            try:
+                self._run(job)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._leased.discard(job.outbox_id)
+                if job.outbox_id is not None:
+                    # A slot is free for the next claimed row
+                    self._wake_dispatcher()
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_seconds * 2 ** (attempt - 1), self.backoff_max_seconds)
+        return delay * (0.5 + random.random() / 2)
+
+    def _run(self, job: Job) -> None:
+        if job.outbox_id is None:
+            job.attempts += 1
+        handler = self._handlers.get(job.job_type)
+        start = time.perf_counter()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job type '{job.job_type}'")
+            handler[0](job.payload)
+        except Exception as e:
+            JOBS_DURATION.labels(self.name, job.job_type).observe(time.perf_counter() - start)
+            self._failed(job, e, retry=not isinstance(e, PermanentJobError) and job.attempts < job.max_attempts)
+            return
+
+        JOBS_DURATION.labels(self.name, job.job_type).observe(time.perf_counter() - start)
+        JOBS_SUCCEEDED.labels(self.name, job.job_type).inc()
+        if job.outbox_id is not None:
+            self._update_outbox([job.outbox_id], status=DONE, locked_until=None, last_error=None)
+
+    def _failed(self, job: Job, error: Exception, retry: bool) -> None:
+        message = f"{type(error).__name__}: {error}"
+        if retry:
+            delay = self._backoff(job.attempts)
+            JOBS_RETRIED.labels(self.name, job.job_type).inc()
+            logger.warning(
+                "Job %s (%s) attempt %d/%d failed, retrying in %.1fs: %s",
+                job.id, job.job_type, job.attempts, job.max_attempts, delay, message,
+            )
+            if job.outbox_id is not None:
+                self._update_outbox(
+                    [job.outbox_id], status=PENDING, locked_until=None, last_error=message,
+                    run_at=datetime.utcnow() + timedelta(seconds=delay),
+                )
+            else:
+                with self._cond:
+                    if not self._stopping:
+                        self._push(job, delay)
+            return
+
+        JOBS_FAILED.labels(self.name, job.job_type).inc()
+        logger.error("Job %s (%s) failed after %d attempts: %s", job.id, job.job_type, job.attempts, message)
+        if job.outbox_id is not None:
+            self._update_outbox([job.outbox_id], status=FAILED, locked_until=None, last_error=message)
+        else:
+            self.recent_failures_memory.append({
+                "id": job.id, "type": job.job_type, "attempts": job.attempts, "error": message,
+                "idempotency_key": job.idempotency_key, "failed_at": datetime.utcnow().isoformat(),
+            })
+
+    # ---------------------------------------------------
+    # Outbox dispatcher
+    # ---------------------------------------------------
+
+    def _wake_dispatcher(self) -> None:
+        self._dispatch_wakeup.set()
+
+    def _update_outbox(self, ids: list[int], **values) -> None:
+        model = self.outbox_model
+        try:
+            with self.session_factory() as session:
+                session.execute(update(model).where(model.id.in_(ids)).values(updated_date=datetime.utcnow(), **values))
+                session.commit()
+        except Exception:
+            # The lease expires and the row is claimed again
+            logger.exception("Could not update outbox rows %s of queue '%s'", ids, self.name)
+
+    def _claimable(self, now: datetime):
+        model = self.outbox_model
+        return or_(
+            and_(model.status == PENDING, model.run_at <= now),
+            # A worker died (or the process restarted) while running it
+            and_(model.status == RUNNING, model.locked_until < now, model.attempts < model.max_attempts),
+        )
+
+    def _claim_due(self) -> int:
+        with self._cond:
+            # Keep at most one batch waiting behind the running jobs
+            free = self.workers * 2 - self._in_flight - self._durable_waiting
+        if free <= 0:
+            return 0
+
+        model = self.outbox_model
+        now = datetime.utcnow()
+        claimed = []
+        with self.session_factory() as session:
+            ids = session.scalars(select(model.id).where(self._claimable(now)).order_by(model.run_at).limit(free)).all()
+            for row_id in ids:
+                # Optimistic claim: another process may have taken the row meanwhile
+                result = session.execute(
+                    update(model)
+                    .where(model.id == row_id, self._claimable(now))
+                    .values(
+                        status=RUNNING,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                        attempts=model.attempts + 1,
+                        updated_date=now,
+                    )
+                )
+                if result.rowcount == 1:
+                    claimed.append(row_id)
+            session.commit()
+            if not claimed:
+                return 0
+            rows = session.execute(
+                select(model.id, model.job_type, model.payload, model.idempotency_key, model.attempts, model.max_attempts)
+                .where(model.id.in_(claimed))
+            ).all()
+
+        with self._cond:
+            self._leased.update(row.id for row in rows)
+            for row in rows:
+                self._push(Job(
+                    id=f"{self.name}-outbox-{row.id}", job_type=row.job_type, payload=json.loads(row.payload),
+                    max_attempts=row.max_attempts, idempotency_key=row.idempotency_key,
+                    attempts=row.attempts, outbox_id=row.id,
+                ))
+        return len(rows)
+
+    def _renew_leases(self) -> None:
+        """
+        Push locked_until forward for every row this process holds, so a
+        handler running longer than lease_seconds is not claimed again.
+        """
+        with self._cond:
+            ids = list(self._leased)
+        if not ids:
+            return
+        model = self.outbox_model
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            session.execute(
+                update(model)
+                .where(model.id.in_(ids), model.status == RUNNING)
+                .values(locked_until=now + timedelta(seconds=self.lease_seconds))
+            )
+            session.commit()
+
+    def _maintenance(self) -> None:
+        """
+        Fail rows whose lease expired on their last attempt and purge done
+        rows past the retention period.
+        """
+        model = self.outbox_model
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            session.execute(
+                update(model)
+                .where(model.status == RUNNING, model.locked_until < now, model.attempts >= model.max_attempts)
+                .values(status=FAILED, last_error="Lease expired on the last attempt", updated_date=now)
+            )
+            session.execute(
+                delete(model).where(model.status == DONE, model.updated_date < now - timedelta(seconds=self.retention_seconds))
+            )
+            session.commit()
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopping:
+            claimed = 0
+            try:
+                # Renew well before expiry (a third of the lease)
+                if time.monotonic() - self._last_renewal >= self.lease_seconds / 3:
+                    self._last_renewal = time.monotonic()
+                    self._renew_leases()
+                claimed = self._claim_due()
+                if time.monotonic() - self._last_maintenance >= 60:
+                    self._last_maintenance = time.monotonic()
+                    self._maintenance()
+            except Exception:
+                logger.exception("Outbox dispatch failed for queue '%s'", self.name)
+            if not claimed:
+                self._dispatch_wakeup.wait(self.poll_interval)
+            self._dispatch_wakeup.clear()
+
+    # ---------------------------------------------------
+    # Admin / metrics
+    # ---------------------------------------------------
+
+    def outbox_counts(self) -> dict:
+        if not self.durable:
+            return {}
+        model = self.outbox_model
+        with self.session_factory() as session:
+            rows = session.execute(select(model.status, func.count()).group_by(model.status)).all()
+        return {status: count for status, count in rows}
+
+    def stats(self) -> dict:
+        with self._cond:
+            queued, in_flight = len(self._heap), self._in_flight
+        types = {}
+        for job_type in self._handlers:
+            types[job_type] = {
+                "enqueued": sum(JOBS_ENQUEUED.labels(self.name, job_type, d).value for d in ("false", "true")),
+                "duplicates": JOBS_DUPLICATES.labels(self.name, job_type).value,
+                "succeeded": JOBS_SUCCEEDED.labels(self.name, job_type).value,
+                "retried": JOBS_RETRIED.labels(self.name, job_type).value,
+                "failed": JOBS_FAILED.labels(self.name, job_type).value,
+                "duration_seconds": JOBS_DURATION.labels(self.name, job_type).snapshot(),
+            }
+        return {
+            "queue": self.name,
+            "workers": self.workers,
+            "running": self._started,
+            "queued": queued,
+            "in_flight": in_flight,
+            "outbox": self.outbox_counts(),
+            "types": types,
+        }
+
+    def recent_failures(self, limit: int = 50) -> dict:
+        failures = {"memory": list(self.recent_failures_memory)[-limit:], "outbox": []}
+        if self.durable:
+            model = self.outbox_model
+            with self.session_factory() as session:
+                rows = session.scalars(
+                    select(model).where(model.status == FAILED).order_by(model.updated_date.desc()).limit(limit)
+                ).all()
+                failures["outbox"] = [
+                    {
+                        "id": row.id, "type": row.job_type, "attempts": row.attempts, "error": row.last_error,
+                        "idempotency_key": row.idempotency_key,
+                        "failed_at": row.updated_date.isoformat() if row.updated_date else None,
+                    }
+                    for row in rows
+                ]
+        return failures
+
+    def retry_failed(self, outbox_id: int) -> bool:
+        """
+        Put a failed outbox job back in the queue with a fresh set of attempts.
+        """
+        if not self.durable:
+            return False
+        model = self.outbox_model
+        with self.session_factory() as session:
+            try:
+                result = session.execute(
+                    update(model)
+                    .where(model.id == outbox_id, model.status == FAILED)
+                    .values(status=PENDING, attempts=0, run_at=datetime.utcnow(), locked_until=None, updated_date=datetime.utcnow())
+                )
+                session.commit()
+            except IntegrityError:
+                # The same work was queued again since; that row will run
+                session.rollback()
+                return False
+        if result.rowcount:
+            self.start()
+            self._wake_dispatcher()
+        return bool(result.rowcount)
+
+    def prometheus_lines(self) -> list[str]:
+        lines = []
+        for family in JOB_FAMILIES:
+            lines.extend(render_family(family))
+        with self._cond:
+            queued, in_flight = len(self._heap), self._in_flight
+        lines += render_metric("jobs_queued", "Jobs waiting in memory (including claimed outbox rows).", "gauge",
+                               [({"queue": self.name}, queued)])
+        lines += render_metric("jobs_in_flight", "Jobs being run.", "gauge", [({"queue": self.name}, in_flight)])
+        if self.durable:
+            try:
+                counts = self.outbox_counts()
+            except Exception:
+                logger.exception("Could not count outbox rows of queue '%s'", self.name)
+                counts = {}
+            lines += render_metric(
+                "jobs_outbox_rows", "Outbox rows by status.", "gauge",
+                [({"queue": self.name, "status": status}, counts.get(status, 0)) for status in (PENDING, RUNNING, DONE, FAILED)],
+            )
+        return lines
@@ -0,0 +1,132 @@
+import bisect
+import threading
+from typing import Sequence
+
+# -------------------------------------
+# IN-PROCESS METRIC PRIMITIVES
+# -------------------------------------
+# Lock-protected, dependency-free counterparts of the Prometheus types.
+
+# Seconds; tuned for latencies between sub-millisecond and several seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (same semantics as a Prometheus histogram).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Family:
+    """
+    A metric with labels: one child Histogram/Counter per label-value tuple.
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str], **child_kwargs):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._child_kwargs = child_kwargs
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = Histogram(**self._child_kwargs) if self.kind == "histogram" else Counter()
+                    self._children[key] = child
+        return child
+
+    def children(self) -> list[tuple[dict, object]]:
+        with self._lock:
+            items = list(self._children.items())
+        return [(dict(zip(self.labelnames, key)), child) for key, child in items]
+
+
+# -------------------------------------
+# PROMETHEUS TEXT EXPOSITION (format 0.0.4)
+# -------------------------------------
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_metric(name: str, help_text: str, kind: str, samples: list[tuple[dict, object]]) -> list[str]:
+    """
+    Exposition lines for one metric. ``samples`` pairs a label dict with a
+    Histogram, a Counter or a plain number (rendered as a gauge/counter value).
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, metric in samples:
+        if isinstance(metric, Histogram):
+            snap = metric.snapshot()
+            for bound, count in snap["buckets"].items():
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(snap['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {snap['count']}")
+        else:
+            value = metric.value if isinstance(metric, Counter) else metric
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return lines
+
+
+def render_family(family: Family) -> list[str]:
+    return render_metric(family.name, family.help, family.kind, family.children())
@@ -0,0 +1,175 @@
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from Shared.Metrics import Counter, Histogram, render_metric
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------
+# CONNECTION POOL TELEMETRY
+# -------------------------------------
+# Each engine gets its own pool subclass that times _do_get(), i.e. the
+# time a request spends waiting for a connection (including opening a new
+# one). In-use/overflow gauges are read from the live pool on demand.
+
+
+class PoolTelemetry:
+    def __init__(self, name: str, slow_checkout_ms: float = 100):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self.checkout_wait = Histogram()
+        self.checkouts = Counter()
+        self.slow_checkouts = Counter()
+        self.timeouts = Counter()
+        self.engine = None
+
+    def record_checkout(self, pool, seconds: float) -> None:
+        self.checkouts.inc()
+        self.checkout_wait.observe(seconds)
+        if self.slow_checkout_ms and seconds * 1000 >= self.slow_checkout_ms:
+            self.slow_checkouts.inc()
+            logger.warning(
+                "Slow connection checkout on '%s' pool: %.1f ms (%s)",
+                self.name, seconds * 1000, pool.status(),
+            )
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        report = {
+            "name": self.name,
+            "pool_class": getattr(pool, "base_pool_name", type(pool).__name__),
+            "checkouts": self.checkouts.value,
+            "slow_checkouts": self.slow_checkouts.value,
+            "slow_checkout_ms": self.slow_checkout_ms,
+            "timeouts": self.timeouts.value,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+        if isinstance(pool, QueuePool):
+            size = pool.size()
+            in_use = pool.checkedout()
+            report.update(
+                size=size,
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout(),
+                checked_in=pool.checkedin(),
+                in_use=in_use,
+                # QueuePool.overflow() is negative while below pool_size
+                overflow=max(pool.overflow(), 0),
+                utilization=round(in_use / (size + max(pool._max_overflow, 0)), 3) if size else None,
+            )
+        return report
+
+
+class _TimedCheckoutMixin:
+    telemetry: PoolTelemetry
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.telemetry.timeouts.inc()
+            raise
+        finally:
+            self.telemetry.record_checkout(self, time.perf_counter() - start)
+
+
+def instrumented_pool_class(base: type, telemetry: PoolTelemetry) -> type:
+    """
+    Subclass ``base`` with checkout timing bound to ``telemetry``. The class
+    (not the instance) carries the telemetry so pool.recreate() keeps it.
+    """
+    return type(
+        f"Timed{base.__name__}",
+        (_TimedCheckoutMixin, base),
+        {"telemetry": telemetry, "base_pool_name": base.__name__},
+    )
+
+
+_registry: dict[str, PoolTelemetry] = {}
+
+
+def register_engine(telemetry: PoolTelemetry, engine) -> None:
+    telemetry.engine = engine
+    _registry[telemetry.name] = telemetry
+
+
+def pool_report() -> dict:
+    return {name: telemetry.snapshot() for name, telemetry in _registry.items()}
+
+
+def pool_prometheus_lines() -> list[str]:
+    """
+    The pool report as Prometheus metrics, labelled by pool name.
+    """
+    telemetries = list(_registry.values())
+    gauges = {"in_use": [], "checked_in": [], "overflow": [], "size": []}
+    for telemetry in telemetries:
+        report = telemetry.snapshot()
+        for key, samples in gauges.items():
+            if report.get(key) is not None:
+                samples.append(({"pool": telemetry.name}, report[key]))
+
+    lines = render_metric(
+        "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.", "histogram",
+        [({"pool": t.name}, t.checkout_wait) for t in telemetries],
+    )
+    for name, attr, help_text in (
+        ("db_pool_checkouts_total", "checkouts", "Connection checkouts."),
+        ("db_pool_slow_checkouts_total", "slow_checkouts", "Checkouts slower than the slow-checkout threshold."),
+        ("db_pool_timeouts_total", "timeouts", "Checkouts that timed out."),
+    ):
+        lines += render_metric(name, help_text, "counter", [({"pool": t.name}, getattr(t, attr)) for t in telemetries])
+    for key, samples in gauges.items():
+        lines += render_metric(f"db_pool_{key}", f"Pool {key.replace('_', ' ')} connections.", "gauge", samples)
+    return lines
+
+
+def engine_options(
+    url: str,
+    telemetry: Optional[PoolTelemetry] = None,
+    is_async: bool = False,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    statement_timeout_ms: Optional[int] = None,
+) -> dict:
+    """
+    Keyword arguments for create_engine/create_async_engine built from a
+    service's Database.Pool settings.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options = {"pool_pre_ping": pool_pre_ping, "pool_recycle": pool_recycle}
+    connect_args = {}
+
+    if backend == "sqlite":
+        if not is_async:
+            connect_args["check_same_thread"] = False
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+            options["connect_args"] = connect_args
+            return options
+
+    if backend == "postgresql" and statement_timeout_ms:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+
+    base_pool = AsyncAdaptedQueuePool if is_async else QueuePool
+    options.update(
+        connect_args=connect_args,
+        poolclass=instrumented_pool_class(base_pool, telemetry) if telemetry else base_pool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+    )
+    return options
@@ -0,0 +1,432 @@
+import json
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import ExitStack
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+
+# -------------------------------------------------------
+# RATE LIMITING (pure ASGI middleware)
+# -------------------------------------------------------
+# Rules come from the RateLimit section of appsettings.json:
+#   {"Name": "login-ip", "Method": "POST", "Path": "/user/login",
+#    "Key": "ip", "Algorithm": "token_bucket", "Rate": 20, "PerSeconds": 60, "Burst": 10}
+#   {"Name": "login-identifier", "Method": "POST", "Path": "/user/login",
+#    "Key": "body:identifier", "Algorithm": "sliding_window", "Limit": 10, "WindowSeconds": 300}
+# Path may contain {param} placeholders. Key is one of:
+#   ip | user | body:<json or form field> | query:<name> | path:<param>
+# ("user" is the uid of a valid bearer token, falling back to the IP).
+# When a key cannot be derived (field missing, unparseable body) the rule
+# falls back to the client IP rather than being skipped. key_normalizers
+# map a Key to a function that canonicalizes its value (e.g. so every
+# spelling of one phone number shares a bucket).
+# A request is counted against its rules only if none of them rejects it.
+# Requests over a limit get a 429 with Retry-After before routing, so no
+# database or hashing work is done for them. A body-keyed route rejects
+# bodies over MAX_BODY_FOR_KEYS with a 413, since they cannot be keyed.
+
+MAX_BODY_FOR_KEYS = 64 * 1024
+
+TOKEN_BUCKET = "token_bucket"
+SLIDING_WINDOW = "sliding_window"
+
+# _buffer_body result for a body over MAX_BODY_FOR_KEYS
+_TOO_LARGE = object()
+
+
+class RateLimitRule:
+    def __init__(self, raw: dict):
+        self.name = raw["Name"]
+        self.method = raw.get("Method", "*").upper()
+        self.key = raw.get("Key", "ip")
+        self.algorithm = raw.get("Algorithm", TOKEN_BUCKET)
+        if self.algorithm == TOKEN_BUCKET:
+            self.rate = raw["Rate"] / raw.get("PerSeconds", 1)
+            self.burst = raw.get("Burst", raw["Rate"])
+        elif self.algorithm == SLIDING_WINDOW:
+            self.limit = raw["Limit"]
+            self.window = raw["WindowSeconds"]
+        else:
+            raise ValueError(f"Unknown rate limit algorithm: {self.algorithm}")
+
+        template = raw["Path"]
+        pattern = re.sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", re.escape(template))
+        self._path = re.compile(f"^{pattern}$")
+
+    def match(self, method: str, path: str) -> Optional[re.Match]:
+        if self.method not in ("*", method):
+            return None
+        return self._path.match(path)
+
+    @property
+    def needs_body(self) -> bool:
+        return self.key.startswith("body:")
+
+
+def build_rules(raw_rules: list) -> list:
+    return [RateLimitRule(raw) for raw in raw_rules]
+
+
+class ShardedMemoryRateLimitStore:
+    """
+    Per-process limiter state split over independently locked shards, so
+    concurrent requests for different keys rarely contend. Each shard is an
+    LRU capped at `max_keys_per_shard`; evicting an idle key simply resets
+    its limit.
+    """
+
+    blocking = False
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10_000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(max(shards, 1))]
+
+    def _shard_index(self, key: str) -> int:
+        return zlib.crc32(key.encode()) % len(self._shards)
+
+    def _put(self, entries: OrderedDict, key: str, value) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.max_keys_per_shard:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _token_bucket_step(state, rate: float, burst: float, now: float) -> tuple[float, Optional[tuple]]:
+        """
+        Returns ``(retry_after, state after taking a token)``; the new state
+        is None when no token is left.
+        """
+        tokens, updated = state or (burst, now)
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            return 0.0, (tokens - 1, now)
+        return (1 - tokens) / rate, None
+
+    @staticmethod
+    def _sliding_window_step(state, limit: int, window: float, now: float) -> tuple[float, Optional[tuple]]:
+        """
+        Sliding-window counter: the previous fixed window's count is
+        weighted by how much of it still overlaps the sliding window.
+        """
+        current = int(now // window)
+        elapsed = now - current * window
+        start, count, previous = state or (current, 0, 0)
+        if start != current:
+            previous = count if start == current - 1 else 0
+            count = 0
+        estimate = previous * (1 - elapsed / window) + count
+        if estimate < limit:
+            return 0.0, (current, count + 1, previous)
+        # Time until the previous window's weight has decayed enough
+        if previous and count < limit:
+            needed = (estimate - limit + 1) / previous * window
+            return min(needed, window - elapsed), None
+        return window - elapsed, None
+
+    def check(self, checks: list[tuple], now: float) -> tuple[bool, float]:
+        """
+        Check every ``(algorithm, key, *params)`` and consume from all of
+        them only if all allow the request; otherwise nothing is consumed
+        and the longest retry_after is returned.
+        """
+        shards = sorted({self._shard_index(key) for _, key, *_ in checks})
+        with ExitStack() as stack:
+            # Always locked in index order, so two checks cannot deadlock
+            for index in shards:
+                stack.enter_context(self._shards[index][0])
+
+            steps = []
+            for algorithm, key, *params in checks:
+                entries = self._shards[self._shard_index(key)][1]
+                step = self._token_bucket_step if algorithm == TOKEN_BUCKET else self._sliding_window_step
+                retry_after, state = step(entries.get(key), *params, now)
+                steps.append((entries, key, retry_after, state))
+
+            denied = [retry_after for _, _, retry_after, state in steps if state is None]
+            if denied:
+                return False, max(denied)
+            for entries, key, _, state in steps:
+                self._put(entries, key, state)
+            return True, 0.0
+
+    def token_bucket(self, key: str, rate: float, burst: float, now: float) -> tuple[bool, float]:
+        return self.check([(TOKEN_BUCKET, key, rate, burst)], now)
+
+    def sliding_window(self, key: str, limit: int, window: float, now: float) -> tuple[bool, float]:
+        return self.check([(SLIDING_WINDOW, key, limit, window)], now)
+
+
+# KEYS are the buckets; ARGV is now, then (algorithm, param, param) per key.
+# Every bucket is read first and written only if all of them allow the
+# request, so a rejected request consumes nothing.
+_CHECK_LUA = """
+local now = tonumber(ARGV[1])
+local denied = false
+local retry_after = 0
+local states = {}
+for i, key in ipairs(KEYS) do
+    local algorithm = ARGV[i * 3 - 1]
+    if algorithm == 'token_bucket' then
+        local rate = tonumber(ARGV[i * 3])
+        local burst = tonumber(ARGV[i * 3 + 1])
+        local state = redis.call('HMGET', key, 'tokens', 'updated')
+        local tokens = tonumber(state[1]) or burst
+        local updated = tonumber(state[2]) or now
+        tokens = math.min(burst, tokens + (now - updated) * rate)
+        if tokens < 1 then
+            denied = true
+            retry_after = math.max(retry_after, (1 - tokens) / rate)
+        end
+        states[i] = tokens
+    else
+        local limit = tonumber(ARGV[i * 3])
+        local window = tonumber(ARGV[i * 3 + 1])
+        local current = math.floor(now / window)
+        local elapsed = now - current * window
+        local count = tonumber(redis.call('GET', key .. ':' .. current)) or 0
+        local previous = tonumber(redis.call('GET', key .. ':' .. (current - 1))) or 0
+        local estimate = previous * (1 - elapsed / window) + count
+        if estimate >= limit then
+            local wait = window - elapsed
+            if previous > 0 and count < limit then
+                wait = math.min(wait, (estimate - limit + 1) / previous * window)
+            end
+            denied = true
+            retry_after = math.max(retry_after, wait)
+        end
+        states[i] = current
+    end
+end
+if denied then
+    return {0, tostring(retry_after)}
+end
+for i, key in ipairs(KEYS) do
+    if ARGV[i * 3 - 1] == 'token_bucket' then
+        local rate = tonumber(ARGV[i * 3])
+        local burst = tonumber(ARGV[i * 3 + 1])
+        redis.call('HSET', key, 'tokens', tostring(states[i] - 1), 'updated', tostring(now))
+        redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+    else
+        local window = tonumber(ARGV[i * 3 + 1])
+        redis.call('INCR', key .. ':' .. states[i])
+        redis.call('EXPIRE', key .. ':' .. states[i], math.ceil(window * 2))
+    end
+end
+return {1, '0'}
+"""
+
+
+class RedisRateLimitStore:
+    """
+    Shared state for several workers/hosts on any Redis-compatible server
+    (or a fake such as fakeredis in tests). All the rules matching a
+    request are checked in one atomic script call.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._check = client.register_script(_CHECK_LUA)
+
+    def check(self, checks: list[tuple], now: float) -> tuple[bool, float]:
+        keys, args = [], [now]
+        for algorithm, key, *params in checks:
+            keys.append(self.prefix + key)
+            args.extend([algorithm, *params])
+        allowed, retry_after = self._check(keys=keys, args=args)
+        return bool(int(allowed)), float(retry_after)
+
+    def token_bucket(self, key: str, rate: float, burst: float, now: float) -> tuple[bool, float]:
+        return self.check([(TOKEN_BUCKET, key, rate, burst)], now)
+
+    def sliding_window(self, key: str, limit: int, window: float, now: float) -> tuple[bool, float]:
+        return self.check([(SLIDING_WINDOW, key, limit, window)], now)
+
+
+def create_rate_limit_store(url: str = "memory://", shards: int = 16):
+    if url.startswith("memory://"):
+        return ShardedMemoryRateLimitStore(shards=shards)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The 'redis' package is required for a redis:// rate limit store")
+        return RedisRateLimitStore(redis.Redis.from_url(url))
+    raise ValueError(f"Unsupported rate limit store URL: {url}")
+
+
+def _body_field(body: bytes, content_type: str, field: str) -> Optional[str]:
+    if not body:
+        return None
+    try:
+        if content_type.startswith("application/json"):
+            value = json.loads(body).get(field)
+        elif content_type.startswith("application/x-www-form-urlencoded"):
+            value = (parse_qs(body.decode()).get(field) or [None])[0]
+        else:
+            return None
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return None
+    return None if value is None else str(value).strip().lower()
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        rules: list,
+        store,
+        trust_forwarded_for: bool = False,
+        user_resolver: Optional[Callable[[str], Optional[str]]] = None,
+        key_normalizers: Optional[dict] = None,
+    ):
+        self.app = app
+        self.rules = rules
+        self.store = store
+        self.trust_forwarded_for = trust_forwarded_for
+        self.user_resolver = user_resolver
+        self.key_normalizers = key_normalizers or {}
+        self.rejected = 0
+
+    def _client_ip(self, scope, headers: dict) -> str:
+        if self.trust_forwarded_for and b"x-forwarded-for" in headers:
+            return headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _key(self, rule: RateLimitRule, match: re.Match, scope, headers: dict, body: Optional[bytes]) -> Optional[str]:
+        source, _, name = rule.key.partition(":")
+        if source == "ip":
+            return self._client_ip(scope, headers)
+        if source == "user":
+            auth = headers.get(b"authorization", b"").decode("latin-1")
+            if self.user_resolver and auth.lower().startswith("bearer "):
+                user = self.user_resolver(auth[7:].strip())
+                if user is not None:
+                    return f"uid:{user}"
+            return f"ip:{self._client_ip(scope, headers)}"
+        if source == "path":
+            return match.groupdict().get(name)
+        if source == "query":
+            values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+            return values[0] if values else None
+        if source == "body":
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            return _body_field(body, content_type, name)
+        return None
+
+    def _rule_key(self, rule: RateLimitRule, match: re.Match, scope, headers: dict, body: Optional[bytes]) -> str:
+        key = self._key(rule, match, scope, headers, body)
+        if key is not None:
+            normalizer = self.key_normalizers.get(rule.key)
+            key = normalizer(key) if normalizer else key
+        return key or f"ip:{self._client_ip(scope, headers)}"
+
+    async def _check(self, checks: list[tuple]) -> tuple[bool, float]:
+        now = time.time()
+        if self.store.blocking:
+            return await run_in_threadpool(self.store.check, checks, now)
+        return self.store.check(checks, now)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        matched = [
+            (rule, match)
+            for rule in self.rules
+            if (match := rule.match(scope["method"], scope["path"])) is not None
+        ]
+        if not matched:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        body = None
+        if any(rule.needs_body for rule, _ in matched):
+            body, receive = await self._buffer_body(receive, headers)
+            if body is _TOO_LARGE:
+                return await self._reject_too_large(send)
+
+        checks = []
+        for rule, match in matched:
+            bucket = f"{rule.name}:{self._rule_key(rule, match, scope, headers, body)}"
+            if rule.algorithm == TOKEN_BUCKET:
+                checks.append((TOKEN_BUCKET, bucket, rule.rate, rule.burst))
+            else:
+                checks.append((SLIDING_WINDOW, bucket, rule.limit, rule.window))
+
+        # Only consumed from if every matching rule allows the request
+        allowed, retry_after = await self._check(checks)
+        if not allowed:
+            self.rejected += 1
+            return await self._reject(send, retry_after)
+
+        return await self.app(scope, receive, send)
+
+    async def _buffer_body(self, receive, headers: dict):
+        """
+        Read the request body and return it together with a receive callable
+        that replays it to the application. Returns _TOO_LARGE once the body
+        (declared or streamed without a Content-Length) exceeds
+        MAX_BODY_FOR_KEYS.
+        """
+        length = headers.get(b"content-length")
+        if length is not None and (not length.isdigit() or int(length) > MAX_BODY_FOR_KEYS):
+            return _TOO_LARGE, receive
+
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away; nothing to limit
+                return None, receive
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_FOR_KEYS:
+                return _TOO_LARGE, receive
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return body, replay
+
+    @staticmethod
+    async def _reject_too_large(send) -> None:
+        payload = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    @staticmethod
+    async def _reject(send, retry_after: float) -> None:
+        payload = b'{"detail":"Too many requests"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Depends, HTTPException  # type: ignore
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+
+# -------------------------------------
+# STATELESS JWT VERIFICATION
+# -------------------------------------
+# Self-contained so any service can verify User-service tokens locally (the
+# Product service keeps a copy of this module). Tokens are signed with the
+# active key and carry its id in the `kid` header; verification picks the
+# key by `kid`, so a new key can be added, made active, and the old one
+# removed once its tokens have expired. Tokens without a `kid` (issued
+# before key rotation was introduced) are checked against LEGACY_KID.
+
+LEGACY_KID = "default"
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        keys: Dict[str, str],
+        algorithm: str,
+        active_kid: Optional[str] = None,
+        cache_size: int = 10_000,
+    ):
+        if not keys:
+            raise ValueError("At least one JWT key is required")
+        self.keys = dict(keys)
+        self.algorithm = algorithm
+        self.active_kid = active_kid or next(iter(self.keys))
+        if self.active_kid not in self.keys:
+            raise ValueError(f"Active JWT key '{self.active_kid}' is not configured")
+        self.cache_size = cache_size
+        # sha256(token) -> (exp, payload); only successfully verified tokens
+        self._cache: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def sign(self, claims: Dict[str, Any]) -> str:
+        return jwt.encode(
+            claims,
+            self.keys[self.active_kid],
+            algorithm=self.algorithm,
+            headers={"kid": self.active_kid},
+        )
+
+    def _cached(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            exp, payload = entry
+            if exp <= time.time():
+                del self._cache[digest]
+                self.misses += 1
+                return None
+            self._cache.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def _store(self, digest: str, exp: float, payload: Dict[str, Any]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[digest] = (exp, payload)
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the token payload, or None if the signature, key or expiry is
+        invalid. Callers must not mutate the returned dict (it is shared
+        with the cache).
+        """
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        payload = self._cached(digest)
+        if payload is not None:
+            return payload
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid") or LEGACY_KID
+            secret = self.keys.get(kid)
+            if secret is None:
+                return None
+            payload = jwt.decode(token, secret, algorithms=[self.algorithm])
+        except JWTError:
+            return None
+
+        exp = payload.get("exp")
+        # Tokens without an expiry are valid but never cached
+        if isinstance(exp, (int, float)):
+            self._store(digest, float(exp), payload)
+        return payload
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "active_kid": self.active_kid,
+            "kids": sorted(self.keys),
+            "cached_tokens": len(self._cache),
+            "cache_size": self.cache_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+def bearer_dependency(verifier: TokenVerifier, token_type: str = "access", required: bool = True) -> Callable:
+    """
+    Build a FastAPI dependency returning the verified payload of the
+    ``Authorization: Bearer`` token. With ``required=False`` a missing
+    header yields None, but a present-and-invalid token is still rejected.
+    """
+
+    def dependency(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)):
+        if credentials is None:
+            if required:
+                raise HTTPException(
+                    status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"}
+                )
+            return None
+        payload = verifier.verify(credentials.credentials)
+        if payload is None or payload.get("type") != token_type:
+            raise HTTPException(
+                status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"}
+            )
+        return payload
+
+    return dependency
@@ -0,0 +1,26 @@
+import pytest
+
+from Shared.Compression import negotiate_encoding
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("accept_encoding, available, expected", [
+    (None, BOTH, None),
+    ("", BOTH, None),
+    ("identity", BOTH, None),
+    ("gzip", BOTH, "gzip"),
+    ("GZIP", BOTH, "gzip"),
+    ("gzip, deflate, br", BOTH, "br"),
+    ("gzip, br", ("gzip",), "gzip"),
+    ("br;q=0.5, gzip", BOTH, "gzip"),
+    ("br; q=0.9, gzip;q=0.8", BOTH, "br"),
+    ("gzip;q=0", BOTH, None),
+    ("gzip;q=abc", BOTH, None),
+    ("*", BOTH, "br"),
+    ("*", ("gzip",), "gzip"),
+    ("*;q=0.1, br;q=0", BOTH, "gzip"),
+    ("deflate", BOTH, None),
+])
+def test_negotiate_encoding(accept_encoding, available, expected):
+    assert negotiate_encoding(accept_encoding, available) == expected
@@ -0,0 +1,227 @@
+import itertools
+import time
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from Shared.Jobs import DONE, FAILED, JobOutboxMixin, JobQueue, PermanentJobError, idempotency_index
+
+Base = declarative_base()
+
+
+class OutboxJob(JobOutboxMixin, Base):
+    __tablename__ = "test_job_outbox"
+    __table_args__ = (idempotency_index("ux_test_job_outbox_idempotency_key_active"),)
+
+
+_names = itertools.count()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queue():
+    # Metrics are labelled by queue name, so every test gets a fresh one
+    q = JobQueue(f"test-{next(_names)}", workers=2, backoff_seconds=0.01, backoff_max_seconds=0.05)
+    yield q
+    q.shutdown(timeout=1)
+
+
+@pytest.fixture
+def durable_queue():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    q = JobQueue(
+        f"test-{next(_names)}", workers=2, backoff_seconds=0.01, backoff_max_seconds=0.05,
+        session_factory=sessionmaker(bind=engine), outbox_model=OutboxJob, poll_interval=0.02,
+    )
+    yield q
+    q.shutdown(timeout=1)
+    engine.dispose()
+
+
+def _outbox_row(q: JobQueue, row_id: int):
+    with q.session_factory() as session:
+        return session.scalar(select(OutboxJob).where(OutboxJob.id == row_id))
+
+
+# -------------------------------------------------------
+# Backoff
+# -------------------------------------------------------
+
+def test_backoff_doubles_with_jitter(monkeypatch):
+    q = JobQueue("backoff", backoff_seconds=2.0, backoff_max_seconds=300.0)
+    monkeypatch.setattr("Shared.Jobs.random.random", lambda: 1.0)
+    assert [q._backoff(n) for n in (1, 2, 3)] == [2.0, 4.0, 8.0]
+    monkeypatch.setattr("Shared.Jobs.random.random", lambda: 0.0)
+    # Jitter takes off up to half of the delay
+    assert q._backoff(3) == 4.0
+
+
+def test_backoff_is_capped(monkeypatch):
+    q = JobQueue("backoff-cap", backoff_seconds=2.0, backoff_max_seconds=10.0)
+    monkeypatch.setattr("Shared.Jobs.random.random", lambda: 1.0)
+    assert q._backoff(20) == 10.0
+
+
+# -------------------------------------------------------
+# In-memory jobs
+# -------------------------------------------------------
+
+def test_failed_job_is_retried_until_it_succeeds(queue):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 3:
+            raise RuntimeError("boom")
+
+    queue.register("flaky", flaky)
+    queue.enqueue("flaky", {"n": 1})
+    _wait_for(lambda: queue.stats()["types"]["flaky"]["succeeded"] == 1)
+    assert calls == [{"n": 1}] * 3
+    assert queue.stats()["types"]["flaky"]["retried"] == 2
+    assert queue.recent_failures()["memory"] == []
+
+
+def test_job_fails_after_max_attempts(queue):
+    calls = []
+    queue.register("broken", lambda payload: calls.append(1) or 1 / 0, max_attempts=3)
+    queue.enqueue("broken")
+    _wait_for(lambda: queue.recent_failures()["memory"])
+    failure = queue.recent_failures()["memory"][0]
+    assert len(calls) == 3
+    assert failure["attempts"] == 3
+    assert failure["error"].startswith("ZeroDivisionError")
+
+
+def test_permanent_error_is_not_retried(queue):
+    calls = []
+
+    def reject(payload):
+        calls.append(1)
+        raise PermanentJobError("bad payload")
+
+    queue.register("reject", reject)
+    queue.enqueue("reject")
+    _wait_for(lambda: queue.recent_failures()["memory"])
+    assert len(calls) == 1
+    assert queue.stats()["types"]["reject"]["retried"] == 0
+
+
+def test_idempotency_key_deduplicates(queue):
+    queue.register("noop", lambda payload: None)
+    first = queue.enqueue("noop", idempotency_key="same", delay=60)
+    assert queue.enqueue("noop", idempotency_key="same") == first
+    assert queue.enqueue("noop", idempotency_key="other", delay=60) != first
+    assert queue.stats()["types"]["noop"]["duplicates"] == 1
+
+
+def test_unknown_job_type_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue("missing")
+
+
+# -------------------------------------------------------
+# Outbox jobs
+# -------------------------------------------------------
+
+def test_outbox_job_is_retried_with_backoff(durable_queue):
+    calls = []
+
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) < 2:
+            raise RuntimeError("boom")
+
+    durable_queue.register("flaky", flaky)
+    row_id = durable_queue.enqueue_durable("flaky", {"n": 1})
+    _wait_for(lambda: _outbox_row(durable_queue, row_id).status == DONE)
+    row = _outbox_row(durable_queue, row_id)
+    assert calls == [{"n": 1}] * 2
+    assert row.attempts == 2
+    assert row.locked_until is None
+
+
+def test_failed_outbox_job_can_be_retried(durable_queue):
+    calls = []
+
+    def fail_once(payload):
+        calls.append(1)
+        if len(calls) == 1:
+            raise PermanentJobError("not yet")
+
+    durable_queue.register("fail_once", fail_once)
+    row_id = durable_queue.enqueue_durable("fail_once")
+    _wait_for(lambda: _outbox_row(durable_queue, row_id).status == FAILED)
+    assert _outbox_row(durable_queue, row_id).last_error == "PermanentJobError: not yet"
+
+    assert durable_queue.retry_failed(row_id)
+    _wait_for(lambda: _outbox_row(durable_queue, row_id).status == DONE)
+    assert _outbox_row(durable_queue, row_id).attempts == 1
+    assert not durable_queue.retry_failed(row_id)
+
+
+def test_outbox_idempotency_key_deduplicates(durable_queue):
+    durable_queue.register("noop", lambda payload: None)
+    first = durable_queue.enqueue_durable("noop", idempotency_key="same", delay=60)
+    assert durable_queue.enqueue_durable("noop", idempotency_key="same") == first
+
+
+def test_lease_is_renewed_while_job_runs(durable_queue):
+    durable_queue.lease_seconds = 0.3
+    calls = []
+    durable_queue.register("slow", lambda payload: (calls.append(1), time.sleep(1.0)))
+    row_id = durable_queue.enqueue_durable("slow")
+    _wait_for(lambda: _outbox_row(durable_queue, row_id).status == DONE)
+    # Without renewal the expired lease would let the row be claimed again
+    assert len(calls) == 1
+
+
+def test_concurrent_enqueue_of_the_same_key_inserts_one_row(durable_queue, monkeypatch):
+    durable_queue.register("noop", lambda payload: None)
+    first = durable_queue.enqueue_durable("noop", idempotency_key="race", delay=60)
+    # The second enqueue misses the first row in its check, as a concurrent
+    # one would; the unique index still turns it into a duplicate
+    real = durable_queue._existing_row
+    checks = iter([None])
+    monkeypatch.setattr(durable_queue, "_existing_row", lambda session, key: next(checks, None) or real(session, key))
+    assert durable_queue.enqueue_durable("noop", idempotency_key="race") == first
+    with durable_queue.session_factory() as session:
+        assert len(session.scalars(select(OutboxJob).where(OutboxJob.idempotency_key == "race")).all()) == 1
+
+
+def test_rolled_back_enqueue_does_not_wake_a_later_commit(durable_queue, monkeypatch):
+    durable_queue.register("noop", lambda payload: None)
+    wakeups = []
+    monkeypatch.setattr(durable_queue, "_wake_dispatcher", lambda: wakeups.append(1))
+    with durable_queue.session_factory() as session:
+        durable_queue.enqueue_durable("noop", delay=60, db=session)
+        durable_queue.enqueue_durable("noop", delay=60, db=session)
+        session.rollback()
+        session.commit()
+        assert wakeups == []
+        # Listeners are added once per session, not once per enqueue
+        assert len(session.dispatch.after_commit) == 1
+
+        durable_queue.enqueue_durable("noop", delay=60, db=session)
+        session.commit()
+        assert wakeups == [1]
+
+
+def test_retrying_a_job_queued_again_is_refused(durable_queue):
+    durable_queue.register("fail", lambda payload: (_ for _ in ()).throw(PermanentJobError("no")))
+    failed = durable_queue.enqueue_durable("fail", idempotency_key="again")
+    _wait_for(lambda: _outbox_row(durable_queue, failed).status == FAILED)
+    durable_queue.register("fail", lambda payload: None)
+    queued = durable_queue.enqueue_durable("fail", idempotency_key="again", delay=60)
+    assert queued != failed
+    assert not durable_queue.retry_failed(failed)
@@ -0,0 +1,148 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from Shared.RateLimit import (
+    MAX_BODY_FOR_KEYS,
+    RateLimitMiddleware,
+    RedisRateLimitStore,
+    SLIDING_WINDOW,
+    ShardedMemoryRateLimitStore,
+    TOKEN_BUCKET,
+    build_rules,
+)
+
+
+def _redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it to run Lua scripts
+    return RedisRateLimitStore(fakeredis.FakeStrictRedis())
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    if request.param == "redis":
+        return _redis_store()
+    return ShardedMemoryRateLimitStore(shards=4)
+
+
+# -------------------------------------------------------
+# Stores
+# -------------------------------------------------------
+
+def test_token_bucket_allows_burst_then_refills(store):
+    assert [store.token_bucket("k", 1.0, 3, 100.0)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = store.token_bucket("k", 1.0, 3, 100.0)
+    assert not allowed
+    assert retry_after == pytest.approx(1.0)
+    assert store.token_bucket("k", 1.0, 3, 101.0)[0]
+
+
+def test_token_bucket_keys_are_independent(store):
+    for _ in range(2):
+        store.token_bucket("a", 1.0, 2, 100.0)
+    assert not store.token_bucket("a", 1.0, 2, 100.0)[0]
+    assert store.token_bucket("b", 1.0, 2, 100.0)[0]
+
+
+def test_sliding_window_limit_and_retry_after(store):
+    assert store.sliding_window("k", 2, 10.0, 102.0) == (True, 0.0)
+    assert store.sliding_window("k", 2, 10.0, 103.0) == (True, 0.0)
+    allowed, retry_after = store.sliding_window("k", 2, 10.0, 104.0)
+    assert not allowed
+    assert retry_after == pytest.approx(6.0)
+
+
+def test_sliding_window_weights_previous_window(store):
+    store.sliding_window("k", 2, 10.0, 100.0)
+    store.sliding_window("k", 2, 10.0, 101.0)
+    # Start of the next window: the full previous count still applies
+    assert not store.sliding_window("k", 2, 10.0, 110.0)[0]
+    # Half way through it only half of the previous count does
+    assert store.sliding_window("k", 2, 10.0, 115.0)[0]
+
+
+def test_rejected_check_consumes_from_no_bucket(store):
+    checks = [(TOKEN_BUCKET, "ip", 0.001, 5), (SLIDING_WINDOW, "identifier", 1, 10.0)]
+    assert store.check(checks, 100.0) == (True, 0.0)
+    for _ in range(3):
+        allowed, retry_after = store.check(checks, 101.0)
+        assert not allowed
+        assert retry_after == pytest.approx(9.0)
+    # The IP bucket only paid for the one allowed request
+    for _ in range(4):
+        assert store.token_bucket("ip", 0.001, 5, 101.0)[0]
+    assert not store.token_bucket("ip", 0.001, 5, 101.0)[0]
+
+
+def test_memory_store_evicts_least_recently_used_key():
+    store = ShardedMemoryRateLimitStore(shards=1, max_keys_per_shard=1)
+    store.token_bucket("a", 1.0, 1, 100.0)
+    assert not store.token_bucket("a", 1.0, 1, 100.0)[0]
+    store.token_bucket("b", 1.0, 1, 100.0)
+    # "a" was evicted, so its limit starts over
+    assert store.token_bucket("a", 1.0, 1, 100.0)[0]
+
+
+# -------------------------------------------------------
+# Middleware
+# -------------------------------------------------------
+
+def _client(*rules: dict, key_normalizers=None) -> TestClient:
+    async def login(request):
+        await request.body()
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/login", login, methods=["POST"])])
+    rules = build_rules([
+        {"Name": f"test-{n}", "Method": "POST", "Path": "/login", **rule} for n, rule in enumerate(rules)
+    ])
+    return TestClient(RateLimitMiddleware(
+        app, rules=rules, store=ShardedMemoryRateLimitStore(), key_normalizers=key_normalizers,
+    ))
+
+
+IDENTIFIER_RULE = {"Key": "body:identifier", "Algorithm": "sliding_window", "Limit": 2, "WindowSeconds": 600}
+
+
+def test_body_key_uses_normalizer():
+    client = _client(IDENTIFIER_RULE, key_normalizers={"body:identifier": lambda value: value.replace("-", "")})
+    codes = [client.post("/login", json={"identifier": v}).status_code for v in ("a-b", "ab", "a--b")]
+    assert codes == [200, 200, 429]
+
+
+def test_body_key_reads_bodies_without_content_length():
+    client = _client(IDENTIFIER_RULE)
+
+    def chunks():
+        yield b'{"identifier":'
+        yield b'"someone"}'
+
+    codes = [
+        client.post("/login", content=chunks(), headers={"content-type": "application/json"}).status_code
+        for _ in range(3)
+    ]
+    assert codes == [200, 200, 429]
+
+
+def test_oversized_body_is_rejected():
+    client = _client(IDENTIFIER_RULE)
+    body = b'{"identifier":"x","pad":"' + b"x" * MAX_BODY_FOR_KEYS + b'"}'
+    assert client.post("/login", content=body, headers={"content-type": "application/json"}).status_code == 413
+
+
+def test_missing_body_key_falls_back_to_client_ip():
+    client = _client(IDENTIFIER_RULE)
+    codes = [client.post("/login", json={"other": str(n)}).status_code for n in range(3)]
+    assert codes == [200, 200, 429]
+
+
+def test_request_rejected_by_one_rule_does_not_count_against_another():
+    ip_rule = {"Key": "ip", "Algorithm": "token_bucket", "Rate": 3, "PerSeconds": 3600}
+    client = _client(ip_rule, IDENTIFIER_RULE)
+    codes = [client.post("/login", json={"identifier": "victim"}).status_code for _ in range(4)]
+    assert codes == [200, 200, 429, 429]
+    # Only the two allowed attempts used up the IP's budget
+    assert client.post("/login", json={"identifier": "someone-else"}).status_code == 200
@@ -0,0 +1,166 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from Db.AsyncDatabase import AsyncSessionLocal
+from Models.Models import (
+    UserRegister,
+    UserLogin,
+    TokenRefresh,
+    IdentifierAvailability,
+    OtpRequest,
+    UserResponse,
+    AddressCreate,
+    AddressResponse,
+    AddressBatch,
+    AddressBatchResult,
+)
+from UserService.UserServiceAsync import (
+    register_customer,
+    check_identifiers,
+    login_user,
+    add_address,
+    get_user_addresses,
+    get_single_address,
+    edit_address,
+    remove_address,
+    apply_address_batch,
+    get_addresses_grouped,
+    get_user_profile,
+    get_user_profiles,
+)
+from UserService.UserService import refresh_tokens, send_otp
+from Utils.Auth import check_user_access, get_current_user
+
+# Same endpoints as user_routes, served by async handlers on an AsyncSession.
+# Selected in main.py when Database.Mode is "async".
+router = APIRouter()
+
+# Dependency to get an async DB session
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# -------------------------------------------------------
+# Registration endpoint (Customer only)
+# -------------------------------------------------------
+@router.post("/register", response_model=UserResponse)
+async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
+    return await register_customer(db, user)
+
+
+# -------------------------------------------------------
+# Send an OTP for registration or login
+# -------------------------------------------------------
+@router.post("/otp/send")
+async def otp_send(request: OtpRequest):
+    return send_otp(request)
+
+
+# -------------------------------------------------------
+# Which of these identifiers are already taken
+# -------------------------------------------------------
+@router.post("/identifiers/check")
+async def identifiers_check(data: IdentifierAvailability, db: AsyncSession = Depends(get_db)):
+    return await check_identifiers(db, data)
+
+
+# -------------------------------------------------------
+# Login endpoint (any role)
+# -------------------------------------------------------
+@router.post("/login")
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_db)):
+    return await login_user(db, login_data)
+
+
+# -------------------------------------------------------
+# Token refresh endpoint
+# -------------------------------------------------------
+@router.post("/token/refresh")
+async def refresh(data: TokenRefresh):
+    return refresh_tokens(data.refresh_token)
+
+
+# -------------------------------------------------------
+# USER LOOKUP ENDPOINTS
+# -------------------------------------------------------
+# include=addresses eager-loads addresses with one extra query for all
+# requested users; include=none skips them entirely. These return contact
+# details, so they need a bearer token for the user(s) or an admin token.
+
+@router.get("/users", response_model=list[UserResponse])
+async def list_users(
+    ids: list[int] = Query(..., max_length=100),
+    include: str = Query("none", pattern="^(none|addresses)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, ids)
+    return await get_user_profiles(db, ids, include)
+
+
+@router.get("/users/{user_id}", response_model=UserResponse)
+async def read_user(
+    user_id: int,
+    include: str = Query("none", pattern="^(none|addresses)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, [user_id])
+    return await get_user_profile(db, user_id, include)
+
+
+# -------------------------------------------------------
+# ADDRESS CRUD ENDPOINTS
+# -------------------------------------------------------
+
+# Add new address for a user
+@router.post("/users/{user_id}/addresses", response_model=AddressResponse)
+async def create_address(user_id: int, address: AddressCreate, db: AsyncSession = Depends(get_db)):
+    return await add_address(db, user_id, address)
+
+
+# Get all addresses for a user
+@router.get("/users/{user_id}/addresses", response_model=list[AddressResponse])
+async def list_addresses(user_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_user_addresses(db, user_id)
+
+
+# Apply many address creates/updates/deletes for a user in one transaction
+@router.post("/users/{user_id}/addresses/batch", response_model=AddressBatchResult)
+async def batch_addresses(
+    user_id: int,
+    batch: AddressBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, [user_id])
+    return await apply_address_batch(db, user_id, batch)
+
+
+# Get addresses of many users, grouped by user_id
+@router.get("/addresses", response_model=dict[int, list[AddressResponse]])
+async def list_addresses_for_users(
+    user_ids: list[int] = Query(..., max_length=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, user_ids)
+    return await get_addresses_grouped(db, user_ids)
+
+
+# Get single address by ID
+@router.get("/addresses/{address_id}", response_model=AddressResponse)
+async def read_address(address_id: int, db: AsyncSession = Depends(get_db)):
+    return await get_single_address(db, address_id)
+
+
+# Update address by ID
+@router.put("/addresses/{address_id}", response_model=AddressResponse)
+async def update_address(address_id: int, updated_data: dict, db: AsyncSession = Depends(get_db)):
+    return await edit_address(db, address_id, updated_data)
+
+
+# Delete address by ID
+@router.delete("/addresses/{address_id}")
+async def delete_address(address_id: int, db: AsyncSession = Depends(get_db)):
+    return await remove_address(db, address_id)
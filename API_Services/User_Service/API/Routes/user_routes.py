@@ -1,15 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from Db.Database import SessionLocal
-from Models.Models import UserRegister, UserLogin, UserResponse, AddressCreate, AddressResponse
+from Models.Models import (
+    UserRegister,
+    UserLogin,
+    TokenRefresh,
+    IdentifierAvailability,
+    OtpRequest,
+    UserResponse,
+    AddressCreate,
+    AddressResponse,
+    AddressBatch,
+    AddressBatchResult,
+)
+from Utils.Auth import check_user_access, get_current_user
 from UserService.UserService import (
     register_customer,
+    check_identifiers,
     login_user,
+    refresh_tokens,
+    send_otp,
     add_address,
     get_user_addresses,
     get_single_address,
     edit_address,
     remove_address,
+    apply_address_batch,
+    get_addresses_grouped,
+    get_user_profile,
+    get_user_profiles,
 )
 
 router = APIRouter()
@@ -31,6 +50,22 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
     return register_customer(db, user)
 
 
+# -------------------------------------------------------
+# Send an OTP for registration or login
+# -------------------------------------------------------
+@router.post("/otp/send")
+def otp_send(request: OtpRequest):
+    return send_otp(request)
+
+
+# -------------------------------------------------------
+# Which of these identifiers are already taken
+# -------------------------------------------------------
+@router.post("/identifiers/check")
+def identifiers_check(data: IdentifierAvailability, db: Session = Depends(get_db)):
+    return check_identifiers(db, data)
+
+
 # -------------------------------------------------------
 # Login endpoint (any role)
 # -------------------------------------------------------
@@ -39,6 +74,43 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
     return login_user(db, login_data)
 
 
+# -------------------------------------------------------
+# Token refresh endpoint
+# -------------------------------------------------------
+@router.post("/token/refresh")
+def refresh(data: TokenRefresh):
+    return refresh_tokens(data.refresh_token)
+
+
+# -------------------------------------------------------
+# USER LOOKUP ENDPOINTS
+# -------------------------------------------------------
+# include=addresses eager-loads addresses with one extra query for all
+# requested users; include=none skips them entirely. These return contact
+# details, so they need a bearer token for the user(s) or an admin token.
+
+@router.get("/users", response_model=list[UserResponse])
+def list_users(
+    ids: list[int] = Query(..., max_length=100),
+    include: str = Query("none", pattern="^(none|addresses)$"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, ids)
+    return get_user_profiles(db, ids, include)
+
+
+@router.get("/users/{user_id}", response_model=UserResponse)
+def read_user(
+    user_id: int,
+    include: str = Query("none", pattern="^(none|addresses)$"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, [user_id])
+    return get_user_profile(db, user_id, include)
+
+
 # -------------------------------------------------------
 # ADDRESS CRUD ENDPOINTS
 # -------------------------------------------------------
@@ -55,6 +127,29 @@ def list_addresses(user_id: int, db: Session = Depends(get_db)):
     return get_user_addresses(db, user_id)
 
 
+# Apply many address creates/updates/deletes for a user in one transaction
+@router.post("/users/{user_id}/addresses/batch", response_model=AddressBatchResult)
+def batch_addresses(
+    user_id: int,
+    batch: AddressBatch,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, [user_id])
+    return apply_address_batch(db, user_id, batch)
+
+
+# Get addresses of many users, grouped by user_id
+@router.get("/addresses", response_model=dict[int, list[AddressResponse]])
+def list_addresses_for_users(
+    user_ids: list[int] = Query(..., max_length=100),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    check_user_access(current_user, user_ids)
+    return get_addresses_grouped(db, user_ids)
+
+
 # Get single address by ID
 @router.get("/addresses/{address_id}", response_model=AddressResponse)
 def read_address(address_id: int, db: Session = Depends(get_db)):
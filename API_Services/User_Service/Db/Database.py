@@ -2,11 +2,33 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import DB_CONNECTION_STRING
+from config import (
+    DB_CONNECTION_STRING,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_SLOW_CHECKOUT_MS,
+    DB_STATEMENT_TIMEOUT_MS,
+)
+from Shared.Instrumentation import instrument_engine
+from Shared.PoolTelemetry import PoolTelemetry, engine_options, register_engine
 
-engine = create_engine(
-    DB_CONNECTION_STRING, connect_args={"check_same_thread": False} if "sqlite" in DB_CONNECTION_STRING else {}
+# Database.Pool settings, shared with Db/AsyncDatabase.py
+pool_settings = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
 )
 
+sync_pool_telemetry = PoolTelemetry("sync", slow_checkout_ms=DB_SLOW_CHECKOUT_MS)
+engine = create_engine(DB_CONNECTION_STRING, **engine_options(DB_CONNECTION_STRING, sync_pool_telemetry, **pool_settings))
+register_engine(sync_pool_telemetry, engine)
+instrument_engine(engine, sync_pool_telemetry.name)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()   
\ No newline at end of file
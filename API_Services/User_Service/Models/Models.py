@@ -1,10 +1,11 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, field_validator
+from typing import Optional, List, Literal
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Boolean, Enum as SAEnum, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Boolean, Enum as SAEnum, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from Db.Database import Base
 from .BaseEntity import BaseEntity
+from Shared.Jobs import JobOutboxMixin, idempotency_index
 
 
 # --------------------------
@@ -38,6 +39,44 @@ class AddressResponse(AddressBase):
     model_config = {"from_attributes": True}
 
 
+class AddressUpdate(BaseModel):
+    address_line: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    pincode: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    place_id: Optional[str] = None
+
+    @field_validator("address_line", "city", "state", "pincode")
+    def required_fields_not_null(cls, v):
+        if v is None:
+            raise ValueError("Field cannot be null")
+        return v
+
+
+class AddressBatchUpdate(AddressUpdate):
+    id: int
+
+
+MAX_ADDRESS_BATCH = 500
+
+
+class AddressBatch(BaseModel):
+    """
+    Changes applied to one user's addresses in a single transaction.
+    """
+    create: List[AddressCreate] = Field(default_factory=list, max_length=MAX_ADDRESS_BATCH)
+    update: List[AddressBatchUpdate] = Field(default_factory=list, max_length=MAX_ADDRESS_BATCH)
+    delete: List[int] = Field(default_factory=list, max_length=MAX_ADDRESS_BATCH)
+
+
+class AddressBatchResult(BaseModel):
+    created: List[AddressResponse]
+    updated: List[AddressResponse]
+    deleted: int
+
+
 # --------------------------
 # USER BASE SCHEMA
 # --------------------------
@@ -61,9 +100,9 @@ class UserRegister(BaseModel):
     confirm_password: str
     captcha: str = Field(..., description="Captcha token (e.g., reCAPTCHA response)")
 
-    # OTP fields
-    email_otp: str = Field(..., min_length=4, max_length=8, description="OTP sent to email")
-    phone_otp: str = Field(..., min_length=4, max_length=8, description="OTP sent to phone number")
+    # OTP fields (checked only when Otp.RequiredForRegistration is on)
+    email_otp: Optional[str] = Field(None, min_length=4, max_length=8, description="OTP sent to email")
+    phone_otp: Optional[str] = Field(None, min_length=4, max_length=8, description="OTP sent to phone number")
 
     # Address field (manual + Google Maps)
     address: AddressCreate
@@ -121,6 +160,31 @@ class UserLogin(BaseModel):
     }
 
 
+# --------------------------
+# OTP REQUEST SCHEMA
+# --------------------------
+class OtpRequest(BaseModel):
+    purpose: Literal["register", "login"]
+    channel: Literal["email", "phone"]
+    destination: str = Field(..., min_length=3, max_length=150)
+
+
+# --------------------------
+# TOKEN REFRESH SCHEMA
+# --------------------------
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+
+# --------------------------
+# IDENTIFIER AVAILABILITY SCHEMA
+# --------------------------
+class IdentifierAvailability(BaseModel):
+    email: Optional[str] = None
+    username: Optional[str] = None
+    phone_number: Optional[str] = None
+
+
 # --------------------------
 # USER RESPONSE SCHEMA
 # --------------------------
@@ -128,7 +192,9 @@ class UserResponse(BaseModel):
     id: int
     name: str
     username: str
-    email: EmailStr
+    # Stored emails were validated on registration; re-running the email
+    # validator on every response dominated serialization time
+    email: str = Field(..., json_schema_extra={"format": "email"})
     phone_number: str
     role: UserRole
     is_active: bool
@@ -137,6 +203,12 @@ class UserResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# List responses are validated in one call (from ORM objects) rather than
+# one model_validate per item
+UserListAdapter = TypeAdapter(List[UserResponse])
+AddressListAdapter = TypeAdapter(List[AddressResponse])
+
+
 # --------------------------
 # SQLALCHEMY MODELS
 # --------------------------
@@ -157,13 +229,32 @@ class User(Base, BaseEntity):
     captcha_token = Column(String(500), nullable=True)
     captcha_verified = Column(Boolean, default=False)
 
-    # OTP fields
+    # OTP fields (legacy; codes now live in the TTL store, see Utils/Verification.py)
     email_otp = Column(String(10), nullable=True)
     phone_otp = Column(String(10), nullable=True)
     otp_verified = Column(Boolean, default=False)
 
     # Relationship
-    addresses = relationship("Address", back_populates="user", cascade="all, delete-orphan")
+    addresses = relationship(
+        "Address", back_populates="user", cascade="all, delete-orphan", foreign_keys="Address.user_id"
+    )
+    identifiers = relationship(
+        "UserIdentifier", cascade="all, delete-orphan", foreign_keys="UserIdentifier.user_id"
+    )
+
+
+class UserIdentifier(Base):
+    """
+    Normalized login identifiers (see Utils/Identifiers.py). The primary key
+    is the lookup key, so login and "is this taken" checks are single index
+    seeks instead of an OR across three unique indexes.
+    """
+    __tablename__ = "user_identifiers"
+    __table_args__ = {"schema": "admin"}
+
+    kind = Column(String(16), primary_key=True)
+    value = Column(String(150), primary_key=True)
+    user_id = Column(Integer, ForeignKey("admin.users.id", ondelete="CASCADE"), nullable=False, index=True)
 
 
 class Address(Base, BaseEntity):
@@ -183,4 +274,18 @@ class Address(Base, BaseEntity):
     place_id = Column(String(200), nullable=True)  # Google Maps Place ID
 
     # Relationship
-    user = relationship("User", back_populates="addresses")
+    user = relationship("User", back_populates="addresses", foreign_keys=[user_id])
+
+
+class UserJob(Base, JobOutboxMixin):
+    """
+    Outbox of durable background jobs (see Shared/Jobs.py).
+    """
+    __tablename__ = "user_jobs"
+    __table_args__ = (
+        # The dispatcher polls for due rows by status and run_at
+        Index("ix_admin_user_jobs_status_run_at", "status", "run_at"),
+        # One pending/running row per idempotency key
+        idempotency_index("ux_admin_user_jobs_idempotency_key_active"),
+        {"schema": "admin"},
+    )
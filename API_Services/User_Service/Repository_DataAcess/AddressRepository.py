@@ -1,4 +1,5 @@
-from typing import Optional, List
+from typing import Dict, Iterable, Optional, List
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from Models.Models import Address, User
 
@@ -28,6 +29,31 @@ def get_addresses_by_user(db: Session, user_id: int) -> List[Address]:
     return db.query(Address).filter(Address.user_id == user_id).all()
 
 
+def get_addresses_for_users(db: Session, user_ids: Iterable[int]) -> Dict[int, List[Address]]:
+    """
+    Addresses of many users in one query, grouped by user_id. Every
+    requested user gets a key, even if it has no addresses.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    grouped: Dict[int, List[Address]] = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return grouped
+    rows = db.query(Address).filter(Address.user_id.in_(user_ids)).order_by(Address.user_id, Address.id)
+    for address in rows:
+        grouped[address.user_id].append(address)
+    return grouped
+
+
+def get_address_ids_for_user(db: Session, user_id: int, address_ids: Iterable[int]) -> set:
+    """
+    Which of ``address_ids`` belong to ``user_id``.
+    """
+    rows = db.execute(
+        select(Address.id).where(Address.user_id == user_id, Address.id.in_(list(address_ids)))
+    )
+    return {address_id for (address_id,) in rows}
+
+
 # -------------------------------------------------------
 # UPDATE ADDRESS
 # -------------------------------------------------------
@@ -56,3 +82,56 @@ def delete_address(db: Session, address_id: int) -> bool:
     db.delete(address)
     db.commit()
     return True
+
+
+# -------------------------------------------------------
+# BULK CREATE / UPDATE / DELETE (single transaction)
+# -------------------------------------------------------
+def bulk_apply_addresses(
+    db: Session,
+    user_id: int,
+    create_rows: List[dict],
+    update_rows: List[dict],
+    delete_ids: List[int],
+) -> tuple[List[Address], List[Address], int]:
+    """
+    Apply a batch of address changes for one user and commit once.
+    Inserts go out as one executemany (with RETURNING), updates as one
+    executemany keyed by primary key, deletes as one DELETE ... IN.
+    The caller must have checked that update/delete ids belong to the user.
+    Returns ``(created, updated, deleted_count)``.
+    """
+    try:
+        created_ids: List[int] = []
+        if create_rows:
+            rows = [dict(row, user_id=user_id) for row in create_rows]
+            created_ids = list(db.scalars(insert(Address).returning(Address.id), rows))
+
+        if update_rows:
+            db.execute(update(Address), update_rows)
+
+        deleted = 0
+        if delete_ids:
+            deleted = db.execute(
+                delete(Address).where(Address.user_id == user_id, Address.id.in_(delete_ids)),
+                execution_options={"synchronize_session": False},
+            ).rowcount
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # Read back everything that was written in one query
+    updated_ids = [row["id"] for row in update_rows]
+    written = {}
+    if created_ids or updated_ids:
+        written = {
+            address.id: address
+            for address in db.scalars(select(Address).where(Address.id.in_(created_ids + updated_ids)))
+        }
+    return (
+        [written[i] for i in created_ids],
+        [written[i] for i in sorted(updated_ids)],
+        deleted,
+    )
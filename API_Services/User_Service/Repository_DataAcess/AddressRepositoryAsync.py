@@ -0,0 +1,47 @@
+from typing import Dict, Iterable, Optional, List
+from sqlalchemy.ext.asyncio import AsyncSession
+from Models.Models import Address, User
+from Repository_DataAcess import AddressRepository
+
+# -------------------------------------------------------
+# ASYNC ADDRESS REPOSITORY
+# -------------------------------------------------------
+# Thin wrappers that run the AddressRepository queries through
+# AsyncSession.run_sync, so both stacks share one set of queries.
+
+async def create_address(db: AsyncSession, user: User, address: Address) -> Address:
+    return await db.run_sync(AddressRepository.create_address, user, address)
+
+
+async def get_address_by_id(db: AsyncSession, address_id: int) -> Optional[Address]:
+    return await db.run_sync(AddressRepository.get_address_by_id, address_id)
+
+
+async def get_addresses_by_user(db: AsyncSession, user_id: int) -> List[Address]:
+    return await db.run_sync(AddressRepository.get_addresses_by_user, user_id)
+
+
+async def update_address(db: AsyncSession, address_id: int, updated_data: dict) -> Optional[Address]:
+    return await db.run_sync(AddressRepository.update_address, address_id, updated_data)
+
+
+async def delete_address(db: AsyncSession, address_id: int) -> bool:
+    return await db.run_sync(AddressRepository.delete_address, address_id)
+
+
+async def get_addresses_for_users(db: AsyncSession, user_ids: Iterable[int]) -> Dict[int, List[Address]]:
+    return await db.run_sync(AddressRepository.get_addresses_for_users, user_ids)
+
+
+async def get_address_ids_for_user(db: AsyncSession, user_id: int, address_ids: Iterable[int]) -> set:
+    return await db.run_sync(AddressRepository.get_address_ids_for_user, user_id, address_ids)
+
+
+async def bulk_apply_addresses(
+    db: AsyncSession,
+    user_id: int,
+    create_rows: List[dict],
+    update_rows: List[dict],
+    delete_ids: List[int],
+) -> tuple[List[Address], List[Address], int]:
+    return await db.run_sync(AddressRepository.bulk_apply_addresses, user_id, create_rows, update_rows, delete_ids)
@@ -1,6 +1,13 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
-from Models.Models import User, Address
+from typing import Optional, List, Set
+from sqlalchemy import case, tuple_
+from sqlalchemy.orm import Session, noload, selectinload
+from Models.Models import User, Address, UserIdentifier
+from Utils.Identifiers import EMAIL, PHONE, USERNAME, login_candidates, user_identifiers
+
+# An identifier can match different users under different kinds (one
+# user's username is another's phone number); the match is resolved in
+# this order rather than by whichever row the database returns first.
+KIND_PRECEDENCE = case({EMAIL: 0, USERNAME: 1, PHONE: 2}, value=UserIdentifier.kind)
 
 
 # -------------------------------------------------------
@@ -8,15 +15,17 @@ from Models.Models import User, Address
 # -------------------------------------------------------
 def get_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
     """
-    Find user using email OR username OR phone number.
+    Find user using email OR username OR phone number: one query, resolved
+    through primary-key seeks on admin.user_identifiers.
     """
+    candidates = login_candidates(identifier)
+    if not candidates:
+        return None
     return (
         db.query(User)
-        .filter(
-            (User.email == identifier)
-            | (User.username == identifier)
-            | (User.phone_number == identifier)
-        )
+        .join(UserIdentifier, UserIdentifier.user_id == User.id)
+        .filter(tuple_(UserIdentifier.kind, UserIdentifier.value).in_(candidates))
+        .order_by(KIND_PRECEDENCE)
         .first()
     )
 
@@ -24,6 +33,23 @@ def get_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
 # -------------------------------------------------------
 # INDIVIDUAL LOOKUPS
 # -------------------------------------------------------
+# Loader strategies selectable per endpoint. "none" never touches the
+# addresses table (the collection reads as empty); "addresses" loads all
+# of them with one extra SELECT ... IN for however many users are fetched.
+USER_LOADERS = {
+    "none": [noload(User.addresses)],
+    "addresses": [selectinload(User.addresses)],
+}
+
+
+def get_user_by_id(db: Session, user_id: int, include: str = "none") -> Optional[User]:
+    return db.query(User).options(*USER_LOADERS[include]).filter(User.id == user_id).first()
+
+
+def get_users_by_ids(db: Session, user_ids: List[int], include: str = "none") -> List[User]:
+    return db.query(User).options(*USER_LOADERS[include]).filter(User.id.in_(user_ids)).order_by(User.id).all()
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
@@ -43,6 +69,10 @@ def create_user(db: Session, user: User, addresses: Optional[List[Address]] = No
     """
     Save a new user to the database, with optional addresses.
     """
+    user.identifiers = [
+        UserIdentifier(kind=kind, value=value)
+        for kind, value in user_identifiers(user.email, user.username, user.phone_number)
+    ]
     db.add(user)
     if addresses:
         for addr in addresses:
@@ -56,20 +86,29 @@ def create_user(db: Session, user: User, addresses: Optional[List[Address]] = No
 # -------------------------------------------------------
 # CHECK USER EXISTS (EMAIL | USERNAME | PHONE)
 # -------------------------------------------------------
+def taken_identifiers(
+    db: Session,
+    email: Optional[str] = None,
+    username: Optional[str] = None,
+    phone_number: Optional[str] = None,
+) -> Set[str]:
+    """
+    Return which of the given identifiers already belong to a user, as a set
+    of kinds ("email", "username", "phone"). Reads only the primary-key
+    index of admin.user_identifiers, in a single query.
+    """
+    pairs = user_identifiers(email, username, phone_number)
+    if not pairs:
+        return set()
+    rows = db.query(UserIdentifier.kind).filter(tuple_(UserIdentifier.kind, UserIdentifier.value).in_(pairs))
+    return {kind for (kind,) in rows}
+
+
 def user_exists(db: Session, email: str, username: str, phone_number: str) -> bool:
     """
     Check if a user already exists by email, username, or phone.
     """
-    return (
-        db.query(User)
-        .filter(
-            (User.email == email)
-            | (User.username == username)
-            | (User.phone_number == phone_number)
-        )
-        .first()
-        is not None
-    )
+    return bool(taken_identifiers(db, email, username, phone_number))
 
 
 # -------------------------------------------------------
@@ -99,6 +138,17 @@ def update_otp_status(db: Session, user: User, email_verified: bool = False, pho
     return user
 
 
+def update_password_hash(db: Session, user: User, password_hash: str) -> User:
+    """
+    Replace a user's stored password hash (e.g. after a bcrypt cost change).
+    """
+    user.password = password_hash
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+
 # -------------------------------------------------------
 # ADD ADDRESS TO USER
 # -------------------------------------------------------
@@ -0,0 +1,62 @@
+from typing import Optional, List, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from Models.Models import User, Address
+from Repository_DataAcess import UserRepository
+
+# -------------------------------------------------------
+# ASYNC USER REPOSITORY
+# -------------------------------------------------------
+# Thin wrappers that run the UserRepository queries through
+# AsyncSession.run_sync, so both stacks share one set of queries.
+
+async def get_user_by_identifier(db: AsyncSession, identifier: str) -> Optional[User]:
+    return await db.run_sync(UserRepository.get_user_by_identifier, identifier)
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int, include: str = "none") -> Optional[User]:
+    return await db.run_sync(UserRepository.get_user_by_id, user_id, include)
+
+
+async def get_users_by_ids(db: AsyncSession, user_ids: List[int], include: str = "none") -> List[User]:
+    return await db.run_sync(UserRepository.get_users_by_ids, user_ids, include)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    return await db.run_sync(UserRepository.get_user_by_email, email)
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    return await db.run_sync(UserRepository.get_user_by_username, username)
+
+
+async def get_user_by_phone(db: AsyncSession, phone_number: str) -> Optional[User]:
+    return await db.run_sync(UserRepository.get_user_by_phone, phone_number)
+
+
+async def create_user(db: AsyncSession, user: User, addresses: Optional[List[Address]] = None) -> User:
+    return await db.run_sync(UserRepository.create_user, user, addresses)
+
+
+async def user_exists(db: AsyncSession, email: str, username: str, phone_number: str) -> bool:
+    return await db.run_sync(UserRepository.user_exists, email, username, phone_number)
+
+
+async def taken_identifiers(
+    db: AsyncSession,
+    email: Optional[str] = None,
+    username: Optional[str] = None,
+    phone_number: Optional[str] = None,
+) -> Set[str]:
+    return await db.run_sync(UserRepository.taken_identifiers, email, username, phone_number)
+
+
+async def update_captcha_status(db: AsyncSession, user: User, verified: bool) -> User:
+    return await db.run_sync(UserRepository.update_captcha_status, user, verified)
+
+
+async def update_otp_status(db: AsyncSession, user: User, email_verified: bool = False, phone_verified: bool = False) -> User:
+    return await db.run_sync(UserRepository.update_otp_status, user, email_verified, phone_verified)
+
+
+async def update_password_hash(db: AsyncSession, user: User, password_hash: str) -> User:
+    return await db.run_sync(UserRepository.update_password_hash, user, password_hash)
@@ -0,0 +1,34 @@
+from config import (
+    JOBS_BACKOFF_MAX_SECONDS,
+    JOBS_BACKOFF_SECONDS,
+    JOBS_DEDUPE_WINDOW_SECONDS,
+    JOBS_LEASE_SECONDS,
+    JOBS_MAX_ATTEMPTS,
+    JOBS_MAX_QUEUE,
+    JOBS_POLL_INTERVAL_SECONDS,
+    JOBS_RETENTION_HOURS,
+    JOBS_WORKERS,
+)
+from Db.Database import SessionLocal
+from Models.Models import UserJob
+from Shared.Jobs import JobQueue
+
+# -------------------------------------------------------
+# USER SERVICE JOB QUEUE
+# -------------------------------------------------------
+# Handlers are registered next to the code that enqueues them
+# (UserService.py); main.py starts and stops the workers.
+job_queue = JobQueue(
+    "user",
+    workers=JOBS_WORKERS,
+    max_queue=JOBS_MAX_QUEUE,
+    max_attempts=JOBS_MAX_ATTEMPTS,
+    backoff_seconds=JOBS_BACKOFF_SECONDS,
+    backoff_max_seconds=JOBS_BACKOFF_MAX_SECONDS,
+    dedupe_window=JOBS_DEDUPE_WINDOW_SECONDS,
+    session_factory=SessionLocal,
+    outbox_model=UserJob,
+    poll_interval=JOBS_POLL_INTERVAL_SECONDS,
+    lease_seconds=JOBS_LEASE_SECONDS,
+    retention_seconds=JOBS_RETENTION_HOURS * 3600,
+)
@@ -1,61 +1,168 @@
+import logging
+
 from sqlalchemy.orm import Session
 from fastapi import HTTPException  # type: ignore
-from Models.Models import UserRegister, UserLogin, User, UserRole
+from Models.Models import (
+    UserRegister,
+    UserLogin,
+    UserResponse,
+    User,
+    UserRole,
+    Address,
+    AddressCreate,
+    AddressListAdapter,
+    AddressBatch,
+    UserListAdapter,
+    IdentifierAvailability,
+    OtpRequest,
+)
 from Repository_DataAcess.UserRepository import (
     create_user,
+    get_user_by_id,
     get_user_by_identifier,
-    user_exists,
+    get_users_by_ids,
+    taken_identifiers,
+    update_password_hash,
 )
 from Repository_DataAcess.AddressRepository import (
     create_address,
     get_addresses_by_user,
+    get_addresses_for_users,
+    get_address_ids_for_user,
     get_address_by_id,
+    bulk_apply_addresses,
     update_address,
     delete_address,
 )
 from Utils.Auth import (
     create_access_token,
+    create_refresh_token,
+    verify_refresh_token,
     verify_captcha,
-    verify_otp,
     hash_password,
-    verify_password,
+    verify_and_update_password,
 )
+from Utils.Identifiers import EMAIL, PHONE
+from Utils.Verification import can_deliver, deliver_otp, otp_service
+from UserService.UserJobs import job_queue
+from config import OTP_ECHO_CODE_FOR_TESTING, OTP_REQUIRED_FOR_REGISTRATION
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------------
+# BACKGROUND JOBS
+# -------------------------------------------------------
+OTP_DELIVERY_JOB = "otp.deliver"
+REGISTERED_NOTICE_JOB = "user.registered"
+
+
+# In memory only: the code is a secret and must not be written to the outbox.
+# Few attempts, since the code expires anyway
+@job_queue.handler(OTP_DELIVERY_JOB, max_attempts=3)
+def _deliver_otp_job(payload: dict) -> None:
+    deliver_otp(payload["kind"], payload["destination"], payload["code"])
+
+
+@job_queue.handler(REGISTERED_NOTICE_JOB)
+def _registered_notice_job(payload: dict) -> None:
+    """
+    Welcome message for a new customer. No email provider is wired up yet,
+    so it is only logged.
+    """
+    logger.info("Welcome notice for %s <%s>", payload["username"], payload["email"])
 
 
 # -------------------------------------------------------
 # REGISTER CUSTOMER (address = null at registration)
 # -------------------------------------------------------
 def register_customer(db: Session, user_data: UserRegister):
+    validate_registration(db, user_data)
+    return create_customer(db, user_data, hash_password(user_data.password))
+
+
+def validate_registration(db: Session, user_data: UserRegister) -> None:
+    """
+    All checks that must pass before the (expensive) password hash is computed.
+    """
     if user_data.password != user_data.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    if user_exists(db, user_data.email, user_data.username, user_data.phone_number):
-        raise HTTPException(status_code=400, detail="User already exists")
+    taken = taken_identifiers(db, user_data.email, user_data.username, user_data.phone_number)
+    if taken:
+        raise HTTPException(status_code=400, detail=f"User already exists ({', '.join(sorted(taken))} taken)")
 
     if not user_data.captcha or not verify_captcha(user_data.captcha):
         raise HTTPException(status_code=400, detail="Captcha validation failed")
 
-    if not verify_otp(user_data.email_otp, user_data.email_otp) or not verify_otp(
-        user_data.phone_otp, user_data.phone_otp
-    ):
+    # Otp.RequiredForRegistration: off until email and SMS providers exist
+    if OTP_REQUIRED_FOR_REGISTRATION and not otp_service.verify_all("register", [
+        (EMAIL, user_data.email, user_data.email_otp),
+        (PHONE, user_data.phone_number, user_data.phone_otp),
+    ]):
         raise HTTPException(status_code=400, detail="OTP validation failed")
 
+
+def create_customer(db: Session, user_data: UserRegister, password_hash: str) -> UserResponse:
     user = User(
         name=user_data.name,
         username=user_data.username,
         email=user_data.email,
         phone_number=user_data.phone_number,
-        password=hash_password(user_data.password),
+        password=password_hash,
         role=UserRole.CUSTOMER,
         captcha_token=user_data.captcha,
         captcha_verified=True,
-        email_otp=user_data.email_otp,
-        phone_otp=user_data.phone_otp,
-        otp_verified=True,
+        otp_verified=OTP_REQUIRED_FOR_REGISTRATION,
+    )
+
+    # Outbox row in the same transaction as the user: both commit or neither does
+    job_queue.enqueue_durable(
+        REGISTERED_NOTICE_JOB,
+        {"username": user_data.username, "email": user_data.email},
+        idempotency_key=f"{REGISTERED_NOTICE_JOB}:{user_data.username}",
+        db=db,
     )
 
     # At registration → no addresses
-    return create_user(db, user, addresses=None)
+    user = create_user(db, user, addresses=None)
+    # Serialize while the session is still usable (the async stack cannot
+    # lazy-load relationships once the handler returns)
+    return UserResponse.model_validate(user)
+
+
+# -------------------------------------------------------
+# SEND OTP (register: email + phone, login: phone)
+# -------------------------------------------------------
+def send_otp(request: OtpRequest):
+    kind = EMAIL if request.channel == "email" else PHONE
+    if not (can_deliver(kind) or OTP_ECHO_CODE_FOR_TESTING):
+        raise HTTPException(status_code=503, detail=f"OTP delivery by {request.channel} is not configured")
+    code = otp_service.issue(request.purpose, kind, request.destination)
+    job_queue.enqueue(OTP_DELIVERY_JOB, {"kind": kind, "destination": request.destination, "code": code})
+
+    response = {"detail": "OTP sent", "expires_in": otp_service.ttl}
+    if OTP_ECHO_CODE_FOR_TESTING:
+        # Otp.EchoCodeForTesting: lets automated flows complete without a provider
+        response["otp"] = code
+    return response
+
+
+# -------------------------------------------------------
+# IDENTIFIER AVAILABILITY (one query for all fields)
+# -------------------------------------------------------
+IDENTIFIER_FIELDS = {"email": "email", "username": "username", "phone_number": "phone"}
+
+
+def check_identifiers(db: Session, data: IdentifierAvailability):
+    taken = taken_identifiers(db, data.email, data.username, data.phone_number)
+    return {
+        "taken": {
+            field: kind in taken
+            for field, kind in IDENTIFIER_FIELDS.items()
+            if getattr(data, field)
+        }
+    }
 
 
 # -------------------------------------------------------
@@ -66,37 +173,76 @@ def login_user(db: Session, login_data: UserLogin):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if not verify_password(login_data.password, user.password):
+    valid, new_hash = verify_and_update_password(login_data.password, user.password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        update_password_hash(db, user, new_hash)
+
+    return complete_login(user, login_data)
 
+
+def complete_login(user: User, login_data: UserLogin):
+    """
+    Checks and token issuance after the password has been verified.
+    """
     if not login_data.captcha or not verify_captcha(login_data.captcha):
         raise HTTPException(status_code=400, detail="Captcha validation failed")
 
-    if login_data.otp and not verify_otp(login_data.otp, user.phone_otp):
+    if login_data.otp and not otp_service.verify("login", PHONE, user.phone_number, login_data.otp):
         raise HTTPException(status_code=400, detail="OTP validation failed")
 
-    token = create_access_token({"sub": user.email, "role": user.role.value})
+    claims = {"sub": user.email, "role": user.role.value, "uid": user.id}
 
     return {
-        "access_token": token,
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
         "token_type": "bearer",
         "user_id": user.id,
         "role": user.role.value,
     }
 
 
+# -------------------------------------------------------
+# REFRESH ACCESS TOKEN
+# -------------------------------------------------------
+def refresh_tokens(refresh_token: str):
+    """
+    Exchange a valid refresh token for a new access/refresh token pair.
+    Stateless: no database lookup, the claims are carried over.
+    """
+    payload = verify_refresh_token(refresh_token)
+    if not payload:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    claims = {key: payload[key] for key in ("sub", "role", "uid") if key in payload}
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims),
+        "token_type": "bearer",
+    }
+
+
 # -------------------------------------------------------
 # ADDRESS CRUD OPERATIONS
 # -------------------------------------------------------
-def add_address(db: Session, user_id: int, address_data):
-    user = get_user_by_identifier(db, user_id)
+def add_address(db: Session, user_id: int, address_data: AddressCreate):
+    user = get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return create_address(db, user, address_data)
+    return create_address(db, user, Address(**address_data.model_dump()))
 
 
 def get_user_addresses(db: Session, user_id: int):
-    return get_addresses_by_user(db, user_id)
+    return AddressListAdapter.validate_python(get_addresses_by_user(db, user_id), from_attributes=True)
+
+
+def get_addresses_grouped(db: Session, user_ids: list[int]):
+    grouped = get_addresses_for_users(db, user_ids)
+    return {
+        user_id: AddressListAdapter.validate_python(addresses, from_attributes=True)
+        for user_id, addresses in grouped.items()
+    }
 
 
 def get_single_address(db: Session, address_id: int):
@@ -118,3 +264,51 @@ def remove_address(db: Session, address_id: int):
     if not success:
         raise HTTPException(status_code=404, detail="Address not found")
     return {"detail": "Address deleted successfully"}
+
+
+def apply_address_batch(db: Session, user_id: int, batch: AddressBatch):
+    """
+    Validate a batch against the user's addresses, then apply it in one
+    transaction (see AddressRepository.bulk_apply_addresses).
+    """
+    if not get_user_by_id(db, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+
+    update_ids = [item.id for item in batch.update]
+    if len(set(update_ids)) != len(update_ids):
+        raise HTTPException(status_code=400, detail="An address may only be updated once per batch")
+    if set(update_ids) & set(batch.delete):
+        raise HTTPException(status_code=400, detail="An address cannot be both updated and deleted")
+
+    referenced = set(update_ids) | set(batch.delete)
+    if referenced:
+        missing = referenced - get_address_ids_for_user(db, user_id, referenced)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Addresses not found for this user: {sorted(missing)}")
+
+    created, updated, deleted = bulk_apply_addresses(
+        db,
+        user_id,
+        [item.model_dump() for item in batch.create],
+        [item.model_dump(exclude_unset=True) for item in batch.update],
+        list(set(batch.delete)),
+    )
+    return {
+        "created": AddressListAdapter.validate_python(created, from_attributes=True),
+        "updated": AddressListAdapter.validate_python(updated, from_attributes=True),
+        "deleted": deleted,
+    }
+
+
+# -------------------------------------------------------
+# USER LOOKUP (eager loading chosen per endpoint)
+# -------------------------------------------------------
+def get_user_profile(db: Session, user_id: int, include: str = "none"):
+    user = get_user_by_id(db, user_id, include)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserResponse.model_validate(user)
+
+
+def get_user_profiles(db: Session, user_ids: list[int], include: str = "none"):
+    return UserListAdapter.validate_python(get_users_by_ids(db, user_ids, include), from_attributes=True)
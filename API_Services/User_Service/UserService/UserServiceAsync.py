@@ -0,0 +1,80 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException  # type: ignore
+from Models.Models import UserRegister, UserLogin, AddressCreate, AddressBatch, IdentifierAvailability
+from UserService import UserService
+from UserService.UserService import complete_login
+from Repository_DataAcess.UserRepositoryAsync import get_user_by_identifier, update_password_hash
+from Utils.Auth import hash_password_async, verify_and_update_password_async
+
+
+# -------------------------------------------------------
+# ASYNC USER SERVICE
+# -------------------------------------------------------
+# Mirrors UserService for the async stack. Database steps run on the event
+# loop via run_sync; bcrypt runs on the bounded password worker pool and is
+# awaited without holding a threadpool thread.
+
+async def register_customer(db: AsyncSession, user_data: UserRegister):
+    await db.run_sync(UserService.validate_registration, user_data)
+    password_hash = await hash_password_async(user_data.password)
+    return await db.run_sync(UserService.create_customer, user_data, password_hash)
+
+
+async def check_identifiers(db: AsyncSession, data: IdentifierAvailability):
+    return await db.run_sync(UserService.check_identifiers, data)
+
+
+async def login_user(db: AsyncSession, login_data: UserLogin):
+    user = await get_user_by_identifier(db, login_data.identifier)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    valid, new_hash = await verify_and_update_password_async(login_data.password, user.password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        await update_password_hash(db, user, new_hash)
+
+    return complete_login(user, login_data)
+
+
+# -------------------------------------------------------
+# ADDRESS CRUD OPERATIONS
+# -------------------------------------------------------
+async def add_address(db: AsyncSession, user_id: int, address_data: AddressCreate):
+    return await db.run_sync(UserService.add_address, user_id, address_data)
+
+
+async def get_user_addresses(db: AsyncSession, user_id: int):
+    return await db.run_sync(UserService.get_user_addresses, user_id)
+
+
+async def get_addresses_grouped(db: AsyncSession, user_ids: list[int]):
+    return await db.run_sync(UserService.get_addresses_grouped, user_ids)
+
+
+async def get_single_address(db: AsyncSession, address_id: int):
+    return await db.run_sync(UserService.get_single_address, address_id)
+
+
+async def edit_address(db: AsyncSession, address_id: int, updated_data: dict):
+    return await db.run_sync(UserService.edit_address, address_id, updated_data)
+
+
+async def remove_address(db: AsyncSession, address_id: int):
+    return await db.run_sync(UserService.remove_address, address_id)
+
+
+async def apply_address_batch(db: AsyncSession, user_id: int, batch: AddressBatch):
+    return await db.run_sync(UserService.apply_address_batch, user_id, batch)
+
+
+# -------------------------------------------------------
+# USER LOOKUP
+# -------------------------------------------------------
+async def get_user_profile(db: AsyncSession, user_id: int, include: str = "none"):
+    return await db.run_sync(UserService.get_user_profile, user_id, include)
+
+
+async def get_user_profiles(db: AsyncSession, user_ids: list[int], include: str = "none"):
+    return await db.run_sync(UserService.get_user_profiles, user_ids, include)
@@ -1,33 +1,91 @@
+import hmac
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from jose import jwt, JWTError
+from typing import Optional, Dict, Any, Iterable, Tuple
+from fastapi import Depends, HTTPException  # type: ignore
 from passlib.context import CryptContext
 from config import (
-    JWT_SECRET,
+    JWT_KEYS,
+    JWT_ACTIVE_KID,
     JWT_ALGORITHM,
+    JWT_TOKEN_CACHE_SIZE,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_EXECUTOR,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
 )
+from Utils.Verification import consume_captcha
+from Shared.TokenVerifier import TokenVerifier, bearer_dependency
+from Utils.WorkerPool import BoundedWorkerPool
 
 # -------------------------------------
 # PASSWORD HASHING (bcrypt)
 # -------------------------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max rounds pinned to the configured cost, so verify_and_update()
+# flags any stored hash made with a different cost factor for rehashing.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
+password_pool = BoundedWorkerPool(
+    "password-hash",
+    workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_MAX_QUEUE,
+    kind=PASSWORD_HASH_EXECUTOR,
+)
 
-def hash_password(password: str) -> str:
-    """Hash a plain password using bcrypt."""
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def hash_password(password: str) -> str:
+    """Hash a plain password using bcrypt (runs on the password worker pool)."""
+    return password_pool.run(_hash, password)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its bcrypt hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.run(_verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Return ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    was made with a different cost factor and should be replaced.
+    """
+    return password_pool.run(_verify_and_update, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run_async(_hash, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_pool.run_async(_verify_and_update, plain_password, hashed_password)
 
 
 # -------------------------------------
 # TOKEN GENERATION HELPERS
 # -------------------------------------
+token_verifier = TokenVerifier(
+    JWT_KEYS, JWT_ALGORITHM, active_kid=JWT_ACTIVE_KID, cache_size=JWT_TOKEN_CACHE_SIZE
+)
+
+
 def _create_token(data: Dict[str, Any], expires_delta: timedelta, token_type: str) -> str:
     """
     Internal helper to create JWT tokens with expiry and type.
@@ -35,7 +93,7 @@ def _create_token(data: Dict[str, Any], expires_delta: timedelta, token_type: st
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire, "type": token_type})
-    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return token_verifier.sign(to_encode)
 
 
 def create_access_token(data: Dict[str, Any]) -> str:
@@ -58,12 +116,9 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Decode token and return payload, or None if invalid.
+    Verified payloads are cached until their `exp`; do not mutate them.
     """
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
-    except JWTError:
-        return None
+    return token_verifier.verify(token)
 
 
 def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
@@ -86,14 +141,42 @@ def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+# FastAPI dependency: payload of a valid "Authorization: Bearer <access token>"
+get_current_user = bearer_dependency(token_verifier)
+
+ADMIN_ROLE = "admin"
+
+
+def check_user_access(token_payload: Dict[str, Any], user_ids: Iterable[int]) -> None:
+    """
+    403 unless the caller is an admin or every one of ``user_ids`` is their own.
+    """
+    if token_payload.get("role") == ADMIN_ROLE:
+        return
+    if any(user_id != token_payload.get("uid") for user_id in user_ids):
+        raise HTTPException(status_code=403, detail="Not allowed to access other users")
+
+
+def require_admin(token_payload: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+    """
+    FastAPI dependency: the caller's token payload, 403 unless they are an admin.
+    """
+    if token_payload.get("role") != ADMIN_ROLE:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return token_payload
+
+
 # -------------------------------------
 # OTP VALIDATION (Email / Phone)
 # -------------------------------------
 def verify_otp(provided_otp: str, stored_otp: str) -> bool:
     """
-    Verify if provided OTP matches stored OTP.
+    Verify if provided OTP matches stored OTP (constant time).
+    Issued codes are checked through Utils.Verification.otp_service.
     """
-    return provided_otp == stored_otp
+    if not provided_otp or not stored_otp:
+        return False
+    return hmac.compare_digest(provided_otp.encode(), stored_otp.encode())
 
 
 # -------------------------------------
@@ -105,5 +188,15 @@ def verify_captcha(captcha_token: str) -> bool:
     In production, call Google reCAPTCHA or hCaptcha API here.
     """
     # Example: send captcha_token to provider API and check response
-    # For now, return True if token exists
-    return bool(captcha_token)
+    # For now, accept any token that has not been used before
+    return bool(captcha_token) and consume_captcha(captcha_token)
+
+
+def token_user_id(token: str) -> Optional[int]:
+    """
+    uid of a valid access token, or None (used to key rate limits).
+    """
+    payload = token_verifier.verify(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+    return payload.get("uid")
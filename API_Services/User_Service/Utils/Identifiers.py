@@ -0,0 +1,83 @@
+import re
+from typing import List, Optional, Tuple
+
+# -------------------------------------
+# LOGIN IDENTIFIER NORMALIZATION
+# -------------------------------------
+# Every user has one row per identifier kind in admin.user_identifiers,
+# keyed by (kind, normalized value). Lookups normalize the input the same
+# way, so they are exact primary-key seeks.
+
+EMAIL = "email"
+USERNAME = "username"
+PHONE = "phone"
+
+_NON_DIGITS = re.compile(r"\D")
+_PHONE_LIKE = re.compile(r"[\d\s+\-().]+")
+
+
+def normalize_email(value: str) -> Optional[str]:
+    value = str(value).strip().lower()
+    return value if "@" in value else None
+
+
+def normalize_username(value: str) -> Optional[str]:
+    value = str(value).strip().lower()
+    return value or None
+
+
+def normalize_phone(value: str) -> Optional[str]:
+    """
+    Keep digits only, so "+91 98765-43210" and "+919876543210" collide.
+    """
+    digits = _NON_DIGITS.sub("", str(value))
+    return digits or None
+
+
+_NORMALIZERS = {
+    EMAIL: normalize_email,
+    USERNAME: normalize_username,
+    PHONE: normalize_phone,
+}
+
+
+def normalize(kind: str, value: str) -> Optional[str]:
+    return _NORMALIZERS[kind](value)
+
+
+def user_identifiers(email: str, username: str, phone_number: str) -> List[Tuple[str, str]]:
+    """
+    (kind, normalized value) pairs for a user's own identifiers.
+    """
+    pairs = []
+    for kind, value in ((EMAIL, email), (USERNAME, username), (PHONE, phone_number)):
+        normalized = normalize(kind, value) if value else None
+        if normalized:
+            pairs.append((kind, normalized))
+    return pairs
+
+
+def login_candidates(identifier: str) -> List[Tuple[str, str]]:
+    """
+    Every (kind, normalized value) a free-form login identifier could be.
+    """
+    identifier = str(identifier)
+    candidates = []
+    for kind in (EMAIL, USERNAME, PHONE):
+        if kind == PHONE and not _PHONE_LIKE.fullmatch(identifier.strip()):
+            continue
+        value = normalize(kind, identifier)
+        if value:
+            candidates.append((kind, value))
+    return candidates
+
+
+def identifier_rate_key(identifier: str) -> str:
+    """
+    Canonical form of a free-form login identifier for per-identifier rate
+    limits: phone-like input is reduced to digits, as login_candidates does,
+    so every spelling of a number shares one bucket; anything else is the
+    normalized email/username.
+    """
+    candidates = dict(login_candidates(identifier))
+    return candidates.get(PHONE) or candidates.get(EMAIL) or candidates.get(USERNAME) or ""
@@ -0,0 +1,101 @@
+import json
+import smtplib
+import urllib.request
+from email.message import EmailMessage
+
+# -------------------------------------------------------
+# OTP DELIVERY PROVIDERS
+# -------------------------------------------------------
+# One sender per channel, chosen from Otp.Delivery in appsettings.json:
+#   Email: "smtp" | "none"
+#   Sms:   "webhook" (JSON POST to an SMS gateway) | "none"
+# Senders run inside the otp.deliver job, so a raised error is retried.
+
+MESSAGE = "Your verification code is {code}. It expires in {minutes} minutes."
+
+
+class SmtpEmailSender:
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: str = "",
+        password: str = "",
+        sender: str = "",
+        start_tls: bool = True,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender
+        self.start_tls = start_tls
+        self.timeout = timeout
+
+    def send(self, destination: str, text: str) -> None:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = destination
+        message["Subject"] = "Your verification code"
+        message.set_content(text)
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.start_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+
+class WebhookSmsSender:
+    """
+    Posts ``{"to": ..., "message": ...}`` to the gateway URL, with the token
+    (if any) as a bearer header. Any non-2xx answer raises.
+    """
+
+    def __init__(self, url: str, token: str = "", timeout: float = 10.0):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def send(self, destination: str, text: str) -> None:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"to": destination, "message": text}).encode(),
+            headers=headers,
+            method="POST",
+        )
+        # urlopen raises HTTPError for 4xx/5xx responses
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def create_sender(settings: dict):
+    """
+    Build the sender for one channel from its Otp.Delivery section, or
+    None when the provider is "none".
+    """
+    provider = (settings.get("Provider") or "none").lower()
+    if provider == "none":
+        return None
+    if provider == "smtp":
+        return SmtpEmailSender(
+            host=settings["Host"],
+            port=settings.get("Port", 587),
+            username=settings.get("Username", ""),
+            password=settings.get("Password", ""),
+            sender=settings.get("From", ""),
+            start_tls=settings.get("StartTls", True),
+        )
+    if provider == "webhook":
+        return WebhookSmsSender(url=settings["Url"], token=settings.get("Token", ""))
+    raise ValueError(f"Unsupported OTP delivery provider: {provider}")
+
+
+def otp_message(code: str, ttl_seconds: int) -> str:
+    return MESSAGE.format(code=code, minutes=max(1, ttl_seconds // 60))
+
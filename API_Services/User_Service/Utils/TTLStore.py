@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+from typing import Any, Optional
+
+# -------------------------------------------------------
+# TTL KEY-VALUE STORES
+# -------------------------------------------------------
+# Short-lived verification state (OTP codes, attempt counters, rate-limit
+# windows, used captcha tokens). Both backends share one small interface:
+#   get / set / set_if_absent / delete / incr / ttl / ping
+# and every key carries a TTL. Values must be JSON-serializable.
+
+
+class MemoryTTLStore:
+    """
+    In-process store. Expired keys are dropped lazily on access and swept
+    by a hashed timing wheel: each key is filed under the slot of the tick
+    it expires in, and every call advances the wheel over the ticks that
+    have passed since the last one, so expiry costs O(expired keys) rather
+    than a scan of the whole store.
+    """
+
+    def __init__(self, resolution: float = 1.0, slots: int = 512):
+        self.resolution = resolution
+        self.slots = slots
+        self._data: dict[str, tuple[float, Any]] = {}
+        self._wheel: list[set[str]] = [set() for _ in range(slots)]
+        self._tick = self._tick_of(time.monotonic())
+        self._lock = threading.Lock()
+
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp / self.resolution)
+
+    def _schedule(self, key: str, expires_at: float) -> None:
+        self._wheel[self._tick_of(expires_at) % self.slots].add(key)
+
+    def _advance(self, now: float) -> None:
+        # self._tick is the first tick not yet swept; only ticks that have
+        # fully passed are swept, so every key found in them has expired
+        # unless it belongs to a later turn of the wheel.
+        current = self._tick_of(now)
+        if current <= self._tick:
+            return
+        # After a long idle period one full turn covers every slot
+        ticks = range(self._tick, current) if current - self._tick < self.slots else range(self.slots)
+        for tick in ticks:
+            index = tick % self.slots
+            slot = self._wheel[index]
+            for key in list(slot):
+                entry = self._data.get(key)
+                if entry is None or entry[0] <= now:
+                    self._data.pop(key, None)
+                    slot.discard(key)
+                elif self._tick_of(entry[0]) % self.slots != index:
+                    # Key was re-set with a different expiry and filed elsewhere
+                    slot.discard(key)
+        self._tick = current
+
+    def _live(self, key: str, now: float) -> Optional[tuple[float, Any]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            entry = self._live(key, now)
+            return entry[1] if entry else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            expires_at = now + ttl
+            self._data[key] = (expires_at, value)
+            self._schedule(key, expires_at)
+
+    def set_if_absent(self, key: str, value: Any, ttl: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            if self._live(key, now):
+                return False
+            expires_at = now + ttl
+            self._data[key] = (expires_at, value)
+            self._schedule(key, expires_at)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key: str, ttl: int) -> int:
+        """
+        Increment a counter; the TTL is set when the counter is created and
+        not extended by later increments (a fixed window).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            entry = self._live(key, now)
+            if entry is None:
+                expires_at, value = now + ttl, 1
+                self._schedule(key, expires_at)
+            else:
+                expires_at, value = entry[0], entry[1] + 1
+            self._data[key] = (expires_at, value)
+            return value
+
+    def ttl(self, key: str) -> int:
+        """
+        Seconds until ``key`` expires, or 0 if it does not exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(key, now)
+            return max(int(entry[0] - now + 0.999), 1) if entry else 0
+
+    def ping(self) -> bool:
+        return True
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisTTLStore:
+    """
+    Backend for any Redis-compatible server (or a fake such as fakeredis
+    in tests); Redis does its own expiry.
+    """
+
+    def __init__(self, client, prefix: str = "user-service:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def set_if_absent(self, key: str, value: Any, ttl: int) -> bool:
+        return bool(self.client.set(self.prefix + key, json.dumps(value), ex=ttl, nx=True))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*[self.prefix + k for k in keys])
+
+    def incr(self, key: str, ttl: int) -> int:
+        pipe = self.client.pipeline()
+        # Only the first increment of a window creates the key (and its expiry)
+        pipe.set(self.prefix + key, 0, ex=ttl, nx=True)
+        pipe.incr(self.prefix + key)
+        _, value = pipe.execute()
+        return int(value)
+
+    def ttl(self, key: str) -> int:
+        return max(int(self.client.ttl(self.prefix + key)), 0)
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.client.ping())
+        except Exception:
+            return False
+
+
+def create_ttl_store(url: str = "memory://"):
+    """
+    Build a store from a URL: ``memory://`` or ``redis://host:port/db``.
+    """
+    if url.startswith("memory://"):
+        return MemoryTTLStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The 'redis' package is required for a redis:// store URL")
+        return RedisTTLStore(redis.Redis.from_url(url))
+    raise ValueError(f"Unsupported store URL: {url}")
@@ -0,0 +1,194 @@
+import hashlib
+import hmac
+import logging
+import secrets
+from typing import Iterable, Optional
+
+from fastapi import HTTPException  # type: ignore
+
+from config import (
+    OTP_ISSUE_LIMIT,
+    OTP_ISSUE_WINDOW_SECONDS,
+    OTP_LENGTH,
+    OTP_MAX_ATTEMPTS,
+    OTP_SECRET,
+    OTP_TTL_SECONDS,
+    OTP_ECHO_CODE_FOR_TESTING,
+    OTP_EMAIL_DELIVERY,
+    OTP_REQUIRED_FOR_REGISTRATION,
+    OTP_SMS_DELIVERY,
+    SERVER_WORKERS,
+    VERIFICATION_STORE_URL,
+    CAPTCHA_REPLAY_TTL_SECONDS,
+)
+from Utils.Identifiers import EMAIL, PHONE, normalize
+from Utils.OtpDelivery import create_sender, otp_message
+from Utils.TTLStore import create_ttl_store
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------------
+# OTP ISSUANCE & VERIFICATION
+# -------------------------------------------------------
+# Keys (all with a TTL, nothing touches admin.users):
+#   otp:{purpose}:{kind}:{value}           HMAC of the current code
+#   otp-attempts:{purpose}:{kind}:{value}  failed/used verification attempts
+#   otp-issued:{purpose}:{kind}:{value}    codes issued in the current window
+#   captcha:{sha256}                       captcha tokens already consumed
+
+
+class OtpService:
+    def __init__(
+        self,
+        store,
+        secret: str,
+        length: int = 6,
+        ttl: int = 300,
+        max_attempts: int = 5,
+        issue_limit: int = 3,
+        issue_window: int = 600,
+    ):
+        self.store = store
+        self._secret = secret.encode()
+        self.length = length
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.issue_limit = issue_limit
+        self.issue_window = issue_window
+
+    def _digest(self, code: str) -> str:
+        return hmac.new(self._secret, code.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _subject(purpose: str, kind: str, destination: str) -> Optional[str]:
+        value = normalize(kind, destination)
+        return f"{purpose}:{kind}:{value}" if value else None
+
+    def issue(self, purpose: str, kind: str, destination: str) -> str:
+        """
+        Create a new code for (purpose, destination), replacing any previous
+        one. At most `issue_limit` codes per `issue_window` per destination.
+        """
+        subject = self._subject(purpose, kind, destination)
+        if subject is None:
+            raise HTTPException(status_code=400, detail=f"Invalid {kind}")
+
+        issued = self.store.incr(f"otp-issued:{subject}", self.issue_window)
+        if issued > self.issue_limit:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many OTP requests, please try again later",
+                headers={"Retry-After": str(self.store.ttl(f"otp-issued:{subject}") or self.issue_window)},
+            )
+
+        code = str(secrets.randbelow(10 ** self.length)).zfill(self.length)
+        self.store.set(f"otp:{subject}", self._digest(code), self.ttl)
+        self.store.delete(f"otp-attempts:{subject}")
+        return code
+
+    def _check(self, purpose: str, kind: str, destination: str, code: Optional[str]) -> Optional[str]:
+        """
+        Compare a code in constant time without consuming it. Returns the
+        store subject on a match. After `max_attempts` wrong guesses the
+        code is discarded.
+        """
+        subject = self._subject(purpose, kind, destination)
+        if subject is None or not code:
+            return None
+
+        expected = self.store.get(f"otp:{subject}")
+        if expected is None:
+            return None
+
+        attempts = self.store.incr(f"otp-attempts:{subject}", self.ttl)
+        if attempts > self.max_attempts:
+            self.store.delete(f"otp:{subject}")
+            return None
+
+        if not hmac.compare_digest(expected, self._digest(code)):
+            return None
+        return subject
+
+    def verify_all(self, purpose: str, codes: Iterable[tuple[str, str, Optional[str]]]) -> bool:
+        """
+        Check several (kind, destination, code) triples and consume the codes
+        only when every one matches, so a wrong phone code does not burn a
+        correct email code. Codes are single-use.
+        """
+        subjects = []
+        for kind, destination, code in codes:
+            subject = self._check(purpose, kind, destination, code)
+            if subject is None:
+                return False
+            subjects.append(subject)
+
+        for subject in subjects:
+            self.store.delete(f"otp:{subject}", f"otp-attempts:{subject}")
+        return True
+
+    def verify(self, purpose: str, kind: str, destination: str, code: Optional[str]) -> bool:
+        return self.verify_all(purpose, [(kind, destination, code)])
+
+
+# -------------------------------------------------------
+# DELIVERY
+# -------------------------------------------------------
+otp_senders = {
+    EMAIL: create_sender(OTP_EMAIL_DELIVERY),
+    PHONE: create_sender(OTP_SMS_DELIVERY),
+}
+
+if OTP_REQUIRED_FOR_REGISTRATION and not OTP_ECHO_CODE_FOR_TESTING and None in otp_senders.values():
+    raise RuntimeError(
+        "Otp.RequiredForRegistration needs both Otp.Delivery.Email and Otp.Delivery.Sms providers"
+    )
+
+
+def can_deliver(kind: str) -> bool:
+    return otp_senders.get(kind) is not None
+
+
+def deliver_otp(kind: str, destination: str, code: str) -> None:
+    """
+    Hand the code to the provider configured for its channel. Provider
+    errors propagate so the delivery job retries; the code is never logged.
+    """
+    sender = otp_senders.get(kind)
+    if sender is None:
+        logger.info("No OTP provider for %s; code for %s not delivered", kind, destination)
+        return
+    sender.send(destination, otp_message(code, OTP_TTL_SECONDS))
+    logger.info("OTP delivered to %s %s", kind, destination)
+
+
+# -------------------------------------------------------
+# STORE
+# -------------------------------------------------------
+if SERVER_WORKERS > 1 and VERIFICATION_STORE_URL.startswith("memory://"):
+    raise RuntimeError(
+        "Otp.StoreUrl must be a redis:// URL when WEB_CONCURRENCY > 1: "
+        "the memory store is per worker, so codes would not verify across workers"
+    )
+
+verification_store = create_ttl_store(VERIFICATION_STORE_URL)
+
+otp_service = OtpService(
+    verification_store,
+    secret=OTP_SECRET,
+    length=OTP_LENGTH,
+    ttl=OTP_TTL_SECONDS,
+    max_attempts=OTP_MAX_ATTEMPTS,
+    issue_limit=OTP_ISSUE_LIMIT,
+    issue_window=OTP_ISSUE_WINDOW_SECONDS,
+)
+
+
+# -------------------------------------------------------
+# CAPTCHA REPLAY GUARD
+# -------------------------------------------------------
+def consume_captcha(captcha_token: str) -> bool:
+    """
+    True the first time a captcha token is seen, False on any reuse.
+    """
+    digest = hashlib.sha256(captcha_token.encode()).hexdigest()
+    return verification_store.set_if_absent(f"captcha:{digest}", 1, CAPTCHA_REPLAY_TTL_SECONDS)
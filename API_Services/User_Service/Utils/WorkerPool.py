@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from fastapi import HTTPException  # type: ignore
+
+# -------------------------------------
+# BOUNDED CPU WORKER POOL
+# -------------------------------------
+# At most `workers + max_queue` tasks are admitted at once; anything beyond
+# that is rejected immediately with 503 so callers shed load instead of
+# queueing behind the backlog. Functions submitted to a process pool must be
+# importable module-level callables.
+
+
+class BoundedWorkerPool:
+    def __init__(self, name: str, workers: int, max_queue: int, kind: str = "process", retry_after: int = 1):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unsupported worker pool kind: {kind}")
+        self.name = name
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self.kind = kind
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # spawn, not fork: the server process is multi-threaded
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix=self.name
+                        )
+        return self._executor
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn: Callable, *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        with self._lock:
+            self.in_flight += 1
+        try:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool and retry once
+                self._executor = None
+                future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Blocking call for sync code paths (route handlers already run in
+        Starlette's threadpool; the CPU work itself happens in the pool).
+        """
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable, *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
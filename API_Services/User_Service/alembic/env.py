@@ -4,7 +4,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 import config as app_config
 from Db.Database import engine, Base
-from Models.Models import User 
+from Models.Models import User, UserJob
 
 from alembic import context
 
@@ -0,0 +1,92 @@
+"""user identifiers lookup table
+
+Revision ID: 4d7e2a91c0b3
+Revises: 8741f5f31fc3
+Create Date: 2025-12-04 10:15:00.000000
+
+"""
+import logging
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d7e2a91c0b3'
+down_revision: Union[str, Sequence[str], None] = '8741f5f31fc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# Identifier normalization as it was when this revision was written,
+# inlined so later changes to Utils/Identifiers.py cannot change what
+# this migration backfills.
+_NON_DIGITS = re.compile(r"\D")
+
+
+def _normalize(kind: str, value) -> str | None:
+    if kind == 'phone':
+        # Digits only, so "+91 98765-43210" and "+919876543210" collide
+        return _NON_DIGITS.sub("", str(value)) or None
+    value = str(value).strip().lower()
+    if kind == 'email':
+        return value if "@" in value else None
+    return value or None
+
+
+def _user_identifiers(email, username, phone_number) -> list[tuple[str, str]]:
+    pairs = []
+    for kind, value in (('email', email), ('username', username), ('phone', phone_number)):
+        normalized = _normalize(kind, value) if value else None
+        if normalized:
+            pairs.append((kind, normalized))
+    return pairs
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    identifiers = op.create_table(
+        'user_identifiers',
+        sa.Column('kind', sa.String(length=16), nullable=False),
+        sa.Column('value', sa.String(length=150), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['admin.users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('kind', 'value'),
+        schema='admin',
+    )
+    op.create_index(op.f('ix_admin_user_identifiers_user_id'), 'user_identifiers', ['user_id'], unique=False, schema='admin')
+
+    # Backfill from existing users. Values that collide after normalization
+    # (e.g. "John" and "john") keep the oldest user; the newer user can
+    # still log in with their other identifiers. Every skipped pair is
+    # logged so an operator can resolve it (values are not logged).
+    bind = op.get_bind()
+    users = bind.execute(sa.text("SELECT id, email, username, phone_number FROM admin.users ORDER BY id"))
+    owners = {}
+    rows = []
+    skipped = []
+    for user_id, email, username, phone_number in users:
+        for kind, value in _user_identifiers(email, username, phone_number):
+            if (kind, value) in owners:
+                skipped.append((user_id, kind, owners[(kind, value)]))
+                continue
+            owners[(kind, value)] = user_id
+            rows.append({'kind': kind, 'value': value, 'user_id': user_id})
+    for user_id, kind, owner_id in skipped:
+        logger.warning(
+            "user_identifiers: user %s lost %s login, it normalizes to the same value as user %s's",
+            user_id, kind, owner_id,
+        )
+    if skipped:
+        logger.warning("user_identifiers: %d identifier(s) skipped, see above", len(skipped))
+    if rows:
+        op.bulk_insert(identifiers, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_admin_user_identifiers_user_id'), table_name='user_identifiers', schema='admin')
+    op.drop_table('user_identifiers', schema='admin')
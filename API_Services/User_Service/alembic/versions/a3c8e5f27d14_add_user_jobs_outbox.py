@@ -0,0 +1,48 @@
+"""add user_jobs outbox
+
+Revision ID: a3c8e5f27d14
+Revises: 4d7e2a91c0b3
+Create Date: 2026-10-18 17:58:31.207649
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c8e5f27d14'
+down_revision: Union[str, Sequence[str], None] = '4d7e2a91c0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=200), nullable=True),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_date', sa.DateTime(), nullable=False),
+        sa.Column('updated_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        schema='admin'
+    )
+    op.create_index(op.f('ix_admin_user_jobs_idempotency_key'), 'user_jobs', ['idempotency_key'], unique=False, schema='admin')
+    op.create_index('ix_admin_user_jobs_status_run_at', 'user_jobs', ['status', 'run_at'], unique=False, schema='admin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_admin_user_jobs_status_run_at', table_name='user_jobs', schema='admin')
+    op.drop_index(op.f('ix_admin_user_jobs_idempotency_key'), table_name='user_jobs', schema='admin')
+    op.drop_table('user_jobs', schema='admin')
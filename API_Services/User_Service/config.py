@@ -36,14 +36,110 @@ with open(config_path, "r", encoding="utf-8") as f:
 # --------------------------
 DB_CONNECTION_STRING = config.get("Database", {}).get("ConnectionString")
 
+# "sync" (SessionLocal + def routes) or "async" (AsyncSession + async def routes)
+DB_MODE = config.get("Database", {}).get("Mode", "sync")
+
+# Connection pool (per process; applies to both the sync and async engines)
+_pool = config.get("Database", {}).get("Pool", {})
+DB_POOL_SIZE = _pool.get("Size", 5)
+DB_MAX_OVERFLOW = _pool.get("MaxOverflow", 10)
+DB_POOL_TIMEOUT_SECONDS = _pool.get("TimeoutSeconds", 30)
+DB_POOL_RECYCLE_SECONDS = _pool.get("RecycleSeconds", 1800)
+DB_POOL_PRE_PING = _pool.get("PrePing", True)
+DB_STATEMENT_TIMEOUT_MS = _pool.get("StatementTimeoutMs", 30000)
+DB_SLOW_CHECKOUT_MS = _pool.get("SlowCheckoutMs", 100)
+
 # JWT settings
 JWT_SECRET = config.get("JWT", {}).get("SecretKey")
 JWT_ALGORITHM = config.get("JWT", {}).get("Algorithm")
 ACCESS_TOKEN_EXPIRE_MINUTES = config.get("JWT", {}).get("AccessTokenExpireMinutes", 30)
 REFRESH_TOKEN_EXPIRE_DAYS = config.get("JWT", {}).get("RefreshTokenExpireDays", 7)
+# Signing keys by kid. The legacy SecretKey stays valid as kid "default", so
+# tokens issued before Keys was configured keep verifying until they expire.
+JWT_KEYS = {"default": JWT_SECRET} if JWT_SECRET else {}
+JWT_KEYS.update({k["Kid"]: k["SecretKey"] for k in config.get("JWT", {}).get("Keys", [])})
+JWT_ACTIVE_KID = config.get("JWT", {}).get("ActiveKid", "default")
+JWT_TOKEN_CACHE_SIZE = config.get("JWT", {}).get("TokenCacheSize", 10000)
+
+# Password hashing (bcrypt runs on a bounded worker pool; see Utils/WorkerPool.py)
+_hashing = config.get("PasswordHashing", {})
+BCRYPT_ROUNDS = _hashing.get("BcryptRounds", 12)
+PASSWORD_HASH_EXECUTOR = _hashing.get("Executor", "process")
+PASSWORD_HASH_WORKERS = _hashing.get("Workers", 2)
+PASSWORD_HASH_MAX_QUEUE = _hashing.get("MaxQueue", 16)
 
 # Captcha
 CAPTCHA_SECRET = config.get("Captcha", {}).get("SecretKey")
+CAPTCHA_REPLAY_TTL_SECONDS = config.get("Captcha", {}).get("ReplayTtlSeconds", 300)
+
+# Number of server processes. uvicorn (--workers) and gunicorn both read
+# WEB_CONCURRENCY; set it whenever more than one worker is started so the
+# per-process "memory://" stores below are refused
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# OTP codes, attempt counters and used captcha tokens live in a TTL store
+# ("memory://" per process, or "redis://..." shared between processes).
+# With SERVER_WORKERS > 1 the store must be redis: a code issued by one
+# worker has to verify on any other.
+_otp = config.get("Otp", {})
+VERIFICATION_STORE_URL = _otp.get("StoreUrl", "memory://")
+OTP_SECRET = _otp.get("SecretKey") or JWT_SECRET or ""
+OTP_LENGTH = _otp.get("Length", 6)
+OTP_TTL_SECONDS = _otp.get("TtlSeconds", 300)
+OTP_MAX_ATTEMPTS = _otp.get("MaxAttempts", 5)
+OTP_ISSUE_LIMIT = _otp.get("IssueLimit", 3)
+OTP_ISSUE_WINDOW_SECONDS = _otp.get("IssueWindowSeconds", 600)
+# Returns the code in the /user/otp/send response, which bypasses OTP
+# verification entirely: automated test and benchmark setups only
+OTP_ECHO_CODE_FOR_TESTING = _otp.get("EchoCodeForTesting", False)
+# Delivery providers (see Utils/OtpDelivery.py): Email "smtp", Sms "webhook",
+# or "none". Registration only requires the email and phone codes when
+# RequiredForRegistration is on, which needs both providers configured.
+_otp_delivery = _otp.get("Delivery", {})
+OTP_EMAIL_DELIVERY = _otp_delivery.get("Email", {"Provider": "none"})
+OTP_SMS_DELIVERY = _otp_delivery.get("Sms", {"Provider": "none"})
+OTP_REQUIRED_FOR_REGISTRATION = _otp.get("RequiredForRegistration", False)
+
+# Rate limiting (rules are parsed in Shared/RateLimit.py)
+_rate_limit = config.get("RateLimit", {})
+RATE_LIMIT_ENABLED = _rate_limit.get("Enabled", False)
+RATE_LIMIT_STORE_URL = _rate_limit.get("StoreUrl", "memory://")
+RATE_LIMIT_SHARDS = _rate_limit.get("Shards", 16)
+RATE_LIMIT_TRUST_FORWARDED_FOR = _rate_limit.get("TrustForwardedFor", False)
+RATE_LIMIT_RULES = _rate_limit.get("Rules", [])
+
+# Response compression (gzip, plus br when the brotli package is installed).
+# Per-request levels are kept low: the CPU cost grows much faster than the saving
+_compression = config.get("Compression", {})
+COMPRESSION_ENABLED = _compression.get("Enabled", True)
+COMPRESSION_MINIMUM_SIZE = _compression.get("MinimumSize", 1024)
+COMPRESSION_GZIP_LEVEL = _compression.get("GzipLevel", 5)
+COMPRESSION_BROTLI_QUALITY = _compression.get("BrotliQuality", 4)
+
+# Request instrumentation: /metrics, Server-Timing and the slow-request log
+_metrics = config.get("Metrics", {})
+METRICS_ENABLED = _metrics.get("Enabled", True)
+SLOW_REQUEST_MS = _metrics.get("SlowRequestMs", 1000)
+SERVER_TIMING_ENABLED = _metrics.get("ServerTiming", True)
+
+# Readiness probes (cached; refreshed in the background once older than the TTL)
+_health = config.get("Health", {})
+HEALTH_CACHE_TTL_SECONDS = _health.get("CacheTtlSeconds", 5)
+HEALTH_MAX_STALE_SECONDS = _health.get("MaxStaleSeconds", 30)
+HEALTH_DB_TIMEOUT_SECONDS = _health.get("DbTimeoutSeconds", 2)
+HEALTH_POOL_SATURATION_THRESHOLD = _health.get("PoolSaturationThreshold", 1.0)
+
+# Background jobs (Shared/Jobs.py): worker threads, retry backoff and the outbox dispatcher
+_jobs = config.get("Jobs", {})
+JOBS_WORKERS = _jobs.get("Workers", 2)
+JOBS_MAX_QUEUE = _jobs.get("MaxQueue", 10000)
+JOBS_MAX_ATTEMPTS = _jobs.get("MaxAttempts", 5)
+JOBS_BACKOFF_SECONDS = _jobs.get("BackoffSeconds", 2)
+JOBS_BACKOFF_MAX_SECONDS = _jobs.get("BackoffMaxSeconds", 300)
+JOBS_DEDUPE_WINDOW_SECONDS = _jobs.get("DedupeWindowSeconds", 3600)
+JOBS_POLL_INTERVAL_SECONDS = _jobs.get("PollIntervalSeconds", 1)
+JOBS_LEASE_SECONDS = _jobs.get("LeaseSeconds", 300)
+JOBS_RETENTION_HOURS = _jobs.get("RetentionHours", 24)
 
 # Service metadata
 SERVICE_NAME = config.get("Service", {}).get("Name")
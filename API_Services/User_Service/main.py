@@ -1,14 +1,151 @@
-from fastapi import FastAPI
-from API.Routes.user_routes import router as user_router
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response
+from config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_ENABLED,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+    DB_MODE,
+    HEALTH_CACHE_TTL_SECONDS,
+    HEALTH_DB_TIMEOUT_SECONDS,
+    HEALTH_MAX_STALE_SECONDS,
+    HEALTH_POOL_SATURATION_THRESHOLD,
+    METRICS_ENABLED,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_RULES,
+    RATE_LIMIT_SHARDS,
+    RATE_LIMIT_STORE_URL,
+    RATE_LIMIT_TRUST_FORWARDED_FOR,
+    SERVER_TIMING_ENABLED,
+    SLOW_REQUEST_MS,
+)
+from Db.Database import engine
+from Shared.PoolTelemetry import pool_report
+from UserService.UserJobs import job_queue
+from Utils.Auth import password_pool, require_admin, token_user_id
+from Shared.Compression import CompressionMiddleware
+from Shared.Health import HealthMonitor, database_check, ping_check, pool_check
+from Shared.Instrumentation import InstrumentationMiddleware, render_metrics
+from Shared.Metrics import PROMETHEUS_CONTENT_TYPE
+from Utils.Identifiers import identifier_rate_key
+from Shared.RateLimit import RateLimitMiddleware, build_rules, create_rate_limit_store
+from Utils.Verification import verification_store
+
+if DB_MODE == "async":
+    from API.Routes.async_routes import router as user_router
+else:
+    from API.Routes.user_routes import router as user_router
 
 app = FastAPI(
     title="User Service",
     description="Handles user registration, login, and role-based authentication.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.include_router(user_router, prefix="/user", tags=["User"])
 
+health_monitor = HealthMonitor(ttl=HEALTH_CACHE_TTL_SECONDS, max_stale=HEALTH_MAX_STALE_SECONDS)
+health_monitor.register("database", database_check(engine, timeout_seconds=HEALTH_DB_TIMEOUT_SECONDS))
+health_monitor.register("db_pool", pool_check(HEALTH_POOL_SATURATION_THRESHOLD))
+# OTP codes and captcha replay markers live here
+health_monitor.register("verification_store", ping_check(verification_store))
+
+if COMPRESSION_ENABLED:
+    # Added before the rate limiter so rejected requests are not compressed
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    )
+
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=build_rules(RATE_LIMIT_RULES),
+        store=create_rate_limit_store(RATE_LIMIT_STORE_URL, shards=RATE_LIMIT_SHARDS),
+        trust_forwarded_for=RATE_LIMIT_TRUST_FORWARDED_FOR,
+        user_resolver=token_user_id,
+        key_normalizers={"body:identifier": identifier_rate_key},
+    )
+
+if METRICS_ENABLED:
+    # Outermost, so rate-limited responses and compressed sizes are recorded
+    app.add_middleware(
+        InstrumentationMiddleware,
+        slow_request_ms=SLOW_REQUEST_MS,
+        server_timing_header=SERVER_TIMING_ENABLED,
+    )
+
+
+@app.on_event("startup")
+def start_job_workers():
+    job_queue.start()
+
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_pool.shutdown()
+
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_queue.shutdown()
+
+
 @app.get("/health")
-def health_check():
+@app.get("/health/live")
+def liveness():
+    """
+    The process is up and serving; touches no dependency.
+    """
     return {"status": "ok", "service": "User Service"}
+
+@app.get("/health/ready")
+def readiness():
+    """
+    Cached dependency probes; 503 while any critical check fails.
+    """
+    ready, report = health_monitor.readiness()
+    return ORJSONResponse(report, status_code=200 if ready else 503)
+
+@app.get("/db/pool")
+def db_pool_stats():
+    """
+    Connection pool gauges, checkout-wait histogram and slow-checkout counts
+    for every engine created in this process.
+    """
+    return pool_report()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Request, SQL statement, connection pool and job queue metrics in
+    Prometheus text format.
+    """
+    return Response(render_metrics(job_queue.prometheus_lines()), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/jobs", dependencies=[Depends(require_admin)])
+def job_stats():
+    """
+    Background job queue (admin only): queued/in-flight counts, outbox rows by status
+    and per-type counters.
+    """
+    return job_queue.stats()
+
+@app.get("/jobs/failed", dependencies=[Depends(require_admin)])
+def failed_jobs(limit: int = 50):
+    """
+    Most recent jobs that exhausted their attempts.
+    """
+    return job_queue.recent_failures(limit)
+
+@app.post("/jobs/outbox/{job_id}/retry", dependencies=[Depends(require_admin)])
+def retry_failed_job(job_id: int):
+    """
+    Requeue a failed outbox job with a fresh set of attempts.
+    """
+    if not job_queue.retry_failed(job_id):
+        raise HTTPException(status_code=404, detail="No failed job with that id")
+    return {"id": job_id, "status": "pending"}
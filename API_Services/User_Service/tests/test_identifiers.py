@@ -0,0 +1,97 @@
+import pytest
+
+from Utils.Identifiers import (
+    EMAIL,
+    PHONE,
+    USERNAME,
+    identifier_rate_key,
+    login_candidates,
+    normalize_email,
+    normalize_phone,
+    normalize_username,
+    user_identifiers,
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (" John.Doe@Example.COM ", "john.doe@example.com"),
+    ("john_doe", None),
+])
+def test_normalize_email(value, expected):
+    assert normalize_email(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [(" John_Doe ", "john_doe"), ("   ", None)])
+def test_normalize_username(value, expected):
+    assert normalize_username(value) == expected
+
+
+@pytest.mark.parametrize("value", ["+91 98765-43210", "919876543210", "(91) 98765 43210", "91.98765.43210"])
+def test_normalize_phone_keeps_digits(value):
+    assert normalize_phone(value) == "919876543210"
+
+
+def test_normalize_phone_without_digits():
+    assert normalize_phone("+-") is None
+
+
+def test_user_identifiers_skips_missing_values():
+    assert user_identifiers("A@x.com", "Ann", "") == [(EMAIL, "a@x.com"), (USERNAME, "ann")]
+    assert user_identifiers("a@x.com", "ann", "+1 555") == [(EMAIL, "a@x.com"), (USERNAME, "ann"), (PHONE, "1555")]
+
+
+@pytest.mark.parametrize("identifier, expected", [
+    ("Ann@X.com", [(EMAIL, "ann@x.com"), (USERNAME, "ann@x.com")]),
+    ("Ann", [(USERNAME, "ann")]),
+    ("+91 98765-43210", [(USERNAME, "+91 98765-43210"), (PHONE, "919876543210")]),
+    # Digits inside a username do not make it a phone number
+    ("ann2024", [(USERNAME, "ann2024")]),
+])
+def test_login_candidates(identifier, expected):
+    assert login_candidates(identifier) == expected
+
+
+@pytest.mark.parametrize("identifier, expected", [
+    ("+91 98765-43210", "919876543210"),
+    ("919876543210", "919876543210"),
+    ("(91) 98765 43210", "919876543210"),
+    (" Ann@X.com ", "ann@x.com"),
+    ("ANN", "ann"),
+    ("", ""),
+])
+def test_identifier_rate_key(identifier, expected):
+    assert identifier_rate_key(identifier) == expected
+
+
+@pytest.fixture
+def db():
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from Models.Models import User, UserIdentifier
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    event.listen(engine, "connect", lambda conn, _: conn.execute("ATTACH DATABASE ':memory:' AS admin"))
+    User.__table__.create(engine)
+    UserIdentifier.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_get_user_by_identifier_prefers_email_then_username_then_phone(db):
+    from Models.Models import User, UserIdentifier
+    from Repository_DataAcess.UserRepository import get_user_by_identifier
+
+    # User 1's phone number is user 2's username
+    for user_id, email, username, phone in [(1, "a@x.com", "ann", "9876543210"), (2, "b@x.com", "9876543210", "1112223334")]:
+        db.add(User(id=user_id, name=username, email=email, username=username, phone_number=phone, password="x"))
+        db.flush()
+        db.add_all(UserIdentifier(kind=kind, value=value, user_id=user_id) for kind, value in user_identifiers(email, username, phone))
+    db.commit()
+
+    assert get_user_by_identifier(db, "9876543210").id == 2
+    assert get_user_by_identifier(db, "+91 1112223334") is None
+    assert get_user_by_identifier(db, "1112223334").id == 2
+    assert get_user_by_identifier(db, "ANN").id == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from Utils.Identifiers import EMAIL, PHONE
+from Utils.OtpDelivery import SmtpEmailSender, WebhookSmsSender, create_sender
+from Utils.TTLStore import MemoryTTLStore
+from Utils.Verification import OtpService
+
+EMAIL_ADDRESS = "a@example.com"
+PHONE_NUMBER = "9876543210"
+
+
+@pytest.fixture
+def otp():
+    return OtpService(MemoryTTLStore(), secret="test", max_attempts=3)
+
+
+def test_verify_consumes_code(otp):
+    code = otp.issue("login", PHONE, PHONE_NUMBER)
+    assert otp.verify("login", PHONE, PHONE_NUMBER, code)
+    assert not otp.verify("login", PHONE, PHONE_NUMBER, code)
+
+
+def test_verify_all_keeps_codes_when_one_is_wrong(otp):
+    email_code = otp.issue("register", EMAIL, EMAIL_ADDRESS)
+    phone_code = otp.issue("register", PHONE, PHONE_NUMBER)
+    wrong = str((int(phone_code) + 1) % 10 ** otp.length).zfill(otp.length)
+
+    assert not otp.verify_all("register", [
+        (EMAIL, EMAIL_ADDRESS, email_code),
+        (PHONE, PHONE_NUMBER, wrong),
+    ])
+    # The correct email code survived the failed phone check
+    assert otp.verify_all("register", [
+        (EMAIL, EMAIL_ADDRESS, email_code),
+        (PHONE, PHONE_NUMBER, phone_code),
+    ])
+    assert not otp.verify("register", EMAIL, EMAIL_ADDRESS, email_code)
+
+
+def test_code_discarded_after_max_attempts(otp):
+    code = otp.issue("login", PHONE, PHONE_NUMBER)
+    wrong = str((int(code) + 1) % 10 ** otp.length).zfill(otp.length)
+    for _ in range(otp.max_attempts):
+        assert not otp.verify("login", PHONE, PHONE_NUMBER, wrong)
+    assert not otp.verify("login", PHONE, PHONE_NUMBER, code)
+
+
+def test_create_sender_from_settings():
+    assert create_sender({"Provider": "none"}) is None
+    assert isinstance(create_sender({"Provider": "smtp", "Host": "localhost"}), SmtpEmailSender)
+    assert isinstance(create_sender({"Provider": "webhook", "Url": "http://localhost/sms"}), WebhookSmsSender)
+    with pytest.raises(ValueError):
+        create_sender({"Provider": "carrier-pigeon"})
@@ -0,0 +1,398 @@
+"""
+Endpoint load benchmark for the product and user services, against a
+database prepared with benchmarks.seed.
+
+Run from API_Services:
+
+    # in-process over ASGI (no server needed)
+    python -m benchmarks.load product --requests 500 --concurrency 16 --out product.json
+    # against a running server (started from the same --workdir)
+    python -m benchmarks.load user --url http://localhost:8000 --scenarios login,login_burst
+
+Each scenario reports p50/p95/p99 latency and throughput. Reports are JSON
+and carry the git commit, so runs can be compared across commits with
+--baseline (and --max-regression to fail a CI job). Any non-2xx response
+(or transport error) fails the run unless --allow-errors is given.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.seed import DEFAULT_WORKDIR, bench_user, manifest_path
+
+PAGE_SIZE = 20
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    params: dict | None = None
+    json: dict | None = None
+
+
+@dataclass
+class RunContext:
+    manifest: dict
+    rng: random.Random
+    # Per-worker state (e.g. the cursor a worker is walking)
+    worker_state: dict = field(default_factory=dict)
+    tag: str = ""
+
+    @staticmethod
+    def captcha() -> str:
+        # Captcha tokens are single-use across the whole run
+        return f"bench-{uuid.uuid4().hex}"
+
+
+@dataclass
+class Scenario:
+    name: str
+    service: str
+    build: Callable[[RunContext, httpx.AsyncClient, int, int], Awaitable[Request]]
+    description: str
+    # Release every request at once instead of keeping `concurrency` in flight
+    burst: bool = False
+
+
+# -------------------------------------------------------
+# PRODUCT SCENARIOS
+# -------------------------------------------------------
+
+async def _listing(ctx, client, worker, i):
+    return Request("GET", "/user/product/all", params={"page_size": PAGE_SIZE})
+
+
+async def _deep_offset(ctx, client, worker, i):
+    # A page in the last 10% of the catalog: OFFSET cost grows with depth
+    pages = max(1, ctx.manifest["products"] // PAGE_SIZE)
+    page = ctx.rng.randint(max(1, int(pages * 0.9)), pages)
+    return Request("GET", "/user/product/all", params={"page_size": PAGE_SIZE, "page": page})
+
+
+async def _cursor_walk(ctx, client, worker, i):
+    # Each worker follows next_cursor through the catalog; keyset pages cost
+    # the same at any depth
+    cursor = ctx.worker_state.get(worker)
+    if cursor is None:
+        params = {"page_size": PAGE_SIZE, "pagination": "cursor", "count_mode": "none"}
+    else:
+        params = {"page_size": PAGE_SIZE, "cursor": cursor, "count_mode": "none"}
+    return Request("GET", "/user/product/all", params=params)
+
+
+def _remember_cursor(ctx, worker, response: httpx.Response) -> None:
+    if response.status_code == 200:
+        ctx.worker_state[worker] = response.json().get("next_cursor")
+
+
+async def _search(ctx, client, worker, i):
+    term = ctx.rng.choice(ctx.manifest["search_terms"])
+    return Request("GET", "/user/product/all", params={"search": term, "page_size": PAGE_SIZE})
+
+
+async def _search_relevance(ctx, client, worker, i):
+    term = ctx.rng.choice(ctx.manifest["search_terms"])
+    return Request("GET", "/user/product/all", params={"search": term, "sort_by": "relevance", "page_size": PAGE_SIZE})
+
+
+async def _detail(ctx, client, worker, i):
+    first, last = ctx.manifest["product_id_range"]
+    return Request("GET", f"/user/product/{ctx.rng.randint(first, last)}")
+
+
+async def _image(ctx, client, worker, i):
+    return Request("GET", f"/user/product/image/{ctx.rng.choice(ctx.manifest['image_keys'])}")
+
+
+# -------------------------------------------------------
+# USER SCENARIOS
+# -------------------------------------------------------
+
+def _random_bench_user(ctx) -> dict:
+    first, last = ctx.manifest["user_index_range"]
+    return bench_user(ctx.rng.randint(first, last))
+
+
+async def _login(ctx, client, worker, i):
+    user = _random_bench_user(ctx)
+    identifier = ctx.rng.choice([user["username"], user["email"], user["phone_number"]])
+    return Request("POST", "/user/login", json={
+        "identifier": identifier, "password": ctx.manifest["password"], "captcha": ctx.captcha(),
+    })
+
+
+async def _identifier_check(ctx, client, worker, i):
+    user = _random_bench_user(ctx)
+    return Request("POST", "/user/identifiers/check", json={"email": user["email"], "username": f"free_{ctx.tag}_{i}"})
+
+
+async def _register(ctx, client, worker, i):
+    # OTPs are issued (untimed) first; Otp.EchoCodeForTesting returns them
+    name = f"load_{ctx.tag}_{i}"
+    phone = f"7{(int(ctx.tag) * 100_000 + i) % 10**9:09d}"
+    email = f"{name}@example.com"
+    codes = []
+    for channel, destination in (("email", email), ("phone", phone)):
+        sent = await client.post("/user/otp/send", json={"purpose": "register", "channel": channel, "destination": destination})
+        codes.append(sent.json().get("otp"))
+    return Request("POST", "/user/register", json={
+        "name": "Load Test", "username": name, "email": email, "phone_number": phone,
+        "password": "LoadPass123", "confirm_password": "LoadPass123", "captcha": ctx.captcha(),
+        "email_otp": codes[0], "phone_otp": codes[1],
+        "address": {"address_line": "1 Bench Road", "city": "Pune", "state": "MH", "pincode": "411001"},
+    })
+
+
+SCENARIOS = {s.name: s for s in (
+    Scenario("listing", "product", _listing, "First catalog page"),
+    Scenario("deep_offset", "product", _deep_offset, "Offset page in the last 10% of the catalog"),
+    Scenario("cursor_walk", "product", _cursor_walk, "Keyset pages following next_cursor"),
+    Scenario("search", "product", _search, "Search, default ordering"),
+    Scenario("search_relevance", "product", _search_relevance, "Search ordered by relevance"),
+    Scenario("detail", "product", _detail, "Single product by id"),
+    Scenario("image", "product", _image, "Original product image"),
+    Scenario("login", "user", _login, "Login with username/email/phone"),
+    Scenario("login_burst", "user", _login, "All login requests released at once", burst=True),
+    Scenario("identifier_check", "user", _identifier_check, "Identifier availability check"),
+    Scenario("register", "user", _register, "Customer registration (OTPs issued untimed)"),
+)}
+
+AFTER_RESPONSE = {"cursor_walk": _remember_cursor}
+
+
+# -------------------------------------------------------
+# RUNNER
+# -------------------------------------------------------
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: list[float], statuses: Counter, wall_seconds: float, concurrency: int) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    errors = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "min": ms(ordered[0]) if ordered else 0.0,
+            "mean": ms(sum(ordered) / len(ordered)) if ordered else 0.0,
+            "p50": ms(percentile(ordered, 50)),
+            "p95": ms(percentile(ordered, 95)),
+            "p99": ms(percentile(ordered, 99)),
+            "max": ms(ordered[-1]) if ordered else 0.0,
+        },
+    }
+
+
+async def run_scenario(client, scenario: Scenario, ctx: RunContext, requests: int, concurrency: int, warmup: int) -> dict:
+    after = AFTER_RESPONSE.get(scenario.name)
+
+    async def one(worker: int, i: int, record: bool):
+        request = await scenario.build(ctx, client, worker, i)
+        start = time.perf_counter()
+        try:
+            response = await client.request(request.method, request.url, params=request.params, json=request.json)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 0
+        elapsed = time.perf_counter() - start
+        if after and response is not None:
+            after(ctx, worker, response)
+        if record:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+    latencies, statuses = [], Counter()
+    # Warm-up fills caches and the in-memory search index; not recorded
+    for i in range(warmup):
+        await one(0, -1 - i, record=False)
+    ctx.worker_state.clear()
+
+    if scenario.burst:
+        concurrency = requests
+    counter = itertools.count()
+
+    async def worker(n: int):
+        while (i := next(counter)) < requests:
+            await one(n, i, record=True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(min(concurrency, requests))))
+    return summarize(latencies, statuses, time.perf_counter() - started, concurrency)
+
+
+def _git(*args) -> str | None:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report_meta(args, manifest: dict) -> dict:
+    from sqlalchemy.engine import make_url
+
+    status = _git("status", "--porcelain")
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "service": args.service,
+        "target": args.url or "asgi",
+        "db": make_url(manifest["db"]).render_as_string(hide_password=True),
+        "db_mode": args.db_mode,
+        "dataset": {key: manifest.get(key) for key in ("products", "image_bytes", "users") if key in manifest},
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+    }
+
+
+def compare(report: dict, baseline: dict) -> tuple[list[str], float]:
+    """
+    Table of changes against a baseline report, and the worst p95 regression (%).
+    """
+    lines = [f"{'scenario':<18}{'p50 ms':>20}{'p95 ms':>20}{'p99 ms':>20}{'req/s':>20}"]
+    worst = 0.0
+    for name, result in report["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+
+        def cell(new_value, old_value):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            return f"{old_value:.1f}->{new_value:.1f} ({change:+.0f}%)", change
+
+        cells = [cell(result["latency_ms"][p], old["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        cells.append(cell(result["throughput_rps"], old["throughput_rps"]))
+        worst = max(worst, cells[1][1])
+        lines.append(f"{name:<18}" + "".join(f"{text:>20}" for text, _ in cells))
+    return lines, worst
+
+
+async def run(args, manifest: dict) -> dict:
+    scenarios = [SCENARIOS[name] for name in args.scenarios]
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url, timeout=args.timeout,
+            limits=httpx.Limits(max_connections=max(args.concurrency, args.requests if any(s.burst for s in scenarios) else 0)),
+        )
+    else:
+        from benchmarks.service import load_app, load_service
+
+        overrides = {"PasswordHashing": {"BcryptRounds": args.bcrypt_rounds, "Executor": "thread"}} if args.bcrypt_rounds else None
+        load_service(args.service, manifest["db"], os.path.abspath(args.workdir), args.db_mode, overrides)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=load_app()), base_url="http://bench", timeout=args.timeout)
+
+    report = {"meta": report_meta(args, manifest), "scenarios": {}}
+    try:
+        async with client:
+            await _run_scenarios(args, client, scenarios, manifest, report)
+    finally:
+        if not args.url:
+            from benchmarks.service import dispose_engines
+            await dispose_engines()
+    return report
+
+
+async def _run_scenarios(args, client, scenarios: list[Scenario], manifest: dict, report: dict) -> None:
+    for scenario in scenarios:
+        ctx = RunContext(manifest=manifest, rng=random.Random(args.seed), tag=str(int(time.time())))
+        result = await run_scenario(client, scenario, ctx, args.requests, args.concurrency, args.warmup)
+        report["scenarios"][scenario.name] = result
+        lat = result["latency_ms"]
+        print(
+            f"{scenario.name:<18} p50 {lat['p50']:>8.2f} ms  p95 {lat['p95']:>8.2f} ms  p99 {lat['p99']:>8.2f} ms"
+            f"  {result['throughput_rps']:>8.1f} req/s  errors {result['errors']}",
+            file=sys.stderr,
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Endpoint load benchmark")
+    parser.add_argument("service", choices=["product", "user"])
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="Where benchmarks.seed wrote its manifest")
+    parser.add_argument("--scenarios", help=f"Comma-separated; default all for the service. One of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--url", help="Base URL of a running server; default drives the app in-process over ASGI")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync", help="Database.Mode for in-process runs")
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--bcrypt-rounds", type=int, help="Same value as given to benchmarks.seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, help="Exit 1 if any p95 is this many percent slower than --baseline")
+    parser.add_argument("--allow-errors", action="store_true", help="Do not fail the run on non-2xx responses")
+    args = parser.parse_args(argv)
+
+    args.scenarios = args.scenarios.split(",") if args.scenarios else [
+        name for name, s in SCENARIOS.items() if s.service == args.service
+    ]
+    for name in args.scenarios:
+        if name not in SCENARIOS or SCENARIOS[name].service != args.service:
+            parser.error(f"Unknown {args.service} scenario '{name}'")
+
+    path = manifest_path(os.path.abspath(args.workdir), args.service)
+    if not os.path.exists(path):
+        parser.error(f"{path} not found; run `python -m benchmarks.seed {args.service}` first")
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    report = asyncio.run(run(args, manifest))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    failed = {name: result["status_counts"] for name, result in report["scenarios"].items() if result["errors"]}
+    if failed and not args.allow_errors:
+        # Timings of a scenario that errors measure the error path, not the endpoint
+        for name, counts in failed.items():
+            print(f"{name}: non-2xx responses {counts}", file=sys.stderr)
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        lines, worst = compare(report, baseline)
+        print(f"\nAgainst {baseline['meta'].get('commit')} (now {report['meta'].get('commit')}):", file=sys.stderr)
+        print("\n".join(lines), file=sys.stderr)
+        if args.max_regression is not None and worst > args.max_regression:
+            print(f"p95 regressed by {worst:.0f}% (limit {args.max_regression:.0f}%)", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Seed a benchmark database for one service and write the manifest that
+benchmarks.load reads (id ranges, image keys, search terms, credentials).
+
+Run from API_Services:
+
+    python -m benchmarks.seed product --db sqlite:///bench.db --products 100000 --image-bytes 20000
+    python -m benchmarks.seed user --db sqlite:///bench.db --users 10000
+
+SQLite databases are created in --workdir. For Postgres, run the service's
+`alembic upgrade head` against the database first.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import func, insert, select
+
+from benchmarks.service import load_service
+
+DEFAULT_WORKDIR = "bench-data"
+BENCH_PASSWORD = "BenchPass123"
+BENCH_USER_ID = 1
+
+# Descriptions are drawn from a fixed vocabulary with skewed frequencies, so
+# search terms range from very common to rare (the selectivity matters more
+# than the words)
+COMMON_WORDS = ["classic", "cotton", "black", "premium", "slim", "casual"]
+RARE_WORDS = ["waterproof", "titanium", "handmade", "vintage", "organic", "ceramic"]
+FILLER_WORDS = ["shirt", "shoe", "bag", "watch", "lamp", "mug", "jacket", "chair", "desk", "bottle"]
+SEARCH_TERMS = COMMON_WORDS[:3] + RARE_WORDS[:3] + ["shoe", "premium watch"]
+
+
+def manifest_path(workdir: str, service: str) -> str:
+    return os.path.join(workdir, f"manifest.{service}.json")
+
+
+def write_manifest(workdir: str, service: str, manifest: dict) -> str:
+    path = manifest_path(workdir, service)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def noise_png(approx_bytes: int, seed: int) -> bytes:
+    """
+    A PNG of random pixels, roughly ``approx_bytes`` long (noise does not
+    compress, so the file size tracks the pixel count).
+    """
+    from PIL import Image
+
+    side = max(8, int(math.sqrt(approx_bytes / 3)))
+    rng = random.Random(seed)
+    image = Image.frombytes("RGB", (side, side), rng.randbytes(side * side * 3))
+    buf = io.BytesIO()
+    image.save(buf, "PNG", compress_level=1)
+    return buf.getvalue()
+
+
+def product_row(i: int, rng: random.Random, image: dict) -> dict:
+    words = [rng.choice(FILLER_WORDS), rng.choice(COMMON_WORDS)]
+    if rng.random() < 0.02:
+        words.append(rng.choice(RARE_WORDS))
+    rng.shuffle(words)
+    return {
+        "name": f"{words[0].title()} {i}",
+        "description": " ".join(words + rng.sample(FILLER_WORDS, 4)),
+        "price": round(rng.uniform(1, 500), 2),
+        "rating": round(rng.uniform(0, 5), 1),
+        "image_key": image["key"],
+        "image_filename": f"bench_{i}.png",
+        "image_size": image["size"],
+        "image_content_type": "image/png",
+        "is_active": 1,
+        "created_by": BENCH_USER_ID,
+    }
+
+
+def seed_products(db, count: int, image_bytes: int, distinct_images: int, batch_size: int, seed: int) -> dict:
+    from ProductService.ProductService import blob_store
+    from Repository_DataAcess.ProductRepo import bulk_insert_products
+    from Model.ProductModel import Product
+
+    # The blob store is content-addressed, so the catalog shares a pool of images
+    images = []
+    for n in range(max(1, distinct_images)):
+        data = noise_png(image_bytes, seed + n)
+        images.append({"key": blob_store.put(data), "size": len(data)})
+
+    rng = random.Random(seed)
+    start_id = (db.scalar(select(func.max(Product.id))) or 0) + 1
+    for offset in range(0, count, batch_size):
+        rows = [product_row(start_id + i, rng, images[i % len(images)])
+                for i in range(offset, min(offset + batch_size, count))]
+        bulk_insert_products(db, rows)
+        print(f"  products: {offset + len(rows)}/{count}", file=sys.stderr)
+
+    first, last, total = db.execute(
+        select(func.min(Product.id), func.max(Product.id), func.count(Product.id)).where(Product.is_active == 1)
+    ).one()
+    return {
+        "products": total,
+        "product_id_range": [first, last],
+        "image_keys": [image["key"] for image in images],
+        "image_bytes": image_bytes,
+        "search_terms": SEARCH_TERMS,
+    }
+
+
+def bench_user(i: int) -> dict:
+    return {
+        "username": f"bench_user_{i}",
+        "email": f"bench_user_{i}@example.com",
+        "phone_number": f"9{i:09d}",
+    }
+
+
+def seed_users(db, count: int, batch_size: int) -> dict:
+    from Models.Models import User, UserIdentifier, UserRole
+    from Utils.Auth import hash_password
+    from Utils.Identifiers import user_identifiers
+
+    # One hash at the configured cost: every login still pays a full verify
+    password_hash = hash_password(BENCH_PASSWORD)
+    start = (db.scalar(select(func.max(User.id))) or 0) + 1
+    for offset in range(0, count, batch_size):
+        users = [dict(bench_user(i), name=f"Bench User {i}", password=password_hash, role=UserRole.CUSTOMER,
+                      is_active=True, captcha_verified=True, otp_verified=True)
+                 for i in range(start + offset, start + min(offset + batch_size, count))]
+        ids = list(db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), users))
+        db.execute(insert(UserIdentifier), [
+            {"kind": kind, "value": value, "user_id": user_id}
+            for user_id, user in zip(ids, users)
+            for kind, value in user_identifiers(user["email"], user["username"], user["phone_number"])
+        ])
+        db.commit()
+        print(f"  users: {offset + len(users)}/{count}", file=sys.stderr)
+
+    return {"users": count, "user_index_range": [start, start + count - 1], "password": BENCH_PASSWORD}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("service", choices=["product", "user"])
+    parser.add_argument("--db", default="sqlite:///bench.db", help="SQLAlchemy URL (relative SQLite paths are inside --workdir)")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--image-bytes", type=int, default=20_000, help="Approximate size of each product image")
+    parser.add_argument("--distinct-images", type=int, default=50)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--bcrypt-rounds", type=int, help="Override PasswordHashing.BcryptRounds for the seeded hash (pass the same value to benchmarks.load)")
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    workdir = os.path.abspath(args.workdir)
+    overrides = {"PasswordHashing": {"BcryptRounds": args.bcrypt_rounds, "Executor": "thread"}} if args.bcrypt_rounds else None
+    database = load_service(args.service, args.db, workdir, overrides=overrides)
+
+    started = time.perf_counter()
+    db = database.SessionLocal()
+    try:
+        if args.service == "product":
+            data = seed_products(db, args.products, args.image_bytes, args.distinct_images, args.batch_size, args.seed)
+        else:
+            data = seed_users(db, args.users, args.batch_size)
+    finally:
+        db.close()
+
+    manifest = {"service": args.service, "db": args.db, "seeded_in_seconds": round(time.perf_counter() - started, 1), **data}
+    print(f"Wrote {write_manifest(workdir, args.service, manifest)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
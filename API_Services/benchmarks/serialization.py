@@ -0,0 +1,155 @@
+"""
+Response serialization micro-benchmark: the old path (jsonable_encoder /
+per-item model_validate + stdlib json) against the current one (pydantic v2
+TypeAdapter validation + ORJSONResponse), on the payloads returned by the
+product listing and the UserResponse endpoints.
+
+Run from API_Services:
+
+    python -m benchmarks.serialization --items 100 --rounds 500
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# User_Service first: its Db/config packages are the ones Models.Models imports;
+# the product schema only needs pydantic
+sys.path[:0] = [os.path.join(ROOT, "User_Service"), os.path.join(ROOT, "Product_Service")]
+
+from Models.Models import Address, User, UserListAdapter, UserResponse, UserRole  # noqa: E402
+from Schema.product_schema import ProductListResponse  # noqa: E402
+
+IMAGE_KEY = "7864b3465e11308c9289dfab6e84ce0a88472edbaef9b0199f8d1fc74b0f7219"
+ProductPageAdapter = TypeAdapter(ProductListResponse)
+
+
+def listing_payload(items: int) -> dict:
+    """
+    A listing page shaped like listing_response() output.
+    """
+    return {
+        "items": [
+            {
+                "id": i,
+                "name": f"Product {i}",
+                "description": "A fairly ordinary product description " * 4,
+                "price": 10.0 + i,
+                "is_active": 1,
+                "rating": 4.5,
+                "image_filename": "photo.png",
+                "image_key": IMAGE_KEY,
+                "image_url": f"/user/product/image/{IMAGE_KEY}",
+                "thumbnails": {size: f"/user/product/image/{IMAGE_KEY}/{size}" for size in ("thumb", "small", "medium")},
+                "image_preview": None,
+            }
+            for i in range(items)
+        ],
+        "total": 50_000,
+        "total_mode": "exact",
+        "has_more": True,
+        "page": 1,
+        "page_size": items,
+        "pages": 50_000 // max(items, 1),
+    }
+
+
+def users(count: int) -> list:
+    """
+    Transient ORM users with two addresses each, as GET /users returns them.
+    """
+    return [
+        User(
+            id=i,
+            name=f"User {i}",
+            username=f"user_{i}",
+            email=f"user{i}@example.com",
+            phone_number=f"98765{i:05d}",
+            role=UserRole.CUSTOMER,
+            is_active=True,
+            addresses=[
+                Address(id=i * 2 + n, address_line=f"{n} Main Road", city="Pune", state="MH", pincode="411001")
+                for n in range(2)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def listing_before(payload: dict) -> bytes:
+    # No response_model: FastAPI ran jsonable_encoder, then JSONResponse (json.dumps)
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def listing_after(payload: dict) -> bytes:
+    # response_model=ProductListResponse + ORJSONResponse
+    value = ProductPageAdapter.validate_python(payload)
+    return ORJSONResponse(ProductPageAdapter.dump_python(value, mode="json", exclude_unset=True)).body
+
+
+_USER_LIST = TypeAdapter(list[UserResponse])
+
+
+def users_before(rows: list) -> bytes:
+    models = [UserResponse.model_validate(u) for u in rows]
+    return JSONResponse(_USER_LIST.dump_python(_USER_LIST.validate_python(models), mode="json")).body
+
+
+def users_after(rows: list) -> bytes:
+    models = UserListAdapter.validate_python(rows, from_attributes=True)
+    return ORJSONResponse(_USER_LIST.dump_python(_USER_LIST.validate_python(models), mode="json")).body
+
+
+def measure(func, arg, rounds: int) -> dict:
+    func(arg)  # warm-up
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 4),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 4),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Products per listing page / users per list")
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    payload, rows = listing_payload(args.items), users(args.items)
+    # Both paths must produce the same document
+    assert json.loads(listing_before(payload)) == json.loads(listing_after(payload))
+    assert json.loads(users_before(rows)) == json.loads(users_after(rows))
+
+    results = {}
+    for name, before, after, arg in (
+        ("product_listing", listing_before, listing_after, payload),
+        ("user_list", users_before, users_after, rows),
+    ):
+        old, new = measure(before, arg, args.rounds), measure(after, arg, args.rounds)
+        results[name] = {"before": old, "after": new, "speedup": round(old["mean_ms"] / new["mean_ms"], 2)}
+
+    if args.json:
+        print(json.dumps({"items": args.items, "rounds": args.rounds, "results": results}, indent=2))
+        return 0
+
+    print(f"{'payload':<18}{'before ms':>12}{'after ms':>12}{'speedup':>10}   ({args.items} items, {args.rounds} rounds)")
+    for name, r in results.items():
+        print(f"{name:<18}{r['before']['mean_ms']:>12.3f}{r['after']['mean_ms']:>12.3f}{r['speedup']:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
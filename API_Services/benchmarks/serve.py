@@ -0,0 +1,39 @@
+"""
+Serve a service over HTTP with the benchmark settings (benchmark database,
+attached SQLite admin schema, rate limiting off), for `benchmarks.load --url`:
+
+    python -m benchmarks.serve product --port 8001
+    python -m benchmarks.load product --url http://127.0.0.1:8001
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.seed import DEFAULT_WORKDIR, manifest_path
+from benchmarks.service import load_app, load_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a service against the benchmark database")
+    parser.add_argument("service", choices=["product", "user"])
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR)
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--bcrypt-rounds", type=int, help="Same value as given to benchmarks.seed")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    workdir = os.path.abspath(args.workdir)
+    with open(manifest_path(workdir, args.service), encoding="utf-8") as f:
+        manifest = json.load(f)
+    overrides = {"PasswordHashing": {"BcryptRounds": args.bcrypt_rounds, "Executor": "thread"}} if args.bcrypt_rounds else None
+    load_service(args.service, manifest["db"], workdir, args.db_mode, overrides)
+    uvicorn.run(load_app(), host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
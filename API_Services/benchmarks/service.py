@@ -0,0 +1,117 @@
+"""
+Load one service (Product_Service or User_Service) in-process against a
+benchmark database.
+
+The services share module names (config, Db, Utils, main), so a process can
+only ever hold one of them: the service directory goes first on sys.path and
+its settings are written to a generated appsettings.json that
+APP_SETTINGS_PATH points at, before anything from the service is imported.
+"""
+import json
+import os
+import sys
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICES = {"product": "Product_Service", "user": "User_Service"}
+
+
+def service_dir(service: str) -> str:
+    return os.path.join(ROOT, SERVICES[service])
+
+
+def benchmark_settings(service: str, db_url: str, db_mode: str = "sync", overrides: dict | None = None) -> dict:
+    """
+    The service's own appsettings.json, pointed at ``db_url``. Rate limiting
+    is switched off (it would cap the load), and Otp.EchoCodeForTesting and
+    Otp.RequiredForRegistration are on so register runs issue and verify
+    codes without a delivery provider.
+    """
+    with open(os.path.join(service_dir(service), "Db", "appsettings.json"), encoding="utf-8") as f:
+        settings = json.load(f)
+    settings["Database"]["ConnectionString"] = db_url
+    settings["Database"]["Mode"] = db_mode
+    settings.setdefault("Otp", {}).update(EchoCodeForTesting=True, RequiredForRegistration=True)
+    settings.setdefault("RateLimit", {})["Enabled"] = False
+    for section, values in (overrides or {}).items():
+        settings.setdefault(section, {}).update(values)
+    return settings
+
+
+def _attach_admin_schema(engine, db_url: str) -> None:
+    """
+    Tables live in the "admin" schema. SQLite has no schemas, so a second
+    database file is attached under that name on every new connection.
+    """
+    database = make_url(db_url).database
+    admin_path = os.path.join(os.path.dirname(os.path.abspath(database)), "admin_" + os.path.basename(database))
+
+    @event.listens_for(engine, "connect")
+    def _attach(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"ATTACH DATABASE '{admin_path}' AS admin")
+        cursor.close()
+
+
+def load_service(service: str, db_url: str, workdir: str, db_mode: str = "sync", overrides: dict | None = None):
+    """
+    Import the service configured for the benchmark database. Returns its
+    Db.Database module; the FastAPI app is ``load_app()`` afterwards.
+
+    ``workdir`` becomes the working directory, since the product blob store
+    (Product_Catalog/) is relative to it.
+    """
+    if "config" in sys.modules:
+        raise RuntimeError("A service is already loaded in this process")
+
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    settings_path = os.path.join(workdir, f"appsettings.{service}.json")
+    with open(settings_path, "w", encoding="utf-8") as f:
+        json.dump(benchmark_settings(service, db_url, db_mode, overrides), f, indent=2)
+    os.environ["APP_SETTINGS_PATH"] = settings_path
+    sys.path.insert(0, service_dir(service))
+
+    import Db.Database as database
+
+    sqlite = make_url(db_url).get_backend_name() == "sqlite"
+    if sqlite:
+        _attach_admin_schema(database.engine, db_url)
+        if db_mode == "async":
+            import Db.AsyncDatabase as async_database
+            _attach_admin_schema(async_database.async_engine.sync_engine, db_url)
+
+    if service == "product":
+        import Model  # noqa: F401  (registers the tables)
+    else:
+        import Models.Models  # noqa: F401
+
+    if sqlite:
+        database.Base.metadata.create_all(database.engine)
+    else:
+        # Postgres needs the real schema (search_vector trigger, pg_trgm
+        # indexes): run `alembic upgrade head` for the service first
+        with database.engine.connect() as conn:
+            conn.execute(text("SELECT 1 FROM admin.products LIMIT 1" if service == "product"
+                              else "SELECT 1 FROM admin.users LIMIT 1"))
+    return database
+
+
+def load_app():
+    from main import app
+    return app
+
+
+async def dispose_engines() -> None:
+    """
+    Close pooled connections. aiosqlite connections run on non-daemon
+    threads, so an undisposed async engine keeps the process alive.
+    """
+    import Db.Database as database
+
+    database.engine.dispose()
+    async_database = sys.modules.get("Db.AsyncDatabase")
+    if async_database is not None:
+        await async_database.async_engine.dispose()